@@ -0,0 +1,44 @@
+-- Fingerprints of analyzed reports, used to reuse an earlier analysis when
+-- the same report is uploaded again instead of calling the LLM.
+
+create table if not exists public.caregiver_links (
+    patient_user_id uuid not null references public.users (id) on delete cascade,
+    caregiver_user_id uuid not null references public.users (id) on delete cascade,
+    created_at timestamptz not null default now(),
+    primary key (patient_user_id, caregiver_user_id)
+);
+
+create table if not exists public.report_fingerprints (
+    id bigint generated always as identity primary key,
+    user_id uuid not null references public.users (id) on delete cascade,
+    session_id uuid not null references public.chat_sessions (id) on delete cascade,
+    content_hash text,
+    text_hash text not null,
+    analysis text not null,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists report_fingerprints_content_hash_idx
+    on public.report_fingerprints (content_hash, created_at desc);
+create index if not exists report_fingerprints_text_hash_idx
+    on public.report_fingerprints (text_hash, created_at desc);
+
+alter table public.caregiver_links enable row level security;
+alter table public.report_fingerprints enable row level security;
+
+create policy "caregiver links visible to both sides" on public.caregiver_links
+    for select using (auth.uid() in (patient_user_id, caregiver_user_id));
+
+create policy "owners insert fingerprints" on public.report_fingerprints
+    for insert with check (user_id = auth.uid());
+
+-- The owner and any caregiver linked to the owner can reuse an analysis
+create policy "owners and caregivers read fingerprints" on public.report_fingerprints
+    for select using (
+        user_id = auth.uid()
+        or exists (
+            select 1 from public.caregiver_links cl
+            where cl.patient_user_id = report_fingerprints.user_id
+              and cl.caregiver_user_id = auth.uid()
+        )
+    );
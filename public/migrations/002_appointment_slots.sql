@@ -0,0 +1,9 @@
+-- Appointments are booked into time slots rather than whole days.
+-- Older rows keep a null preferred_time and are treated as taking the
+-- earliest slot of their day.
+
+alter table public.appointments
+    add column if not exists preferred_time text;
+
+create index if not exists appointments_doctor_day_idx
+    on public.appointments (doctor_id, preferred_day);
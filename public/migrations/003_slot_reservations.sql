@@ -0,0 +1,127 @@
+-- Atomic slot booking. Each (doctor, day, slot) has a counter row that is
+-- claimed with a conditional upsert, so concurrent bookings only contend on
+-- the row for the slot they want. An idempotency key on appointments makes
+-- a repeated submit return the first booking instead of creating another.
+
+-- Patients per doctor per slot. Set here, never by the client; keep
+-- SLOT_CAPACITY in src/config/app_config.py in step for the local slot book.
+create table if not exists public.booking_settings (
+    id boolean primary key default true check (id),
+    slot_capacity integer not null default 1 check (slot_capacity > 0)
+);
+
+insert into public.booking_settings default values
+on conflict do nothing;
+
+alter table public.booking_settings enable row level security;
+-- No policies: only read by book_appointment_slot
+
+create table if not exists public.slot_reservations (
+    doctor_id text not null,
+    day date not null,
+    slot text not null,
+    capacity integer not null check (capacity > 0),
+    booked integer not null default 0,
+    primary key (doctor_id, day, slot),
+    check (booked between 0 and capacity)
+);
+
+alter table public.appointments
+    add column if not exists idempotency_key text;
+
+create unique index if not exists appointments_idempotency_key_idx
+    on public.appointments (idempotency_key)
+    where idempotency_key is not null;
+
+-- Existing bookings; rows from before slots existed hold the first slot
+insert into public.slot_reservations (doctor_id, day, slot, capacity, booked)
+select doctor_id, preferred_day::date, coalesce(preferred_time, '09:00'), greatest(count(*), 1), count(*)
+from public.appointments
+group by doctor_id, preferred_day::date, coalesce(preferred_time, '09:00')
+on conflict do nothing;
+
+alter table public.slot_reservations enable row level security;
+-- Only written through book_appointment_slot. Counts hold no patient data, and
+-- every signed-in user needs all of them to see which slots are taken
+-- (appointments rows are only visible to their owner).
+create policy "signed-in users read slot counts" on public.slot_reservations
+    for select to authenticated using (true);
+
+-- An earlier version took the capacity from the caller
+drop function if exists public.book_appointment_slot(text, uuid, text, text, text, text, text, text, text, date, text, integer);
+
+create or replace function public.book_appointment_slot(
+    p_idempotency_key text,
+    p_user_id uuid,
+    p_doctor_id text,
+    p_doctor_name text,
+    p_hospital_name text,
+    p_patient_name text,
+    p_patient_email text,
+    p_patient_phone text,
+    p_preferred_city text,
+    p_day date,
+    p_slot text
+)
+returns table (outcome text, appointment jsonb)
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_appointment public.appointments;
+    v_capacity integer;
+begin
+    if auth.uid() is null or p_user_id is distinct from auth.uid() then
+        raise exception 'can only book for the signed-in user';
+    end if;
+
+    select slot_capacity into v_capacity from public.booking_settings;
+
+    -- A retried submit: hand back the booking it already made
+    select * into v_appointment from public.appointments
+    where idempotency_key = p_idempotency_key;
+    if found then
+        return query select 'duplicate'::text, to_jsonb(v_appointment);
+        return;
+    end if;
+
+    begin
+        -- Compare-and-swap on the slot's counter; no row comes back when full.
+        -- The current setting applies to slots claimed before it changed too.
+        insert into public.slot_reservations as r (doctor_id, day, slot, capacity, booked)
+        values (p_doctor_id, p_day, p_slot, coalesce(v_capacity, 1), 1)
+        on conflict (doctor_id, day, slot) do update
+            set booked = r.booked + 1,
+                capacity = greatest(excluded.capacity, r.booked + 1)
+            where r.booked < excluded.capacity;
+        if not found then
+            return query select 'full'::text, null::jsonb;
+            return;
+        end if;
+
+        insert into public.appointments (
+            user_id, doctor_id, doctor_name, hospital_name, patient_name, patient_email,
+            patient_phone, preferred_city, preferred_day, preferred_time, status,
+            idempotency_key, created_at
+        ) values (
+            p_user_id, p_doctor_id, p_doctor_name, p_hospital_name, p_patient_name, p_patient_email,
+            p_patient_phone, p_preferred_city, p_day, p_slot, 'Pending',
+            p_idempotency_key, now()
+        )
+        returning * into v_appointment;
+    exception when unique_violation then
+        -- A concurrent submit with the same key won the race; the slot claim
+        -- above was rolled back with this block
+        select * into v_appointment from public.appointments
+        where idempotency_key = p_idempotency_key;
+        return query select 'duplicate'::text, to_jsonb(v_appointment);
+        return;
+    end;
+
+    return query select 'booked'::text, to_jsonb(v_appointment);
+end;
+$$;
+
+revoke execute on function public.book_appointment_slot from public, anon;
+grant execute on function public.book_appointment_slot to authenticated;
@@ -0,0 +1,109 @@
+-- Durable outbox for WhatsApp confirmations. A row is queued by a trigger in
+-- the same transaction as the appointment insert; a background dispatcher
+-- (services/notification_outbox.py) claims and sends them, retrying with
+-- backoff and recording the delivery status.
+
+create table if not exists public.notification_outbox (
+    id bigint generated always as identity primary key,
+    user_id uuid references public.users (id) on delete cascade,
+    appointment_id text,
+    channel text not null default 'whatsapp',
+    recipient text not null,
+    body text not null,
+    status text not null default 'pending'
+        check (status in ('pending', 'sending', 'sent', 'failed')),
+    attempts integer not null default 0,
+    next_attempt_at timestamptz not null default now(),
+    last_error text,
+    provider_id text,
+    created_at timestamptz not null default now(),
+    sent_at timestamptz
+);
+
+create index if not exists notification_outbox_due_idx
+    on public.notification_outbox (next_attempt_at)
+    where status in ('pending', 'sending');
+
+alter table public.notification_outbox enable row level security;
+
+create policy "owners read their notifications" on public.notification_outbox
+    for select using (user_id = auth.uid());
+
+create or replace function public.enqueue_appointment_confirmation()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if coalesce(new.patient_phone, '') = '' then
+        return new;
+    end if;
+    insert into public.notification_outbox (user_id, appointment_id, recipient, body)
+    values (
+        new.user_id,
+        new.id::text,
+        new.patient_phone,
+        'Hi ' || coalesce(new.patient_name, '') || '! Your appointment request with '
+            || coalesce(new.doctor_name, 'the doctor') || ' for ' || new.preferred_day
+            || coalesce(' at ' || new.preferred_time, '')
+            || ' has been received. The clinic will contact you shortly to confirm.'
+            || E'\n- CuraMate'
+    );
+    return new;
+end;
+$$;
+
+drop trigger if exists appointments_enqueue_confirmation on public.appointments;
+create trigger appointments_enqueue_confirmation
+    after insert on public.appointments
+    for each row execute function public.enqueue_appointment_confirmation();
+
+-- Claims up to p_limit due notifications. Claimed rows are leased for
+-- p_lease_seconds; a dispatcher that dies mid-batch leaves them to be
+-- claimed again once the lease runs out. skip locked lets several
+-- dispatchers (one per app replica) drain the queue without blocking.
+create or replace function public.claim_notifications(p_limit integer, p_lease_seconds integer)
+returns setof public.notification_outbox
+language sql
+security definer
+set search_path = public
+as $$
+    update public.notification_outbox o
+    set status = 'sending',
+        attempts = o.attempts + 1,
+        next_attempt_at = now() + make_interval(secs => p_lease_seconds)
+    where o.id in (
+        select id from public.notification_outbox
+        where status in ('pending', 'sending') and next_attempt_at <= now()
+        order by next_attempt_at
+        limit p_limit
+        for update skip locked
+    )
+    returning o.*;
+$$;
+
+-- Records the outcome of a claimed batch in one call.
+-- p_results: [{"id", "status", "provider_id", "error", "retry_in_seconds"}]
+create or replace function public.complete_notifications(p_results jsonb)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    update public.notification_outbox o
+    set status = r.status,
+        provider_id = coalesce(r.provider_id, o.provider_id),
+        last_error = r.error,
+        sent_at = case when r.status = 'sent' then now() else o.sent_at end,
+        next_attempt_at = now() + make_interval(secs => coalesce(r.retry_in_seconds, 0))
+    from jsonb_to_recordset(p_results)
+        as r (id bigint, status text, provider_id text, error text, retry_in_seconds integer)
+    where o.id = r.id;
+$$;
+
+-- Only the dispatcher (service role) may claim and complete notifications
+revoke all on function public.claim_notifications from public, anon, authenticated;
+revoke all on function public.complete_notifications from public, anon, authenticated;
+grant execute on function public.claim_notifications to service_role;
+grant execute on function public.complete_notifications to service_role;
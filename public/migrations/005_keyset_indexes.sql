@@ -0,0 +1,8 @@
+-- Indexes for the keyset-paginated session list and chat history: each page
+-- is read newest first by (created_at, id) from just below a cursor.
+
+create index if not exists chat_sessions_user_keyset_idx
+    on public.chat_sessions (user_id, created_at desc, id desc);
+
+create index if not exists chat_messages_session_keyset_idx
+    on public.chat_messages (session_id, created_at desc, id desc);
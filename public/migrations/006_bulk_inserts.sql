@@ -0,0 +1,54 @@
+-- Atomic multi-row inserts with per-row errors, for saving a prescription's
+-- medications or a chat exchange in one request. Each row is inserted in its
+-- own subtransaction so a failure is recorded against its index; if any row
+-- failed, every row is rolled back and the errors are returned. An empty
+-- result means all rows were saved.
+
+create or replace function public.bulk_insert_rows(p_table text, p_rows jsonb)
+returns table (row_index integer, error text)
+language plpgsql
+security invoker -- Row level security applies to every row as usual
+set search_path = public
+as $$
+declare
+    v_row jsonb;
+    v_index integer := 0;
+    v_columns text;
+    v_errors jsonb := '[]'::jsonb;
+begin
+    if p_table not in ('medications', 'chat_messages') then
+        raise exception 'bulk inserts into % are not allowed', p_table;
+    end if;
+
+    begin
+        for v_row in select value from jsonb_array_elements(p_rows) loop
+            begin
+                -- Insert only the keys given, so the other columns keep their defaults
+                select string_agg(quote_ident(key), ', ') into v_columns
+                from jsonb_object_keys(v_row) as key;
+                execute format(
+                    'insert into public.%I (%s) select %s from jsonb_populate_record(null::public.%I, $1)',
+                    p_table, v_columns, v_columns, p_table
+                ) using v_row;
+            exception when others then
+                v_errors := v_errors || jsonb_build_object('row_index', v_index, 'error', sqlerrm);
+            end;
+            v_index := v_index + 1;
+        end loop;
+
+        if jsonb_array_length(v_errors) > 0 then
+            -- Undo the rows that did insert; caught just below
+            raise exception using errcode = 'PB001', message = 'bulk insert rolled back';
+        end if;
+    exception when sqlstate 'PB001' then
+        null;
+    end;
+
+    return query
+        select (e ->> 'row_index')::integer, e ->> 'error'
+        from jsonb_array_elements(v_errors) as e;
+end;
+$$;
+
+revoke execute on function public.bulk_insert_rows from public, anon;
+grant execute on function public.bulk_insert_rows to authenticated;
@@ -0,0 +1,50 @@
+-- Deleting a chat session deletes its messages in the same statement, and
+-- delete_sessions removes many of a user's sessions (by id, or everything
+-- older than a number of days) in one call.
+
+do $$
+declare
+    v_constraint text;
+begin
+    for v_constraint in
+        select conname from pg_constraint
+        where conrelid = 'public.chat_messages'::regclass
+          and confrelid = 'public.chat_sessions'::regclass
+          and contype = 'f'
+    loop
+        execute format('alter table public.chat_messages drop constraint %I', v_constraint);
+    end loop;
+end;
+$$;
+
+alter table public.chat_messages
+    add constraint chat_messages_session_id_fkey
+    foreign key (session_id) references public.chat_sessions (id) on delete cascade;
+
+-- Deletes the caller's sessions with the given ids and/or created more than
+-- p_older_than_days days ago (both filters apply when both are given).
+-- Returns the ids of the deleted sessions.
+create or replace function public.delete_sessions(
+    p_session_ids uuid[] default null,
+    p_older_than_days integer default null
+)
+returns setof uuid
+language plpgsql
+security invoker -- Row level security limits it to the caller's sessions
+set search_path = public
+as $$
+begin
+    if p_session_ids is null and p_older_than_days is null then
+        raise exception 'delete_sessions needs session ids or an age';
+    end if;
+
+    return query
+        delete from public.chat_sessions s
+        where s.user_id = auth.uid()
+          and (p_session_ids is null or s.id = any (p_session_ids))
+          and (p_older_than_days is null or s.created_at < now() - make_interval(days => p_older_than_days))
+        returning s.id;
+end;
+$$;
+
+grant execute on function public.delete_sessions to authenticated;
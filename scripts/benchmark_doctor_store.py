@@ -0,0 +1,95 @@
+"""
+Benchmark filter, rank and book latency for the JSON and SQLite doctor stores.
+
+Usage:
+    python scripts/generate_doctors.py --count 1000000 --json /tmp/doctors.json --sqlite /tmp/doctors.db
+    python scripts/benchmark_doctor_store.py --json /tmp/doctors.json --sqlite /tmp/doctors.db
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from config.app_config import APPOINTMENT_SLOTS, SLOT_CAPACITY, RANKING_WEIGHTS
+from services.doctor_directory import DoctorDirectory
+from services.doctor_ranking import RankedDoctors
+from services.doctor_scoring import score_doctors
+from services.doctor_schedule import SlotBook, first_available
+from services.doctor_store import SqliteDoctorStore
+from generate_doctors import CITIES, SPECIALTIES
+
+
+def rank(bucket, dates):
+    # Same path as booking_service.find_and_book_appointment, without importing Streamlit
+    doctors, columns = bucket
+    ranking = RankedDoctors(doctors, score_doctors(columns, RANKING_WEIGHTS, dates))
+    ranking.top(1)
+    return ranking
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(f"  {label:<8} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def run(name, store, queries, rng):
+    slot_book = SlotBook(APPOINTMENT_SLOTS, SLOT_CAPACITY)
+    filter_ms, rank_ms, book_ms = [], [], []
+    for specialty, city in queries:
+        start = date.today() + timedelta(days=rng.randint(1, 14))
+        dates = [start + timedelta(days=i) for i in range(3)]
+
+        # One query per bucket, as in booking; ranking reuses its rows and columns
+        bucket, ms = timed(store.bucket, specialty, city)
+        filter_ms.append(ms)
+        ranked, ms = timed(rank, bucket, dates)
+        rank_ms.append(ms)
+
+        def book():
+            match = first_available(ranked, dates, slot_book)
+            if match:
+                doctor, day, slot = match
+                slot_book.reserve(doctor.id, day, slot)
+            return match
+        _, ms = timed(book)
+        book_ms.append(ms)
+
+    print(f"{name} ({len(store)} doctors, {len(queries)} queries)")
+    summarize("filter", filter_ms)
+    summarize("rank", rank_ms)
+    summarize("book", book_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", help="JSON directory to benchmark")
+    parser.add_argument("--sqlite", help="SQLite directory to benchmark")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = [(rng.choice(SPECIALTIES), rng.choice(CITIES)) for _ in range(args.queries)]
+
+    if args.json:
+        store, ms = timed(DoctorDirectory, args.json)
+        print(f"JSON load: {ms:.0f} ms")
+        run("json", store, queries, random.Random(args.seed))
+    if args.sqlite:
+        run("sqlite", SqliteDoctorStore(args.sqlite), queries, random.Random(args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Generate a synthetic doctor directory for load testing.
+
+Usage:
+    python scripts/generate_doctors.py --count 1000000 --sqlite doctors.db
+    python scripts/generate_doctors.py --count 5000 --json doctors_sample.json
+    python scripts/generate_doctors.py --from-json doctors.json --sqlite doctors.db
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from services.doctor_directory import Doctor
+from services.doctor_store import build_sqlite_store
+
+SPECIALTIES = ["Hematology", "Hepatology", "Endocrinology", "Cardiology", "Nephrology"]
+CITIES = [
+    "Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata", "Gurugram", "Hyderabad", "Pune",
+    "Ahmedabad", "Jaipur", "Lucknow", "Chandigarh", "Kochi", "Indore", "Bhopal", "Nagpur",
+    "Patna", "Bhubaneswar", "Guwahati", "Dehradun", "Noida", "Surat", "Coimbatore", "Visakhapatnam"
+]
+WORKING_DAYS = ["Monday - Friday", "Monday - Saturday", "Tuesday, Thursday, Saturday", "By Appointment"]
+FIRST_NAMES = ["Rohan", "Priya", "Arjun", "Sneha", "Vikram", "Anjali", "Rahul", "Kavita", "Amit", "Neha"]
+LAST_NAMES = ["Gupta", "Sharma", "Singh", "Patel", "Reddy", "Iyer", "Mehta", "Nair", "Das", "Rao"]
+HOSPITALS = ["Apollo Hospitals", "Fortis Hospital", "Max Healthcare", "Manipal Hospital", "AIIMS", "Medanta"]
+
+
+def generate_records(count, seed=42):
+    rng = random.Random(seed)
+    for i in range(count):
+        specialty = rng.choice(SPECIALTIES)
+        yield {
+            "id": f"{specialty[:2].upper()}-{i:07d}",
+            "Name": f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "Specialization": specialty,
+            "qualification": "MD",
+            "experience": f"{rng.randint(2, 35)} years",
+            "hospital/clinic": rng.choice(HOSPITALS),
+            "city": rng.choice(CITIES),
+            "fee": rng.randrange(500, 3500, 100),
+            "working days": rng.choice(WORKING_DAYS),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of synthetic doctors")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--from-json", help="Convert an existing doctors.json instead of generating")
+    parser.add_argument("--json", help="Write the directory as JSON to this path")
+    parser.add_argument("--sqlite", help="Write the directory as an indexed SQLite file to this path")
+    args = parser.parse_args()
+
+    if not args.json and not args.sqlite:
+        parser.error("Specify --json and/or --sqlite")
+
+    if args.from_json:
+        with open(args.from_json) as f:
+            records = json.load(f)
+    else:
+        records = list(generate_records(args.count, args.seed))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(records, f)
+        print(f"Wrote {len(records)} doctors to {args.json}")
+    if args.sqlite:
+        count = build_sqlite_store((Doctor(record) for record in records), args.sqlite)
+        print(f"Wrote {count} doctors to {args.sqlite}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 from datetime import datetime, timedelta
 import streamlit as st
 from agents.model_manager import ModelManager
+from utils.keyword_matcher import KeywordMatcher
+
+# Key health indicators tracked in the knowledge base
+_indicator_matcher = KeywordMatcher([
+    "hemoglobin", "glucose", "cholesterol", "triglycerides",
+    "hdl", "ldl", "wbc", "rbc", "platelet", "creatinine"
+])
 
 class AnalysisAgent:
     """
@@ -99,35 +106,25 @@ class AnalysisAgent:
             
         # Extract key health indicators and map them to analysis outcomes
         # This basic implementation can be expanded with more sophisticated extraction
-        report_text = data['report'].lower()
         patient_profile = f"{data.get('age', 'unknown')}-{data.get('gender', 'unknown')}"
+        report_indicators = _indicator_matcher.count(data['report'])
+        if not report_indicators:
+            return
         
-        # Look for key health indicators in the report
-        key_indicators = [
-            "hemoglobin", "glucose", "cholesterol", "triglycerides", 
-            "hdl", "ldl", "wbc", "rbc", "platelet", "creatinine"
-        ]
+        # The first analysis line that mentions each indicator found in the report
+        relevant_lines = {}
+        for line in analysis.split('\n'):
+            for indicator in _indicator_matcher.count(line):
+                if indicator in report_indicators:
+                    relevant_lines.setdefault(indicator, line)
         
         # Store snippets of analysis associated with key health indicators
-        for indicator in key_indicators:
-            if indicator in report_text:
-                # Find any mentions of this indicator in the analysis
-                if indicator in analysis.lower():
-                    # Store this learning in knowledge base
-                    if indicator not in st.session_state.knowledge_base:
-                        st.session_state.knowledge_base[indicator] = {}
-                    
-                    if patient_profile not in st.session_state.knowledge_base[indicator]:
-                        st.session_state.knowledge_base[indicator][patient_profile] = []
-                    
-                    # Extract the relevant section from analysis (simple approach)
-                    lines = analysis.split('\n')
-                    relevant_lines = [l for l in lines if indicator in l.lower()]
-                    if relevant_lines:
-                        # Limit knowledge base size to prevent overflow
-                        if len(st.session_state.knowledge_base[indicator][patient_profile]) >= 3:
-                            st.session_state.knowledge_base[indicator][patient_profile].pop(0)
-                        st.session_state.knowledge_base[indicator][patient_profile].append(relevant_lines[0])
+        for indicator, line in relevant_lines.items():
+            insights = st.session_state.knowledge_base.setdefault(indicator, {}).setdefault(patient_profile, [])
+            # Limit knowledge base size to prevent overflow
+            if len(insights) >= 3:
+                insights.pop(0)
+            insights.append(line)
     
     def _build_enhanced_prompt(self, system_prompt, data, chat_history):
         """
@@ -156,14 +153,14 @@ class AnalysisAgent:
         if 'knowledge_base' not in st.session_state or not st.session_state.knowledge_base:
             return ""
             
-        report_text = data.get('report', '').lower()
+        report_indicators = _indicator_matcher.count(data.get('report', ''))
         patient_profile = f"{data.get('age', 'unknown')}-{data.get('gender', 'unknown')}"
         
         context_items = []
         
         # Find relevant knowledge from previous analyses
         for indicator, profiles in st.session_state.knowledge_base.items():
-            if indicator in report_text:
+            if indicator in report_indicators:
                 # Get insights from similar patient profiles first
                 if patient_profile in profiles:
                     for insight in profiles[patient_profile]:
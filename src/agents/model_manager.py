@@ -56,6 +56,20 @@ class ModelManager:
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {str(e)}")
 
+    def warm_up(self):
+        """
+        Open the connection to the provider ahead of a likely request (e.g.
+        parsing a booking), without spending tokens: listing models reuses
+        the client's connection pool, so the next completion skips the
+        TCP/TLS handshake.
+        """
+        client = self.clients.get("groq")
+        if client:
+            try:
+                client.models.list()
+            except Exception as e:
+                logger.warning(f"Groq warm-up failed: {str(e)}")
+
     def generate_analysis(self, data, system_prompt, retry_count=0):
         """
         Generate analysis using the best available model with automatic fallback.
@@ -1,9 +1,16 @@
+import logging
 import streamlit as st
 from st_supabase_connection import SupabaseConnection
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
 import re
-from twilio.rest import Client  
+import jwt
+from config.app_config import TOKEN_REVALIDATE_INTERVAL_SECONDS, TOKEN_REVALIDATE_BEFORE_EXPIRY_SECONDS
+from config.app_config import SESSIONS_PAGE_SIZE, MESSAGES_PAGE_SIZE
+from services.notification_outbox import get_notification_dispatcher
+from auth.token_verifier import TokenKeysUnavailable, get_token_verifier, unverified_claims
+
+logger = logging.getLogger(__name__)
 
 class AuthService:
     def __init__(self):
@@ -20,14 +27,8 @@ class AuthService:
                 }
             )
 
-            self.twilio_sid = st.secrets.get("twilio", {}).get("ACCOUNT_SID")
-            self.twilio_token = st.secrets.get("twilio", {}).get("AUTH_TOKEN")
-            self.twilio_from_number = st.secrets.get("twilio", {}).get("WHATSAPP_FROM")
-            
-            if self.twilio_sid:
-                self.twilio_client = Client(self.twilio_sid, self.twilio_token)
-            else:
-                self.twilio_client = None
+            # Drains queued WhatsApp confirmations in the background
+            self.notification_dispatcher = get_notification_dispatcher()
 
         except Exception as e:
             st.error(f"Failed to initialize services: {str(e)}")
@@ -105,6 +106,8 @@ class AuthService:
                 # Store session info
                 st.session_state.auth_token = auth_response.session.access_token
                 st.session_state.user = user_data
+                # Just checked by Supabase; later reruns verify the token locally
+                self._cache_token_validation(auth_response.session.access_token, user_data)
                 return True, user_data
                 
             return False, "Invalid login response"
@@ -142,13 +145,28 @@ class AuthService:
         except Exception as e:
             return False, str(e)
 
-    def get_user_sessions(self, user_id):
+    def _keyset_page(self, query, limit, before):
+        """
+        Newest-first page of a query ordered by (created_at, id): the `limit`
+        rows just older than the `before` cursor, a (created_at, id) pair taken
+        from the last row of the previous page (None for the first page).
+        """
+        if before:
+            created_at, row_id = before
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})')
+        return query\
+            .order('created_at', desc=True)\
+            .order('id', desc=True)\
+            .limit(limit)\
+            .execute()
+
+    def get_user_sessions(self, user_id, limit=SESSIONS_PAGE_SIZE, before=None):
+        """A page of the user's sessions (id, title, created_at), newest first."""
         try:
-            result = self.supabase.table('chat_sessions')\
-                .select('*')\
-                .eq('user_id', user_id)\
-                .order('created_at', desc=True)\
-                .execute()
+            query = self.supabase.table('chat_sessions')\
+                .select('id, title, created_at')\
+                .eq('user_id', user_id)
+            result = self._keyset_page(query, limit, before)
             return True, result.data
         except Exception as e:
             st.error(f"Error fetching sessions: {str(e)}")
@@ -167,51 +185,165 @@ class AuthService:
         except Exception as e:
             return False, str(e)
 
-    def get_session_messages(self, session_id):
+    def save_chat_messages(self, session_id, messages):
+        """
+        Saves several messages, given as (content, role) pairs, in one atomic
+        request. Returns (True, None), or (False, [{"row_index", "error"}]) with
+        nothing saved.
+        """
+        current_time = datetime.now()
+        rows, errors = [], []
+        for index, (content, role) in enumerate(messages):
+            if not content:
+                errors.append({"row_index": index, "error": "Message is empty"})
+            # Microsecond steps keep the messages in order when sorted by created_at
+            rows.append({
+                'session_id': session_id,
+                'content': content,
+                'role': role,
+                'created_at': (current_time + timedelta(microseconds=index)).isoformat()
+            })
+        if errors:
+            return False, errors
+        return self._bulk_insert('chat_messages', rows)
+
+    def _bulk_insert(self, table, rows):
+        """
+        Inserts rows through bulk_insert_rows (public/migrations/006_bulk_inserts.sql):
+        all of them or none. Returns (True, None) or (False, per-row errors);
+        an error with row_index None applies to the whole batch.
+        """
+        if not rows:
+            return True, None
         try:
-            result = self.supabase.table('chat_messages')\
-                .select('*')\
-                .eq('session_id', session_id)\
-                .order('created_at')\
-                .execute()
-            return True, result.data
+            result = self.supabase.client.rpc('bulk_insert_rows', {
+                "p_table": table,
+                "p_rows": rows,
+            }).execute()
+            if result.data:
+                return False, result.data
+            return True, None
+        except Exception as e:
+            return False, [{"row_index": None, "error": str(e)}]
+
+    def get_session_messages(self, session_id, limit=MESSAGES_PAGE_SIZE, before=None):
+        """
+        A page of the session's messages: the `limit` messages older than the
+        `before` cursor (the newest ones when None), in chronological order.
+        """
+        try:
+            query = self.supabase.table('chat_messages')\
+                .select('id, role, content, created_at')\
+                .eq('session_id', session_id)
+            result = self._keyset_page(query, limit, before)
+            return True, result.data[::-1]
         except Exception as e:
             return False, str(e)
 
     def delete_session(self, session_id):
+        """Delete a session; its messages go with it (on delete cascade, see migration 007)."""
         try:
-            messages_delete = self.supabase.table('chat_messages')\
-                .delete()\
-                .eq('session_id', session_id)\
-                .execute()
-
-            session_delete = self.supabase.table('chat_sessions')\
+            self.supabase.table('chat_sessions')\
                 .delete()\
                 .eq('id', session_id)\
                 .execute()
-
             return True, None
         except Exception as e:
             st.error(f"Failed to delete session: {str(e)}")
             return False, str(e)
+
+    def delete_sessions(self, session_ids=None, older_than_days=None):
+        """
+        Delete the user's sessions with these ids and/or older than a number of
+        days, with their messages, in one call. Returns (True, deleted ids).
+        """
+        try:
+            result = self.supabase.client.rpc('delete_sessions', {
+                "p_session_ids": list(session_ids) if session_ids else None,
+                "p_older_than_days": older_than_days,
+            }).execute()
+            return True, result.data or []
+        except Exception as e:
+            return False, str(e)
     
     def validate_session_token(self):
-        """Validate existing session token on startup."""
+        """
+        Validate the session token; returns the user's profile, or None.
+
+        The token is verified locally (signature and expiry) on every call and
+        the profile served from st.session_state.token_validation. Supabase is
+        only asked again when the token is close to expiry, or after
+        TOKEN_REVALIDATE_INTERVAL_SECONDS, to catch revoked sessions.
+        """
+        token = st.session_state.get('auth_token')
+        if not token:
+            return None
+        cached = st.session_state.get('token_validation')
+        if cached and cached['token'] != token:
+            cached = None
+
+        try:
+            claims = get_token_verifier().verify(token)
+            verified = True
+        except TokenKeysUnavailable:
+            # Cannot check the signature here; rely on the remote check and its interval
+            try:
+                claims = unverified_claims(token)
+            except jwt.InvalidTokenError:
+                return None
+            verified = False
+        except jwt.ExpiredSignatureError:
+            # The client may have refreshed it; the remote check picks up the new token
+            return self._revalidate_session_token(cached, keep_on_error=False)
+        except jwt.InvalidTokenError:
+            return None
+
+        # Unverified claims may lack an expiry; such a token is always checked remotely
+        expires_at = claims.get('exp')
+        if cached and isinstance(expires_at, (int, float)):
+            now = time.time()
+            fresh = now - cached['validated_at'] < TOKEN_REVALIDATE_INTERVAL_SECONDS
+            if fresh and now < expires_at - TOKEN_REVALIDATE_BEFORE_EXPIRY_SECONDS:
+                return cached['user']
+        return self._revalidate_session_token(cached, keep_on_error=verified)
+
+    def _revalidate_session_token(self, cached, keep_on_error):
+        """
+        Check the session with Supabase and refresh the cached profile. With
+        keep_on_error (the token was verified locally), the cached profile is
+        kept if Supabase cannot be reached.
+        """
         try:
             session = self.supabase.client.auth.get_session()
             if not session or not session.access_token:
                 return None
-                
-            if session.access_token != st.session_state.get('auth_token'):
-                return None
-                
+
+            token = st.session_state.get('auth_token')
+            if session.access_token != token:
+                # A refreshed token is only adopted for the same user
+                if not cached or unverified_claims(session.access_token).get('sub') != cached['user'].get('id'):
+                    return None
+                token = session.access_token
+                st.session_state.auth_token = token
+
             user = self.supabase.client.auth.get_user()
             if not user or not user.user:
                 return None
-                
-            return self.get_user_data(user.user.id)
+
+            user_data = self.get_user_data(user.user.id)
         except Exception:
-            return None
+            return cached['user'] if cached and keep_on_error else None
+
+        if user_data:
+            self._cache_token_validation(token, user_data)
+        return user_data
+
+    def _cache_token_validation(self, token, user_data):
+        st.session_state.token_validation = {
+            'token': token,
+            'user': user_data,
+            'validated_at': time.time(),
+        }
     
     def get_user_data(self, user_id):
         """Get user data from database."""
@@ -226,85 +358,61 @@ class AuthService:
             return None
 
   
-    def _send_whatsapp_confirmation(self, patient_name, patient_phone, doctor_name, preferred_day):
+    def save_appointment(self, user_id, doctor_id, doctor_name,hospital_name, patient_name, patient_email, patient_phone, preferred_city, preferred_day, preferred_time, idempotency_key):
         """
-        Sends a WhatsApp confirmation message via Twilio (using the Sandbox).
+        Atomically claims a place in the doctor's slot and saves the appointment
+        (see book_appointment_slot in public/migrations/003_slot_reservations.sql).
+        The slot capacity is set in the database, and user_id must be the
+        signed-in user.
+        Returns (outcome, appointment): outcome is "booked", "duplicate" (this
+        idempotency key already booked; appointment is that booking), "full"
+        (the slot has no capacity left) or "error" (appointment is the message).
         """
-        if not self.twilio_client:
-            st.error("Twilio service is not configured. Cannot send WhatsApp.")
-            return
-
-        # --- FIX: Clean the phone number ---
-        phone_number_cleaned = (
-            patient_phone.replace(" ", "")
-            .replace("-", "")
-            .replace("(", "")
-            .replace(")", "")
-        )
-        # --- END FIX ---
-
-        if not phone_number_cleaned.startswith("+"):
-            st.error(f"Invalid phone number format for WhatsApp. Must be E.164 (+91...). You entered: {patient_phone}")
-            return
-
         try:
-          
-            message_body = (
-                f"Hi {patient_name}! Your appointment request with {doctor_name} "
-                f"for {preferred_day} has been received. "
-                "The clinic will contact you shortly to confirm."
-                "\n- CuraMate"
-            )
-
-            message = self.twilio_client.messages.create(
-                from_=self.twilio_from_number,
-                body=message_body,
-                to=f'whatsapp:{phone_number_cleaned}' # <-- Use cleaned number
-            )
-
-            print(f"WhatsApp message sent! SID: {message.sid}")
-
-        except Exception as e:
-            st.error(f"Twilio Error: Failed to send WhatsApp. {str(e)}")
-            pass
-
-    def save_appointment(self, user_id, doctor_id, doctor_name,hospital_name, patient_name, patient_email, patient_phone, preferred_city, preferred_day):
-        """Saves a new appointment request to the database."""
-        try:
-            appointment_data = {
-                "user_id": user_id,
-                "doctor_id": doctor_id,
-                "doctor_name": doctor_name,
-                "hospital_name": hospital_name,
-                "patient_name": patient_name,
-                "patient_email": patient_email,
-                "patient_phone": patient_phone,
-                "preferred_city": preferred_city,
-                "preferred_day": preferred_day,
-                "status": "Pending", # Set default status
-                "created_at": datetime.now().isoformat()
-            }
-            
-            result = self.supabase.table('appointments').insert(appointment_data).execute()
-            
-            if result.data:
-
-            
-                self._send_whatsapp_confirmation(
-                    patient_name=patient_name,
-                    patient_phone=patient_phone, 
-                    doctor_name=doctor_name,
-                    preferred_day=preferred_day
-                )
-                
-                return True
-            else:
-                st.error(f"Supabase insert returned no data: {result.error.message if result.error else 'Unknown error'}")
-                return False
+            result = self.supabase.client.rpc('book_appointment_slot', {
+                "p_idempotency_key": idempotency_key,
+                "p_user_id": user_id,
+                "p_doctor_id": doctor_id,
+                "p_doctor_name": doctor_name,
+                "p_hospital_name": hospital_name,
+                "p_patient_name": patient_name,
+                "p_patient_email": patient_email,
+                "p_patient_phone": patient_phone,
+                "p_preferred_city": preferred_city,
+                "p_day": preferred_day,
+                "p_slot": preferred_time,
+            }).execute()
+
+            if not result.data:
+                return "error", "Booking returned no result."
+            outcome = result.data[0]["outcome"]
+            appointment = result.data[0]["appointment"]
+
+            # The confirmation is queued with the appointment; the booking flow
+            # wakes the dispatcher instead of waiting for Twilio
+            return outcome, appointment
         except Exception as e:
             st.error(f"Error saving appointment: {str(e)}")
-            return False
+            return "error", str(e)
         
+    def get_booked_slots(self, doctor_ids, days):
+        """
+        Get the taken (doctor_id, day, slot, booked) counts for some doctors and
+        days, across all users: read from slot_reservations, because each user
+        can only see their own appointments.
+        """
+        try:
+            result = self.supabase.table('slot_reservations')\
+                .select('doctor_id, day, slot, booked')\
+                .in_('doctor_id', doctor_ids)\
+                .in_('day', days)\
+                .execute()
+            return True, result.data
+        except Exception as e:
+            # Logged rather than shown: this also runs on the booking pool, outside the script run
+            logger.warning("Error fetching booked slots: %s", e)
+            return False, []
+
     def get_user_appointments(self, user_id):
         """Get all appointments for a user, sorted by date."""
         try:
@@ -341,6 +449,21 @@ class AuthService:
             # The RLS error will be caught here and returned as False
             return False, str(e)
 
+    def save_medications(self, user_id, meds):
+        """
+        Saves all of a prescription's medications in one atomic request.
+        Returns (True, None), or (False, [{"row_index", "error"}]) with nothing saved.
+        """
+        current_time = datetime.now().isoformat()
+        rows, errors = [], []
+        for index, med in enumerate(meds):
+            if not med.get('name'):
+                errors.append({"row_index": index, "error": "Medication has no name"})
+            rows.append({**med, 'user_id': user_id, 'created_at': med.get('created_at') or current_time})
+        if errors:
+            return False, errors
+        return self._bulk_insert('medications', rows)
+
     def get_user_medications(self, user_id):
         """Fetches all active medications for a user."""
         try:
@@ -353,6 +476,52 @@ class AuthService:
         except Exception as e:
             return False, []
 
+    def get_linked_patient_ids(self, caregiver_user_id):
+        """Ids of the patients linked to a caregiver account."""
+        result = self.supabase.table('caregiver_links')\
+            .select('patient_user_id')\
+            .eq('caregiver_user_id', caregiver_user_id)\
+            .execute()
+        return [row['patient_user_id'] for row in result.data or []]
+
+    def find_report_analysis(self, user_id, content_hash, text_hash):
+        """
+        Find the most recent analysis of the same report by this user or, for
+        caregiver accounts, by one of their linked patients.
+        Returns (success, fingerprint row or None).
+        """
+        try:
+            owner_ids = [user_id] + self.get_linked_patient_ids(user_id)
+            filters = f"text_hash.eq.{text_hash}"
+            if content_hash:
+                filters = f"content_hash.eq.{content_hash},{filters}"
+            result = self.supabase.table('report_fingerprints')\
+                .select('session_id, analysis, created_at')\
+                .in_('user_id', owner_ids)\
+                .or_(filters)\
+                .order('created_at', desc=True)\
+                .limit(1)\
+                .execute()
+            return True, result.data[0] if result.data else None
+        except Exception as e:
+            return False, str(e)
+
+    def save_report_fingerprint(self, user_id, session_id, content_hash, text_hash, analysis):
+        """Record the fingerprint of an analyzed report so re-uploads can reuse it."""
+        try:
+            fingerprint_data = {
+                'user_id': user_id,
+                'session_id': session_id,
+                'content_hash': content_hash,
+                'text_hash': text_hash,
+                'analysis': analysis,
+                'created_at': datetime.now().isoformat()
+            }
+            self.supabase.table('report_fingerprints').insert(fingerprint_data, returning="minimal").execute()
+            return True, None
+        except Exception as e:
+            return False, str(e)
+
 
 
 
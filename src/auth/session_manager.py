@@ -14,9 +14,7 @@ class SessionManager:
             SessionManager.clear_session_state()
             st.session_state.session_initialized = True
             
-        if 'auth_service' not in st.session_state:
-            from auth.auth_service import AuthService
-            st.session_state.auth_service = AuthService()
+        SessionManager._init_services()
         init_analysis_state()
         
         # Check session timeout
@@ -38,6 +36,16 @@ class SessionManager:
                 st.error("Invalid session. Please log in again.")
                 st.rerun()
 
+    @staticmethod
+    def _init_services():
+        """Create the session's AuthService and the cached repository in front of it."""
+        if 'auth_service' not in st.session_state:
+            from auth.auth_service import AuthService
+            st.session_state.auth_service = AuthService()
+        if 'user_repository' not in st.session_state:
+            from auth.user_repository import UserRepository
+            st.session_state.user_repository = UserRepository(st.session_state.auth_service)
+
     @staticmethod
     def clear_session_state():
         """Clear all session state data."""
@@ -56,17 +64,17 @@ class SessionManager:
         """Create a new chat session."""
         if not SessionManager.is_authenticated():
             return False, "Not authenticated"
-        return st.session_state.auth_service.create_session(
+        return st.session_state.user_repository.create_session(
             st.session_state.user['id']
         )
     
     @staticmethod
-    def get_user_sessions():
-        """Get user's chat sessions."""
+    def get_user_sessions(pages=1):
+        """Get the user's newest `pages` pages of chat sessions."""
         if not SessionManager.is_authenticated():
             return False, []
-        return st.session_state.auth_service.get_user_sessions(
-            st.session_state.user['id']
+        return st.session_state.user_repository.get_user_sessions(
+            st.session_state.user['id'], pages
         )
     
     @staticmethod
@@ -74,7 +82,14 @@ class SessionManager:
         """Delete a chat session."""
         if not SessionManager.is_authenticated():
             return False, "Not authenticated"
-        return st.session_state.auth_service.delete_session(session_id)
+        return st.session_state.user_repository.delete_session(session_id)
+    
+    @staticmethod
+    def delete_sessions(session_ids=None, older_than_days=None):
+        """Delete several chat sessions: by id and/or older than a number of days."""
+        if not SessionManager.is_authenticated():
+            return False, "Not authenticated"
+        return st.session_state.user_repository.delete_sessions(session_ids, older_than_days)
     
     @staticmethod
     def logout():
@@ -86,10 +101,7 @@ class SessionManager:
     @staticmethod
     def login(email, password):
         """Handle user login."""
-        if 'auth_service' not in st.session_state:
-            from auth.auth_service import AuthService
-            st.session_state.auth_service = AuthService()
-            
+        SessionManager._init_services()
         return st.session_state.auth_service.sign_in(email, password)
     
     @staticmethod
@@ -97,6 +109,6 @@ class SessionManager:
         """Get user's appointments."""
         if not SessionManager.is_authenticated():
             return False, []
-        return st.session_state.auth_service.get_user_appointments(
+        return st.session_state.user_repository.get_user_appointments(
             st.session_state.user['id']
         )
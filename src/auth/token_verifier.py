@@ -0,0 +1,83 @@
+import threading
+
+import jwt
+import streamlit as st
+
+from config.app_config import JWKS_CACHE_SECONDS, TOKEN_CLOCK_SKEW_SECONDS
+
+# Algorithms Supabase Auth signs access tokens with
+SUPPORTED_ALGORITHMS = ("HS256", "RS256", "ES256")
+
+
+class TokenKeysUnavailable(Exception):
+    """No key to check the token's signature with (e.g. a legacy HS256 project without its secret)."""
+
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally: signature, expiry and audience.
+
+    Projects with asymmetric signing keys publish them at the auth JWKS
+    endpoint; they are fetched once and cached for JWKS_CACHE_SECONDS.
+    Projects that still sign with the shared secret need it configured as
+    SUPABASE_JWT_SECRET.
+    """
+
+    def __init__(self, supabase_url, api_key, jwt_secret=None):
+        self.jwt_secret = jwt_secret
+        self._jwks = jwt.PyJWKClient(
+            f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json",
+            cache_keys=True,
+            lifespan=JWKS_CACHE_SECONDS,
+            headers={"apikey": api_key},
+        )
+
+    def verify(self, token):
+        """
+        Return the token's claims. Raises jwt.ExpiredSignatureError or another
+        jwt.InvalidTokenError if the token is not valid, and TokenKeysUnavailable
+        if there is nothing to check the signature against.
+        """
+        algorithm = jwt.get_unverified_header(token).get("alg")
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+        if algorithm == "HS256":
+            if not self.jwt_secret:
+                raise TokenKeysUnavailable("SUPABASE_JWT_SECRET is not configured")
+            key = self.jwt_secret
+        else:
+            try:
+                key = self._jwks.get_signing_key_from_jwt(token).key
+            except jwt.PyJWKClientError as e:
+                raise TokenKeysUnavailable(str(e)) from e
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience="authenticated",
+            leeway=TOKEN_CLOCK_SKEW_SECONDS,
+            options={"require": ["exp", "sub"]},
+        )
+
+
+def unverified_claims(token):
+    """The token's claims without checking its signature; only for reading its expiry."""
+    return jwt.decode(token, options={"verify_signature": False})
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def get_token_verifier() -> TokenVerifier:
+    """Return the process-wide verifier, so every session shares the cached keys."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = TokenVerifier(
+                    st.secrets["SUPABASE_URL"],
+                    st.secrets["SUPABASE_KEY"],
+                    st.secrets.get("SUPABASE_JWT_SECRET"),
+                )
+    return _verifier
@@ -0,0 +1,127 @@
+import threading
+import time
+
+from config.app_config import USER_DATA_CACHE_TTL_SECONDS, SESSIONS_PAGE_SIZE, MESSAGES_PAGE_SIZE
+
+
+class UserRepository:
+    """
+    Read-through cache in front of AuthService for one signed-in user's data:
+    chat sessions, session messages, appointments and medications.
+
+    Reads are served from the cache for up to `ttl_seconds`; every write made
+    through the repository invalidates the entries it changes, so the user
+    always sees their own changes on the next rerun. Only successful reads are
+    cached. Lives in st.session_state, so it is cleared with the session.
+    """
+
+    def __init__(self, auth_service, ttl_seconds=USER_DATA_CACHE_TTL_SECONDS):
+        self.auth_service = auth_service
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # (kind, id[, page cursor]) -> (expires at, value)
+        self._lock = threading.Lock()  # Booking steps write from pool threads
+
+    def _read(self, key, fetch):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return True, entry[1]
+
+        success, value = fetch()
+        if success:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        return success, value
+
+    def _read_pages(self, kind, key_id, fetch, pages, page_size, oldest_first):
+        """
+        The first `pages` keyset pages of a newest-first listing, each cached
+        under its cursor. A listing holds pages * page_size rows when there may
+        be older ones to load.
+        """
+        rows, before = [], None
+        for _ in range(pages):
+            success, page = self._read((kind, key_id, before), lambda before=before: fetch(key_id, page_size, before))
+            if not success:
+                return False, page
+            rows = page + rows if oldest_first else rows + page
+            if len(page) < page_size:
+                break
+            oldest = page[0] if oldest_first else page[-1]
+            before = (oldest['created_at'], oldest['id'])
+        return True, rows
+
+    def invalidate(self, kind, key_id=None):
+        """Drop the cached entries (every page) for one id, or for every id of a kind when key_id is None."""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == kind and (key_id is None or key[1] == key_id):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # --- Chat sessions ---
+    def get_user_sessions(self, user_id, pages=1):
+        """The user's newest `pages` pages of sessions, newest first."""
+        return self._read_pages("sessions", user_id, self.auth_service.get_user_sessions,
+                                pages, SESSIONS_PAGE_SIZE, oldest_first=False)
+
+    def create_session(self, user_id, title=None):
+        result = self.auth_service.create_session(user_id, title)
+        self.invalidate("sessions", user_id)
+        return result
+
+    def delete_session(self, session_id):
+        result = self.auth_service.delete_session(session_id)
+        # The owning user is not known here; a signed-in session holds one user's lists
+        self.invalidate("sessions")
+        self.invalidate("messages", session_id)
+        return result
+
+    def delete_sessions(self, session_ids=None, older_than_days=None):
+        success, deleted = self.auth_service.delete_sessions(session_ids, older_than_days)
+        self.invalidate("sessions")
+        for session_id in deleted if success else []:
+            self.invalidate("messages", session_id)
+        return success, deleted
+
+    # --- Chat messages ---
+    def get_session_messages(self, session_id, pages=1):
+        """The session's newest `pages` pages of messages, in chronological order."""
+        return self._read_pages("messages", session_id, self.auth_service.get_session_messages,
+                                pages, MESSAGES_PAGE_SIZE, oldest_first=True)
+
+    def save_chat_message(self, session_id, content, role='user'):
+        result = self.auth_service.save_chat_message(session_id, content, role)
+        self.invalidate("messages", session_id)
+        return result
+
+    def save_chat_messages(self, session_id, messages):
+        result = self.auth_service.save_chat_messages(session_id, messages)
+        self.invalidate("messages", session_id)
+        return result
+
+    # --- Appointments ---
+    def get_user_appointments(self, user_id):
+        return self._read(("appointments", user_id), lambda: self.auth_service.get_user_appointments(user_id))
+
+    def save_appointment(self, user_id, *args, **kwargs):
+        result = self.auth_service.save_appointment(user_id, *args, **kwargs)
+        self.invalidate("appointments", user_id)
+        return result
+
+    # --- Medications ---
+    def get_user_medications(self, user_id):
+        return self._read(("medications", user_id), lambda: self.auth_service.get_user_medications(user_id))
+
+    def save_medication(self, user_id, med_data):
+        result = self.auth_service.save_medication(user_id, med_data)
+        self.invalidate("medications", user_id)
+        return result
+
+    def save_medications(self, user_id, meds):
+        result = self.auth_service.save_medications(user_id, meds)
+        self.invalidate("medications", user_id)
+        return result
@@ -1,9 +1,11 @@
 import streamlit as st
 from services.ai_service import generate_analysis
 from config.prompts import SPECIALIST_PROMPTS
-from utils.pdf_extractor import extract_text_from_pdf
+from utils.pdf_extractor import extract_report, extract_reports
+from utils.report_fingerprint import report_fingerprint
+from services.booking_service import get_specialties_from_risks, start_booking_prefetch
 from config.sample_data import SAMPLE_REPORT
-from config.app_config import MAX_UPLOAD_SIZE_MB
+from config.app_config import MAX_UPLOAD_SIZE_MB, MAX_BATCH_REPORTS
 import re
 from typing import List, Tuple
 
@@ -65,33 +67,58 @@ def parse_ai_response(content: str) -> Tuple[str, List[str]]:
 
 def get_report_contents(report_source):
     if report_source == "Upload PDF":
-        uploaded_file = st.file_uploader(
-            f"Upload blood report PDF (Max {MAX_UPLOAD_SIZE_MB}MB)", 
+        uploaded_files = st.file_uploader(
+            f"Upload blood report PDFs (Max {MAX_UPLOAD_SIZE_MB}MB each, up to {MAX_BATCH_REPORTS} files)", 
             type=['pdf'],
-            help=f"Maximum file size: {MAX_UPLOAD_SIZE_MB}MB. Only PDF files containing medical reports are supported"
+            accept_multiple_files=True,
+            help=f"Maximum file size: {MAX_UPLOAD_SIZE_MB}MB. Only PDF files containing medical reports are supported. "
+                 "Upload split reports (e.g. CBC, LFT and lipid panel) together to analyze them as one."
         )
-        if uploaded_file:
-            file_size_mb = uploaded_file.size / (1024 * 1024)  
-            if file_size_mb > MAX_UPLOAD_SIZE_MB:
-                st.error(f"File size ({file_size_mb:.1f}MB) exceeds the {MAX_UPLOAD_SIZE_MB}MB limit.")
-                return None
-                
-            if uploaded_file.type != 'application/pdf':
-                st.error("Please upload a valid PDF file.")
-                return None
-                
-            pdf_contents = extract_text_from_pdf(uploaded_file)
-            if isinstance(pdf_contents, str) and (
-                pdf_contents.startswith(("File size exceeds", "Invalid file type", "Error validating")) or
-                pdf_contents.startswith("The uploaded file") or
-                "error" in pdf_contents.lower()
-            ):
-                st.error(pdf_contents)
+        detect_tables = st.checkbox(
+            "Detect lab tables",
+            value=True,
+            help="Reads tabular reports row by row (test, result, unit, reference range) instead of as flowing text"
+        )
+        if uploaded_files:
+            if len(uploaded_files) > MAX_BATCH_REPORTS:
+                st.error(f"Please upload at most {MAX_BATCH_REPORTS} reports at a time.")
                 return None
+
+            for uploaded_file in uploaded_files:
+                file_size_mb = uploaded_file.size / (1024 * 1024)  
+                if file_size_mb > MAX_UPLOAD_SIZE_MB:
+                    st.error(f"{uploaded_file.name}: File size ({file_size_mb:.1f}MB) exceeds the {MAX_UPLOAD_SIZE_MB}MB limit.")
+                    return None
+                    
+                if uploaded_file.type != 'application/pdf':
+                    st.error(f"{uploaded_file.name}: Please upload a valid PDF file.")
+                    return None
+
+            mode = "table" if detect_tables else "text"
+            if len(uploaded_files) == 1:
+                try:
+                    pdf_contents, report_key = extract_report(uploaded_files[0], mode=mode)
+                except Exception as e:
+                    st.error(f"Error extracting text from PDF: {str(e)}")
+                    return None
+                if not report_key:
+                    st.error(pdf_contents)
+                    return None
+            else:
+                with st.spinner(f"Reading {len(uploaded_files)} reports..."):
+                    pdf_contents, report_key, errors = extract_reports(uploaded_files, mode=mode)
+                if errors:
+                    for error in errors:
+                        st.error(error)
+                    return None
+
+            # Only the key is kept across reruns; the text lives in the disk-backed report store
+            st.session_state.report_key = report_key
             with st.expander("View Extracted Report"):
                 st.text(pdf_contents)
             return pdf_contents
     else:
+        st.session_state.pop('report_key', None)
         with st.expander("View Sample Report"):
             st.text(SAMPLE_REPORT)
         return SAMPLE_REPORT
@@ -114,6 +141,21 @@ def handle_form_submission(patient_name, age, gender, pdf_contents):
         st.error("Please fill in all fields")
         return
 
+    # A re-uploaded report reuses its earlier analysis and does not count against the daily limit
+    # The built-in sample is analyzed fresh each time, never reused or recorded
+    is_sample = pdf_contents == SAMPLE_REPORT
+    content_hash, text_hash = report_fingerprint(st.session_state.get('report_key'), pdf_contents)
+    found, prior = (False, None) if is_sample else st.session_state.auth_service.find_report_analysis(
+        st.session_state.user['id'], content_hash, text_hash
+    )
+    request_message = (f"Analyzing report for patient: {patient_name}", 'user')
+    if found and prior:
+        content = prior['analysis'] + f"\n\n*Reused the analysis of an identical report from {prior['created_at'][:10]}*"
+        save_exchange([request_message, (content, 'assistant')])
+        handle_analysis_result(content, patient_name, age, gender)
+        st.rerun()
+        return
+
     can_analyze, error_msg = generate_analysis(None, None, check_only=True)
     if not can_analyze:
         st.error(error_msg)
@@ -121,11 +163,6 @@ def handle_form_submission(patient_name, age, gender, pdf_contents):
         return
 
     with st.spinner("Analyzing report..."):
-        st.session_state.auth_service.save_chat_message(
-            st.session_state.current_session['id'],
-            f"Analyzing report for patient: {patient_name}"
-        )
-        
         result = generate_analysis({
             "patient_name": patient_name,
             "age": age,
@@ -139,30 +176,52 @@ def handle_form_submission(patient_name, age, gender, pdf_contents):
                 model_info = f"\n\n*Analysis generated using {result['model_used']}*"
                 content += model_info
                 
-            st.session_state.auth_service.save_chat_message(
-                st.session_state.current_session['id'],
-                content,
-                role='assistant'
-            )
-            
-         
-            risk_category, health_risks = parse_ai_response(content)
-            
-            st.warning(f"DEBUG: Parsed Risk Category = '{risk_category}'")
-            st.info(f"DEBUG: Parsed Health Risks = {health_risks}")
+            # The request and the analysis are saved together, in one request
+            save_exchange([request_message, (content, 'assistant')])
+            if not is_sample:
+                st.session_state.auth_service.save_report_fingerprint(
+                    st.session_state.user['id'],
+                    st.session_state.current_session['id'],
+                    content_hash,
+                    text_hash,
+                    content
+                )
             
-            if "high" in risk_category.lower():
-                st.session_state.show_booking_form = True
-                st.session_state.health_risks_for_booking = health_risks
-                st.session_state.user_details_for_booking = {
-                    "name": patient_name,
-                    "age": age,
-                    "gender": gender
-                }
-            else:
-                st.error("DEBUG: `if 'high' in risk_category` was FALSE. Booking page not triggered.")
-
+            handle_analysis_result(content, patient_name, age, gender)
             st.rerun() 
         else:
+            save_exchange([request_message])
             st.error(result["error"])
             st.stop()
+
+def save_exchange(messages):
+    """Save (content, role) messages to the current session in one atomic write."""
+    success, errors = st.session_state.user_repository.save_chat_messages(
+        st.session_state.current_session['id'],
+        messages
+    )
+    if not success:
+        st.error("Failed to save the conversation: " + "; ".join(error['error'] for error in errors))
+    return success
+
+def handle_analysis_result(content, patient_name, age, gender):
+    """Parse the analysis and queue the booking flow for high-risk results."""
+    risk_category, health_risks = parse_ai_response(content)
+    
+    st.warning(f"DEBUG: Parsed Risk Category = '{risk_category}'")
+    st.info(f"DEBUG: Parsed Health Risks = {health_risks}")
+    
+    if "high" in risk_category.lower():
+        st.session_state.show_booking_form = True
+        st.session_state.health_risks_for_booking = health_risks
+        # Get the booking data ready while the user fills in the form
+        st.session_state.pop('booking_prefetch_started', None) # A new result starts a new booking
+        for specialty, _ in get_specialties_from_risks(health_risks):
+            start_booking_prefetch(specialty)
+        st.session_state.user_details_for_booking = {
+            "name": patient_name,
+            "age": age,
+            "gender": gender
+        }
+    else:
+        st.error("DEBUG: `if 'high' in risk_category` was FALSE. Booking page not triggered.")
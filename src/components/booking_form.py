@@ -1,9 +1,11 @@
 # components/booking_form.py
 
 import streamlit as st
-from services.booking_service import get_specialty_from_risks, parse_booking_request, find_and_book_appointment
+from services.booking_service import get_specialties_from_risks, parse_booking_request, find_and_book_appointment, get_ranked_doctors_page, format_cities, start_booking_prefetch, get_next_availability
+from config.app_config import ALTERNATIVES_PAGE_SIZE
 from services.google_calendar_service import add_appointment_to_calendar
 import re
+import uuid
 
 def show_booking_form():
     """
@@ -13,22 +15,49 @@ def show_booking_form():
     st.subheader("Book an Appointment")
     st.warning("Your report indicates high-risk factors. We recommend booking an appointment with a specialist.")
     
-    # 1. Determine the required specialty
+    # 1. Determine the required specialties
     health_risks = st.session_state.get('health_risks_for_booking', [])
-    specialty = get_specialty_from_risks(health_risks)
+    specialties = get_specialties_from_risks(health_risks)
     
-    if not specialty:
+    if not specialties:
         st.error("Could not determine the required medical specialty. Please contact support.")
         if st.button("Go Back"):
             del st.session_state.show_booking_form
             st.rerun()
         return
 
-    st.info(f"Your report suggests a consultation with a **{specialty}**.")
+    if len(specialties) == 1:
+        specialty = specialties[0][0]
+        st.info(f"Your report suggests a consultation with a **{specialty}**.")
+    else:
+        st.info("Your report suggests consultations with: " + ", ".join(f"**{name}**" for name, _ in specialties) + ".")
+        weights = dict(specialties)
+        specialty = st.radio(
+            "Which specialist would you like to book?",
+            list(weights),
+            format_func=lambda name: f"{name} ({weights[name]} related finding{'s' if weights[name] > 1 else ''})",
+            horizontal=True,
+        )
+    # Each specialty is booked separately: switching starts a fresh form
+    if st.session_state.get('booking_specialty') != specialty:
+        st.session_state.booking_specialty = specialty
+        st.session_state.booking_success = False
+        st.session_state.pop('booking_result', None)
+        st.session_state.pop('booking_alternatives', None)
+        st.session_state.pop('booking_idempotency_key', None)
+    # Started when the result came in; the prefetch is shared by every session
+    start_booking_prefetch(specialty)
+    availability = get_next_availability(specialty)
+    if availability:
+        openings = ", ".join(f"{city} ({slot['date']} {slot['time']})" for city, slot in sorted(availability.items(), key=lambda item: (item[1]['date'], item[1]['time'])))
+        st.caption(f"Earliest openings: {openings}")
     
     # 2. Initialize Success State
     if 'booking_success' not in st.session_state:
         st.session_state.booking_success = False
+    # One key per booking form: repeated or double-clicked submits book once
+    if 'booking_idempotency_key' not in st.session_state:
+        st.session_state.booking_idempotency_key = str(uuid.uuid4())
 
     # 3. Get patient details from session
     user_details = st.session_state.get('user_details_for_booking', {})
@@ -62,6 +91,7 @@ def show_booking_form():
                 st.error("Please fill in all fields.")
                 return
 
+            st.session_state.pop('booking_alternatives', None)
             with st.spinner("Analyzing your request and finding a doctor..."):
                 
                 # A. Parse NLP Request
@@ -81,7 +111,8 @@ def show_booking_form():
                     specialty=specialty,
                     parsed_request=parsed_request,
                     patient_details=patient_info,
-                    user_id=st.session_state.user['id']
+                    user_id=st.session_state.user['id'],
+                    idempotency_key=st.session_state.booking_idempotency_key
                 )
 
                 if result["success"]:
@@ -91,16 +122,17 @@ def show_booking_form():
                     st.rerun()
 
                 else:
-                    # --- Failure: Show Alternatives ---
-                    st.error(result["message"])
-                    
-                    if "alternatives" in result:
-                        st.info(f"Here are the top-ranked specialists in {parsed_request['city']} you can contact directly:")
-                        for doc in result["alternatives"][:3]: # Show top 3
-                            with st.expander(f"**{doc['Name']}** - {doc['hospital/clinic']}"):
-                                st.write(f"**Experience:** {doc['experience']}")
-                                st.write(f"**Fee:** ₹{doc['fee']}")
-                                st.write(f"**Working Days:** {doc['working days']}")
+                    # --- Failure: Keep the first page of alternatives across reruns ---
+                    st.session_state.booking_alternatives = {
+                        "message": result["message"],
+                        "cities": parsed_request["cities"],
+                        "dates": parsed_request["potential_dates"],
+                        "doctors": result.get("alternatives", []),
+                        "nearby": result.get("nearby", []),
+                        "page": 0,
+                    }
+
+        show_booking_alternatives(specialty)
     
     # --- SUCCESS SECTION (Visible after booking) ---
     if st.session_state.booking_success:
@@ -114,9 +146,9 @@ def show_booking_form():
             <h3 style="margin-top:0; color: #3B82F6;">Booking Confirmed</h3>
             <p><strong>Doctor:</strong> {result['doctor_name']}</p>
             <p><strong>Hospital:</strong> {result['hospital']}</p>
-            <p><strong>Date:</strong> {result['date']} (9:00 AM)</p>
+            <p><strong>Date:</strong> {result['date']} ({result.get('time', '09:00')})</p>
             <hr style="border-top: 1px solid #374151;">
-            <p style="font-size: 0.9em; color: #9CA3AF;">A WhatsApp confirmation has been sent to your phone.</p>
+            <p style="font-size: 0.9em; color: #9CA3AF;">A WhatsApp confirmation is on its way to your phone.</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -126,7 +158,8 @@ def show_booking_form():
                 success = add_appointment_to_calendar(
                     doctor_name=result['doctor_name'],
                     hospital=result['hospital'],
-                    date_str=result['date']
+                    date_str=result['date'],
+                    time_str=result.get('time', '09:00')
                 )
                 
                 if success:
@@ -134,6 +167,14 @@ def show_booking_form():
                 else:
                     st.error("Failed to add to calendar. Please check your credentials.")
         # -----------------------------------
+
+        if result.get('calendar_file'):
+            st.download_button(
+                "⬇️ Download Calendar File (.ics)",
+                data=result['calendar_file'],
+                file_name=f"appointment_{result['date']}.ics",
+                mime="text/calendar"
+            )
         
     # --- Navigation Footer ---
     if st.button("Go Back to Analysis"):
@@ -144,8 +185,53 @@ def show_booking_form():
             del st.session_state.booking_result
         if 'health_risks_for_booking' in st.session_state:
             del st.session_state.health_risks_for_booking
+        st.session_state.pop('booking_alternatives', None)
+        st.session_state.pop('booking_idempotency_key', None)
+        st.session_state.pop('booking_specialty', None)
+        st.session_state.pop('booking_prefetch_started', None)
         st.rerun()
 
+def show_booking_alternatives(specialty):
+    """Shows ranked doctors after a failed booking, one page at a time."""
+    alternatives = st.session_state.get('booking_alternatives')
+    if not alternatives:
+        return
+
+    st.error(alternatives["message"])
+    show_nearby_cities(specialty, alternatives.get("nearby", []))
+    if not alternatives["doctors"]:
+        return
+
+    st.info(f"Here are the top-ranked specialists in {format_cities(alternatives['cities'])} you can contact directly:")
+    for doc in alternatives["doctors"]:
+        with st.expander(f"**{doc['Name']}** - {doc['hospital/clinic']}"):
+            st.write(f"**Experience:** {doc['experience']}")
+            st.write(f"**Fee:** ₹{doc['fee']}")
+            st.write(f"**Working Days:** {doc['working days']}")
+
+    if alternatives.get("has_more", True) and st.button("Show more"):
+        next_page = get_ranked_doctors_page(specialty, alternatives["cities"], alternatives["page"] + 1,
+                                            dates=alternatives.get("dates", []))
+        alternatives["doctors"].extend(next_page)
+        alternatives["page"] += 1
+        alternatives["has_more"] = len(next_page) == ALTERNATIVES_PAGE_SIZE
+        st.rerun()
+
+def show_nearby_cities(specialty, nearby):
+    """Lists the closest cities that have the specialty, with their earliest free slot."""
+    if not nearby:
+        return
+
+    st.info(f"The nearest cities with a {specialty} specialist:")
+    for entry in nearby:
+        if entry.get("date"):
+            availability = f"earliest: {entry['doctor_name']} ({entry['hospital']}) on {entry['date']} at {entry['time']}"
+        elif entry.get("unknown"):
+            availability = "availability could not be checked"
+        else:
+            availability = "no free slots in the next 90 days"
+        st.write(f"**{entry['city']}** (~{entry['distance_km']} km, {entry['doctors']} doctors) - {availability}")
+
 
 
 
@@ -57,9 +57,18 @@ def show_medication_tab():
         col1, col2 = st.columns(2)
         with col1:
             if st.button("✅ Confirm & Save", type="primary", use_container_width=True):
-                # Save to Database first
-                for med in st.session_state.parsed_meds:
-                    st.session_state.auth_service.save_medication(st.session_state.user['id'], med)
+                # Save to Database first: every medication or, on any error, none
+                success, errors = st.session_state.user_repository.save_medications(
+                    st.session_state.user['id'], st.session_state.parsed_meds
+                )
+                if not success:
+                    for error in errors:
+                        if error.get('row_index') is None:
+                            st.error(f"Could not save medications: {error['error']}")
+                        else:
+                            med = st.session_state.parsed_meds[error['row_index']]
+                            st.error(f"Could not save {med.get('name') or 'a medication'}: {error['error']}")
+                    st.stop()
                 
                 st.session_state.med_save_success = True
                 st.session_state.last_saved_meds = st.session_state.parsed_meds
@@ -78,8 +87,8 @@ def show_medication_tab():
 def show_active_medications():
     # (Keep your existing show_active_medications function here)
     # ...
-    if 'auth_service' not in st.session_state: return
-    success, result = st.session_state.auth_service.get_user_medications(st.session_state.user['id'])
+    if 'user_repository' not in st.session_state: return
+    success, result = st.session_state.user_repository.get_user_medications(st.session_state.user['id'])
     if result:
         for med in result:
             st.markdown(f"💊 **{med['name']}** - {', '.join(med['alert_times'])}")
@@ -1,6 +1,6 @@
 import streamlit as st
 from auth.session_manager import SessionManager
-from config.app_config import ANALYSIS_DAILY_LIMIT
+from config.app_config import ANALYSIS_DAILY_LIMIT, SESSIONS_PAGE_SIZE, SESSION_CLEANUP_DEFAULT_DAYS
 from streamlit_option_menu import option_menu # <-- 1. Import
 import re # <-- 2. Import re for cleaning title
 
@@ -83,7 +83,8 @@ def show_session_list():
     if not (st.session_state.user and 'id' in st.session_state.user):
         return
 
-    success, sessions = SessionManager.get_user_sessions()
+    pages = st.session_state.get('session_pages', 1)
+    success, sessions = SessionManager.get_user_sessions(pages)
     if not success:
         st.error("Failed to load sessions")
         return
@@ -132,35 +133,62 @@ def show_session_list():
     )
     
     # 4. Handle session selection
-    if selected_title and session_map[selected_title] != st.session_state.get('current_session'):
+    # Compare ids: a session created this run holds more columns than the listed rows
+    current_session_id = (st.session_state.get('current_session') or {}).get('id')
+    if selected_title and session_map[selected_title]['id'] != current_session_id:
         st.session_state.current_session = session_map[selected_title]
         st.rerun()
 
+    # Only the newest pages are loaded; every page full means there may be older sessions
+    if len(sessions) >= pages * SESSIONS_PAGE_SIZE:
+        if st.button("Load older sessions", use_container_width=True):
+            st.session_state.session_pages = pages + 1
+            st.rerun()
+
     # --- NEW DELETE FUNCTIONALITY ---
     st.markdown("---")
     st.subheader("Manage Sessions")
     
-    # Let user select a session to delete
-    session_to_delete_title = st.selectbox(
-        "Select a session to delete",
-        options=[""] + session_titles,
-        index=0
+    # Let user select sessions to delete
+    titles_to_delete = st.multiselect(
+        "Select sessions to delete",
+        options=session_titles
     )
     
-    if session_to_delete_title:
-        session_to_delete = session_map[session_to_delete_title]
-        
-        if st.button(f"Delete '{session_to_delete_title}'", type="primary", use_container_width=True):
-            session_id = session_to_delete['id']
-            current_session_id = st.session_state.get('current_session', {}).get('id')
-            
-            success, error = SessionManager.delete_session(session_id)
-            if success:
-                if current_session_id and current_session_id == session_id:
-                    st.session_state.current_session = None
-                st.rerun()
-            else:
-                st.error(f"Failed to delete: {error}")
+    if titles_to_delete:
+        if st.button(f"Delete {len(titles_to_delete)} selected", type="primary", use_container_width=True):
+            delete_sessions(session_ids=[session_map[title]['id'] for title in titles_to_delete])
+
+    # Or clear out old sessions, including ones not loaded in the list
+    older_than_days = st.number_input(
+        "Delete sessions older than (days)",
+        min_value=1,
+        value=SESSION_CLEANUP_DEFAULT_DAYS,
+        step=1
+    )
+    # Sessions not loaded in the list are deleted too, so ask first; changing the age resets it
+    confirmed = st.checkbox(
+        f"Permanently delete every session older than {older_than_days} days, with its messages",
+        key=f"confirm_session_cleanup_{older_than_days}"
+    )
+    if st.button(f"Delete sessions older than {older_than_days} days", disabled=not confirmed, use_container_width=True):
+        delete_sessions(older_than_days=int(older_than_days))
+
+
+def delete_sessions(session_ids=None, older_than_days=None):
+    """Delete sessions (with their messages) in one call and refresh the sidebar."""
+    success, deleted = SessionManager.delete_sessions(session_ids, older_than_days)
+    if not success:
+        st.error(f"Failed to delete: {deleted}")
+        return
+
+    current_session_id = (st.session_state.get('current_session') or {}).get('id')
+    if current_session_id in deleted:
+        st.session_state.current_session = None
+    if not deleted:
+        st.info("No sessions to delete")
+        return
+    st.rerun()
 
 
 
@@ -7,8 +7,68 @@ APP_TAGLINE = "Discover a Healthier You with AI"
 MAX_UPLOAD_SIZE_MB = 20
 MAX_PDF_PAGES = 50
 SESSION_TIMEOUT_MINUTES = 30
+USER_DATA_CACHE_TTL_SECONDS = 60  # Sessions, messages, appointments and medications; writes invalidate
+SESSIONS_PAGE_SIZE = 20  # Sidebar sessions per "load older" page
+MESSAGES_PAGE_SIZE = 30  # Chat messages per "load older" page
+SESSION_CLEANUP_DEFAULT_DAYS = 30  # Preset for the sidebar's "delete older than" control
+
+# Session token validation: verified locally on every rerun, checked with Supabase occasionally
+TOKEN_REVALIDATE_INTERVAL_SECONDS = 600  # Catches sessions revoked elsewhere
+TOKEN_REVALIDATE_BEFORE_EXPIRY_SECONDS = 60
+TOKEN_CLOCK_SKEW_SECONDS = 30
+JWKS_CACHE_SECONDS = 3600
 ANALYSIS_DAILY_LIMIT = 15
 
+# Upload handling
+UPLOAD_SPOOL_THRESHOLD_MB = 2  # Larger uploads are spooled to disk and memory-mapped
+UPLOAD_CHUNK_SIZE_KB = 256
+REPORT_STORE_DIR = "curamate-reports"  # Under the system temp directory
+REPORT_STORE_MAX_MB = 500
+MAX_BATCH_REPORTS = 5  # Reports that can be uploaded and analyzed together
+BATCH_EXTRACTION_WORKERS = 4
+
+# PDF extraction settings
+EXTRACTION_CACHE_MAX_ENTRIES = 2000  # Cached pages, shared by all sessions
+OCR_MAX_WORKERS = 4
+OCR_PAGE_TIMEOUT_SECONDS = 20
+OCR_RESOLUTION = 300  # DPI used when rendering a page for OCR
+
+# Booking settings
+DOCTOR_STORE_BACKEND = "json"  # "json" (development) or "sqlite" (production)
+DOCTORS_FILE = "doctors.json"
+DOCTOR_STORE_PATH = "doctors.db"  # Built with scripts/generate_doctors.py
+APPOINTMENT_SLOTS = ["09:00", "09:30", "10:00", "10:30", "11:00", "11:30", "12:00", "12:30"]
+SLOT_CAPACITY = 1  # Patients per doctor per slot in the local slot book; the database's booking_settings.slot_capacity is authoritative
+ALTERNATIVES_PAGE_SIZE = 3  # Doctors suggested per page when no slot is free
+NEAREST_CITY_RESULTS = 3  # Nearby cities suggested when none of the requested cities has the specialty
+NEAREST_CITY_MAX_KM = 1500
+BOOKING_PARSER_MIN_CONFIDENCE = 0.75  # Below this the local parse is discarded and the LLM is asked
+BOOKING_PIPELINE_WORKERS = 8
+BOOKING_PREFETCH_DAYS = 14  # Bookings loaded ahead when a high-risk result arrives
+BOOKING_PREFETCH_DOCTORS_PER_CITY = 20
+BOOKING_PREFETCH_TTL_SECONDS = 300
+BOOKING_STEP_TIMEOUTS = {  # Seconds per booking step
+    "booked_slots": 5,
+    "save": 15,
+    "calendar_file": 5,
+    "notify": 2,
+}
+# Doctor ranking policy; override per deployment with [ranking_weights] in secrets
+RANKING_WEIGHTS = {
+    "experience": 0.45,
+    "fee": 0.25,
+    "availability": 0.30,  # Earliest requested date the doctor works
+}
+
+# WhatsApp notification outbox
+NOTIFICATION_BATCH_SIZE = 20  # Notifications claimed per round trip
+NOTIFICATION_LEASE_SECONDS = 120  # A claimed batch is retried by others after this
+NOTIFICATION_MAX_ATTEMPTS = 6
+NOTIFICATION_BACKOFF_BASE_SECONDS = 30  # Doubles after each failed attempt
+NOTIFICATION_BACKOFF_MAX_SECONDS = 3600
+NOTIFICATION_POLL_SECONDS = 30
+WHATSAPP_MESSAGES_PER_SECOND = 1  # Twilio's per-sender limit for WhatsApp
+
 # UI Settings
 PRIMARY_COLOR = "#64B5F6"
 SECONDARY_COLOR = "#1976D2"
@@ -23,7 +23,7 @@ def get_booking_prompt(user_text: str) -> str:
     Analyze the request and return ONLY a single, minified JSON object in the 
     following format:
     {{
-      "city": "The city the user mentioned (e.g., 'Delhi', 'Mumbai')",
+      "cities": ["Every city the user said they can visit (e.g., 'Delhi', 'Gurugram')"],
       "potential_dates": [
         "A list of all potential dates in 'YYYY-MM-DD' format.",
         "Translate relative terms like 'next Tuesday' or 'this weekend' 
@@ -34,13 +34,17 @@ def get_booking_prompt(user_text: str) -> str:
 
     Example 1:
     User text: "I'm in Delhi and am free next Tuesday or Wednesday."
-    JSON: {{"city":"Delhi","potential_dates":["{{ (today + delta to next Tues).isoformat() }}","{{ (today + delta to next Weds).isoformat() }}"]}}
+    JSON: {{"cities":["Delhi"],"potential_dates":["{{ (today + delta to next Tues).isoformat() }}","{{ (today + delta to next Weds).isoformat() }}"]}}
 
     Example 2:
     User text: "I live in Mumbai and can do any day this weekend."
-    JSON: {{"city":"Mumbai","potential_dates":["{{ (today + delta to Sat).isoformat() }}","{{ (today + delta to Sun).isoformat() }}"]}}
+    JSON: {{"cities":["Mumbai"],"potential_dates":["{{ (today + delta to Sat).isoformat() }}","{{ (today + delta to Sun).isoformat() }}"]}}
 
-    If you cannot find a city or a date, return "null" for that field.
+    Example 3:
+    User text: "Delhi or Gurugram, any day next week."
+    JSON: {{"cities":["Delhi","Gurugram"],"potential_dates":["<each day of next week, Monday to Sunday>"]}}
+
+    If you cannot find a city or a date, return an empty list for that field.
     Do not add any other text, explanation, or markdown.
     """
     
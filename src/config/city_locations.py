@@ -0,0 +1,29 @@
+# City-centre coordinates (latitude, longitude) for every city the doctor
+# directory can contain; used to suggest the nearest city with a specialist.
+# Keep in sync with CITIES in scripts/generate_doctors.py.
+CITY_COORDINATES = {
+    "Delhi": (28.6139, 77.2090),
+    "Mumbai": (19.0760, 72.8777),
+    "Bangalore": (12.9716, 77.5946),
+    "Chennai": (13.0827, 80.2707),
+    "Kolkata": (22.5726, 88.3639),
+    "Gurugram": (28.4595, 77.0266),
+    "Hyderabad": (17.3850, 78.4867),
+    "Pune": (18.5204, 73.8567),
+    "Ahmedabad": (23.0225, 72.5714),
+    "Jaipur": (26.9124, 75.7873),
+    "Lucknow": (26.8467, 80.9462),
+    "Chandigarh": (30.7333, 76.7794),
+    "Kochi": (9.9312, 76.2673),
+    "Indore": (22.7196, 75.8577),
+    "Bhopal": (23.2599, 77.4126),
+    "Nagpur": (21.1458, 79.0882),
+    "Patna": (25.5941, 85.1376),
+    "Bhubaneswar": (20.2961, 85.8245),
+    "Guwahati": (26.1445, 91.7362),
+    "Dehradun": (30.3165, 78.0322),
+    "Noida": (28.5355, 77.3910),
+    "Surat": (21.1702, 72.8311),
+    "Coimbatore": (11.0168, 76.9558),
+    "Visakhapatnam": (17.6868, 83.2185),
+}
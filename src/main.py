@@ -6,7 +6,7 @@ from components.sidebar import show_sidebar
 from components.analysis_form import show_analysis_form
 from components.booking_form import show_booking_form
 from components.medication_tab import show_medication_tab # <-- ADDED IMPORT
-from config.app_config import APP_NAME, APP_TAGLINE, APP_DESCRIPTION, APP_ICON
+from config.app_config import APP_NAME, APP_TAGLINE, APP_DESCRIPTION, APP_ICON, MESSAGES_PAGE_SIZE
 from streamlit_option_menu import option_menu
 
 # --- Page Config (Must be first Streamlit command) ---
@@ -51,11 +51,17 @@ def show_welcome_screen():
 
 # --- Updated Chat History (for Dark Theme) ---
 def show_chat_history():
-    success, messages = st.session_state.auth_service.get_session_messages(
-        st.session_state.current_session['id']
-    )
+    session_id = st.session_state.current_session['id']
+    message_pages = st.session_state.setdefault('message_pages', {})
+    pages = message_pages.get(session_id, 1)
+    success, messages = st.session_state.user_repository.get_session_messages(session_id, pages)
     
     if success:
+        # Only the newest pages are loaded; every page full means there may be older ones
+        if len(messages) >= pages * MESSAGES_PAGE_SIZE:
+            if st.button("Load older messages", key="load_older_messages"):
+                message_pages[session_id] = pages + 1
+                st.rerun()
         for msg in messages:
             if msg['role'] == 'user':
                 # User message
@@ -0,0 +1,285 @@
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.city_resolver import CITY_ALIASES
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+WEEKDAY_NAMES = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+MAX_RANGE_DAYS = 31
+
+_MONTH = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_WEEKDAY = r"(?:mon(?:day)?|tue(?:s(?:day)?)?|wed(?:nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)"
+_ORDINAL = r"(?:st|nd|rd|th)?"
+_TO = r"\s*(?:-|–|to|till|until|through)\s*"
+
+_DATE_TOKENS = re.compile(rf"""
+    (?P<iso>\b\d{{4}}-\d{{1,2}}-\d{{1,2}}\b)
+  | \b(?P<num_d>\d{{1,2}})[/.](?P<num_m>\d{{1,2}})(?:[/.](?P<num_y>\d{{2,4}}))?\b
+  | \b(?P<dm_d>\d{{1,2}}){_ORDINAL}(?:{_TO}(?P<dm_d2>\d{{1,2}}){_ORDINAL})?\s+(?:of\s+)?(?P<dm_m>{_MONTH})\b\.?(?:,?\s*(?P<dm_y>\d{{4}})\b)?
+  | \b(?P<md_m>{_MONTH})\.?\s+(?P<md_d>\d{{1,2}}){_ORDINAL}(?:{_TO}(?P<md_d2>\d{{1,2}}){_ORDINAL})?\b(?:,?\s*(?P<md_y>\d{{4}})\b)?
+  | \b(?P<rel>day\s+after\s+tomorrow|today|tonight|tomorrow)\b
+  | \bin\s+(?P<in_n>\d{{1,2}})\s+days?\b
+  | \b(?P<nth>first|1st|second|2nd|third|3rd|fourth|4th|last)\s+week\s+(?:of|in)\s+(?P<nth_m>{_MONTH})\b\.?(?:,?\s*(?P<nth_y>\d{{4}})\b)?
+  | \b(?:(?P<wk_mod>this|next|coming)\s+)?(?P<wk>weekend|week)\b
+  | \b(?:(?P<wd_mod>this|next|coming)\s+)?(?P<wd>{_WEEKDAY})\b(?:{_TO}(?P<wd2>{_WEEKDAY})\b)?
+""", re.VERBOSE)
+
+# Text between two tokens that joins them into a list or a range
+_LIST_GAP = re.compile(r"^\s*(?:,|or|and|/|&|,\s*or|,\s*and)?\s*$")
+_RANGE_GAP = re.compile(rf"^{_TO}$")
+_BETWEEN = re.compile(r"\bbetween\s*$")
+# Text between weekdays and the week they are in: "tuesday next week", "next week, tuesday", "tuesday of next week"
+_WEEK_GAP = re.compile(r"^\s*(?:,|of(?:\s+the)?)?\s*$")
+# Words that change the meaning in ways the rules do not model
+_HEDGES = re.compile(r"\b(?:not|except|but|after|before|between|month|fortnight|maybe|around|asap|soon|earliest|whenever)\b")
+# Left over from a date phrase only partly understood, e.g. "within a week", "in november", "end of the week"
+_DATE_WORDS = re.compile(
+    r"\b(?:weeks?|days?|first|second|third|fourth|last|mid|early|late|end|beginning|within|"
+    r"january|february|march|april|june|july|august|sept?ember|october|november|december|"
+    r"jan|feb|apr|jun|jul|aug|sept?|oct|nov|dec)\b"
+)
+
+NTH_WEEK = {"first": 1, "1st": 1, "second": 2, "2nd": 2, "third": 3, "3rd": 3, "fourth": 4, "4th": 4, "last": -1}
+
+
+def _month(name: str) -> int:
+    return MONTHS[name[:3]]
+
+def _weekday(name: str) -> int:
+    return WEEKDAY_NAMES[name[:3]]
+
+def _next_monday(today: date) -> date:
+    return today + timedelta(days=7 - today.weekday())
+
+def _upcoming(today: date, weekday: int) -> date:
+    return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+def _day_in_next_week(today: date, weekday: int) -> date:
+    return _next_monday(today) + timedelta(days=weekday)
+
+def _weekday_date(today: date, weekday: int, modifier: Optional[str]) -> date:
+    """"next": in next calendar week; "this week": in the current one, even if past; else the next occurrence."""
+    if modifier == "next":
+        return _day_in_next_week(today, weekday)
+    if modifier == "this week":
+        return _next_monday(today) - timedelta(days=7 - weekday)
+    return _upcoming(today, weekday)
+
+def _calendar_date(day: int, month: int, year: Optional[int], today: date) -> Optional[date]:
+    """A day/month with an optional year; without one, the next such date from today."""
+    try:
+        if year is not None:
+            return date(year + 2000 if year < 100 else year, month, day)
+        candidate = date(today.year, month, day)
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+def _span(start: date, end: date) -> List[date]:
+    if end < start:
+        return []
+    return [start + timedelta(days=i) for i in range(min((end - start).days + 1, MAX_RANGE_DAYS))]
+
+def _weekday_span(first: int, last: int, modifier: Optional[str], today: date) -> List[date]:
+    """Weekdays from `first` to `last` (e.g. Mon-Fri), wrapping past Sunday if needed."""
+    days = [(first + i) % 7 for i in range((last - first) % 7 + 1)]
+    if modifier in ("next", "this week"):
+        return [_weekday_date(today, wd, modifier) for wd in days]
+    start = _upcoming(today, first)
+    return [start + timedelta(days=i) for i in range(len(days))]
+
+
+def _week_of_month(nth: int, month: int, year: Optional[int], today: date) -> List[date]:
+    """Days 1-7, 8-14, ... (or the last seven) of the month, this year's unless it is already over."""
+    if year is None:
+        year = today.year if month >= today.month else today.year + 1
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    if nth == -1:
+        return _span(next_month - timedelta(days=7), next_month - timedelta(days=1))
+    start = date(year, month, 1) + timedelta(days=7 * (nth - 1))
+    return _span(start, min(start + timedelta(days=6), next_month - timedelta(days=1)))
+
+def _weekday_weeks(text: str, matches: List[re.Match]) -> Dict[int, Optional[str]]:
+    """
+    Weekdays qualified by an adjacent "this/next week" ("tuesday or wednesday
+    next week"): maps each weekday token's index to "next" or "this week",
+    and the week token's index to None, as it adds no dates of its own.
+    """
+    weeks: Dict[int, Optional[str]] = {}
+    for i, match in enumerate(matches):
+        if match.group("wk") != "week" or not match.group("wk_mod"):
+            continue
+        week = "next" if match.group("wk_mod") == "next" else "this week"
+        for step in (-1, 1):
+            j, run = i + step, []
+            if not (0 <= j < len(matches) and matches[j].group("wd")):
+                continue
+            gap = text[matches[j].end():match.start()] if step < 0 else text[match.end():matches[j].start()]
+            if not _WEEK_GAP.match(gap):
+                continue
+            # Walk the list of weekdays joined by "or", "and", ","
+            while 0 <= j < len(matches) and matches[j].group("wd"):
+                run.append(j)
+                k = j + step
+                if not 0 <= k < len(matches):
+                    break
+                gap = text[matches[k].end():matches[j].start()] if step < 0 else text[matches[j].end():matches[k].start()]
+                if not _LIST_GAP.match(gap):
+                    break
+                j = k
+            weeks[i] = None
+            weeks.update((index, week) for index in run)
+            break
+    return weeks
+
+
+@lru_cache(maxsize=8)
+def _city_pattern(cities: frozenset) -> Tuple[re.Pattern, Dict[str, str]]:
+    names = {city.lower(): city for city in cities}
+    for alias, city in CITY_ALIASES.items():
+        if city.lower() in names:
+            names.setdefault(alias, names[city.lower()])
+    # Longest first, so "navi mumbai" wins over "mumbai"
+    alternation = "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b"), names
+
+
+def _find_cities(text: str, cities: frozenset) -> Tuple[List[str], List[Tuple[int, int]]]:
+    if not cities:
+        return [], []
+    pattern, names = _city_pattern(cities)
+    found, spans = [], []
+    for match in pattern.finditer(text):
+        city = names[match.group(0)]
+        if city not in found:
+            found.append(city)
+        spans.append(match.span())
+    return found, spans
+
+
+def _token_dates(match: re.Match, today: date, modifier: Optional[str]) -> Tuple[List[date], bool]:
+    """Dates for one token, and whether it is a single explicit date (a range endpoint)."""
+    g = match.groupdict()
+    if g["iso"]:
+        try:
+            return [date.fromisoformat("-".join(part.zfill(2) for part in g["iso"].split("-")))], True
+        except ValueError:
+            return [], False
+    if g["num_d"]:
+        day = _calendar_date(int(g["num_d"]), int(g["num_m"]), int(g["num_y"]) if g["num_y"] else None, today)
+        return ([day] if day else []), True
+    for prefix in ("dm", "md"):
+        if g[f"{prefix}_m"]:
+            month = _month(g[f"{prefix}_m"])
+            year = int(g[f"{prefix}_y"]) if g[f"{prefix}_y"] else None
+            start = _calendar_date(int(g[f"{prefix}_d"]), month, year, today)
+            if not start:
+                return [], False
+            if g[f"{prefix}_d2"]:
+                end = _calendar_date(int(g[f"{prefix}_d2"]), month, start.year, today)
+                return (_span(start, end) if end else []), False
+            return [start], True
+    if g["rel"]:
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1}.get(g["rel"], 2)
+        return [today + timedelta(days=offset)], False
+    if g["in_n"]:
+        return [today + timedelta(days=int(g["in_n"]))], False
+    if g["nth"]:
+        year = int(g["nth_y"]) if g["nth_y"] else None
+        return _week_of_month(NTH_WEEK[g["nth"]], _month(g["nth_m"]), year, today), False
+    if g["wk"]:
+        next_monday = _next_monday(today)
+        if g["wk"] == "week":
+            if g["wk_mod"] == "next":
+                return _span(next_monday, next_monday + timedelta(days=6)), False
+            return _span(today, next_monday - timedelta(days=1)), False
+        if g["wk_mod"] == "next":
+            return [next_monday + timedelta(days=5), next_monday + timedelta(days=6)], False
+        return [day for day in (_upcoming(today, 5), _upcoming(today, 6)) if day < next_monday], False
+    first = _weekday(g["wd"])
+    if g["wd2"]:
+        return _weekday_span(first, _weekday(g["wd2"]), modifier, today), False
+    return [_weekday_date(today, first, modifier)], False
+
+
+def parse_booking_text(text: str, known_cities: frozenset, today: Optional[date] = None) -> Tuple[Dict[str, Any], float]:
+    """
+    Rule-based parse of a booking request such as "Delhi, next Tuesday" or
+    "Mumbai or Pune, 27-29 Oct". Returns the same structure as the LLM parse,
+    {"cities": [...], "city": ..., "potential_dates": ["YYYY-MM-DD", ...]},
+    and a confidence between 0 and 1. Low confidence means the text had no
+    city or date, or had words (except, after, between, ...) or numbers the
+    rules do not understand, and the LLM should parse it instead.
+
+    "next <weekday>", "<weekday> next week" and "next weekend" mean the one
+    in next calendar week; "<weekday> this week" the one in the current week;
+    a bare or "this" weekday is its next occurrence from today. "Nth week of
+    <month>" is days 7N-6 to 7N of that month. A bare "week" and any other
+    date words left over ("within", "end", a month name) lower the confidence.
+    """
+    today = today or date.today()
+    lowered = " ".join((text or "").lower().split())
+
+    cities, consumed = _find_cities(lowered, known_cities)
+
+    dates: List[date] = []
+    matches = list(_DATE_TOKENS.finditer(lowered))
+    weeks = _weekday_weeks(lowered, matches)
+    modifier, previous, previous_start, previous_end = None, None, 0, 0
+    for index, match in enumerate(matches):
+        if match.group("wk") == "week" and not match.group("wk_mod"):
+            continue # "within a week", "the week after": left for the LLM
+        if index in weeks and weeks[index] is None:
+            consumed.append(match.span()) # The week of adjacent weekdays, already applied to them
+            continue
+        gap = lowered[previous_end:match.start()]
+        own_modifier = match.group("wd_mod")
+        if index in weeks:
+            modifier = weeks[index]
+        elif own_modifier:
+            modifier = own_modifier
+        elif not (match.group("wd") and previous is not None and _LIST_GAP.match(gap)):
+            modifier = None # "next Tuesday or Wednesday" carries "next" along the list
+
+        token_dates, endpoint = _token_dates(match, today, modifier)
+        if endpoint and previous is not None and previous[1]:
+            # "27 Oct to 2 Nov", "between 27/10 and 30/10"
+            between = _BETWEEN.search(lowered, 0, previous_start) if gap.strip() == "and" else None
+            if between or _RANGE_GAP.match(gap):
+                if token_dates and previous[0]:
+                    dates.extend(_span(previous[0][-1], token_dates[-1]))
+                consumed.append((previous_end, match.start()))
+                if between:
+                    consumed.append(between.span())
+                endpoint = False # A range end does not start another range
+        dates.extend(token_dates)
+        consumed.append(match.span())
+        previous, previous_start, previous_end = (token_dates, endpoint), match.start(), match.end()
+
+    leftover = list(lowered)
+    for start, end in consumed:
+        leftover[start:end] = " " * (end - start)
+    leftover = "".join(leftover)
+
+    upcoming = sorted({day for day in dates if day >= today})
+    confidence = 1.0 if cities and upcoming else 0.0
+    confidence -= 0.5 * len(_HEDGES.findall(leftover))
+    if _DATE_WORDS.search(leftover):
+        confidence -= 0.5 # Part of a date phrase was not understood
+    if re.search(r"\d", leftover):
+        confidence -= 0.5 # A number we could not place, e.g. "the 3rd"
+    if len(upcoming) < len(set(dates)):
+        confidence -= 0.25 # Some dates were in the past
+
+    parsed = {
+        "cities": cities,
+        "city": cities[0] if cities else None,
+        "potential_dates": [day.isoformat() for day in upcoming],
+    }
+    return parsed, max(confidence, 0.0)
@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import Executor, Future
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.doctor_directory import Doctor
+
+
+class BookingSnapshot:
+    """
+    Booking data for one specialty, computed ahead of the user's request:
+    every city's doctors and scoring columns, the best-ranked doctors per
+    city (whose bookings for `days` were loaded into the slot book), and
+    each city's earliest free (doctor, day, slot) from today.
+
+    Availability in it is advisory: it was true when the snapshot was built,
+    so re-check it against the slot book before showing a slot as free.
+    """
+
+    def __init__(self, specialty: str, days: List[date], buckets: Dict[str, Tuple[List[Doctor], Dict]],
+                 top_doctors: Dict[str, List[Doctor]], next_available: Dict[str, Optional[Tuple[Doctor, date, str]]]):
+        self.specialty = specialty
+        self.days = frozenset(days)
+        self.buckets = buckets  # Keyed by lowercase city
+        self.top_doctors = top_doctors
+        self.next_available = next_available
+        self._synced_ids = frozenset(doc.id for doctors in top_doctors.values() for doc in doctors)
+
+    def covers(self, dates: Iterable[date]) -> bool:
+        """Whether bookings on all these dates were loaded by the prefetch."""
+        dates = list(dates)
+        return bool(dates) and all(day in self.days for day in dates)
+
+    def unsynced(self, doctors: Iterable[Doctor], dates: Iterable[date]) -> List[Doctor]:
+        """The doctors whose bookings on these dates the prefetch did not load."""
+        if not self.covers(dates):
+            return list(doctors)
+        return [doc for doc in doctors if doc.id not in self._synced_ids]
+
+    def bucket(self, city: str) -> Optional[Tuple[List[Doctor], Dict]]:
+        return self.buckets.get(city.lower())
+
+
+class BookingPrefetchCache:
+    """
+    Process-wide snapshots by specialty. start() builds one in the background
+    unless a fresh one exists or is being built; get() never waits, so a
+    booking that arrives before the prefetch finishes just takes the normal
+    path.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Future]] = {}
+
+    def _fresh(self, entry: Optional[Tuple[float, Future]]) -> bool:
+        if entry is None:
+            return False
+        started, future = entry
+        if future.done() and future.exception() is not None:
+            return False
+        return time.monotonic() - started < self.ttl_seconds
+
+    def start(self, specialty: str, build: Callable[[], BookingSnapshot], executor: Executor) -> Future:
+        key = specialty.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if self._fresh(entry):
+                return entry[1]
+            future = executor.submit(build)
+            self._entries[key] = (time.monotonic(), future)
+            return future
+
+    def get(self, specialty: str) -> Optional[BookingSnapshot]:
+        entry = self._entries.get(specialty.lower())
+        if not self._fresh(entry) or not entry[1].done():
+            return None
+        return entry[1].result()
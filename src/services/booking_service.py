@@ -1,52 +1,55 @@
 import streamlit as st
 import json
 import re
+import heapq
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple
-from datetime import datetime
+from datetime import datetime, date
 
 from config.booking_prompts import get_booking_prompt
+from services.doctor_directory import Doctor, get_doctor_directory
+from services.doctor_schedule import first_available, get_slot_book
+from services.city_resolver import get_city_resolver
+from services.city_locator import get_city_locator
+from services.booking_parser import parse_booking_text
+from services.risk_specialties import get_specialties_from_risks
+from services.doctor_ranking import MergedRanking, RankedDoctors
+from services.doctor_scoring import column_bounds, doctor_columns, score_doctors
+from utils.task_graph import TaskGraph, TIMED_OUT
+from services.booking_prefetch import BookingPrefetchCache, BookingSnapshot
+from config.app_config import ALTERNATIVES_PAGE_SIZE, RANKING_WEIGHTS, NEAREST_CITY_RESULTS, NEAREST_CITY_MAX_KM, BOOKING_PARSER_MIN_CONFIDENCE
+from config.app_config import BOOKING_PIPELINE_WORKERS, BOOKING_STEP_TIMEOUTS
+from config.app_config import BOOKING_PREFETCH_DAYS, BOOKING_PREFETCH_TTL_SECONDS, BOOKING_PREFETCH_DOCTORS_PER_CITY
+from config.city_locations import CITY_COORDINATES
 
 from ics import Calendar, Event, DisplayAlarm
 from datetime import datetime, timedelta
 
-RISK_SPECIALTY_MAP = {
-    "anemia": "Hematology", "polycythemia": "Hematology", "leukemia": "Hematology",
-    "thrombocytopenia": "Hematology", "thrombocytosis": "Hematology",
-    "hepatitis": "Hepatology", "cirrhosis": "Hepatology", "fatty liver disease": "Hepatology",
-    "cholestasis": "Hepatology", "liver dysfunction": "Hepatology",
-    "diabetes": "Endocrinology", "thyroid disorders": "Endocrinology", "metabolic syndrome": "Endocrinology",
-    "hyperlipidemia": "Cardiology", "atherosclerosis": "Cardiology", "hypertension": "Cardiology",
-    "kidney disease": "Nephrology", "renal": "Nephrology", "creatinine": "Nephrology"
-}
-
-def load_doctors(filepath="doctors.json") -> List[Dict[str, Any]]:
-    """Loads the doctor JSON file."""
-    try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        st.error("`doctors.json` file not found.")
-        return []
-    except json.JSONDecodeError:
-        st.error("Error decoding `doctors.json`.")
-        return []
+logger = logging.getLogger(__name__)
 
-def get_specialty_from_risks(health_risks: List[str]) -> str | None:
-    """Finds the first matching specialty from a list of health risks."""
-    if not health_risks:
-        return None
-        
-    for risk in health_risks:
-        risk_lower = risk.lower().strip()
-        for keyword, specialty in RISK_SPECIALTY_MAP.items():
-            if keyword in risk_lower:
-                return specialty
-    return None
+# Runs independent booking steps concurrently; shared by every session
+_booking_pool = ThreadPoolExecutor(max_workers=BOOKING_PIPELINE_WORKERS, thread_name_prefix="booking")
+_prefetch_cache = BookingPrefetchCache(BOOKING_PREFETCH_TTL_SECONDS)
+
+def _known_cities() -> frozenset:
+    """Cities the local parser recognizes: the directory's plus every located city."""
+    try:
+        return get_doctor_directory().cities() | frozenset(CITY_COORDINATES)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return frozenset(CITY_COORDINATES)
 
 def parse_booking_request(user_prompt: str) -> Dict[str, Any] | None:
     """
-    Uses the ModelManager to parse the user's booking request.
+    Parses the user's booking request. Common phrasings ("Delhi, next Tuesday")
+    are handled by the local rule-based parser; the ModelManager is only
+    called when that parse is not confident.
     """
+    parsed, confidence = parse_booking_text(user_prompt, _known_cities())
+    if confidence >= BOOKING_PARSER_MIN_CONFIDENCE:
+        return parsed
+
     try:
         # Get the model manager from the analysis agent in session state
         if 'analysis_agent' not in st.session_state:
@@ -75,139 +78,463 @@ def parse_booking_request(user_prompt: str) -> Dict[str, Any] | None:
             return None
             
         parsed_json = json.loads(json_match.group(0))
+
+        # Accept both the list form and a single "city"
+        cities = parsed_json.get("cities") or []
+        if isinstance(cities, str):
+            cities = [cities]
+        if not cities and parsed_json.get("city"):
+            cities = [parsed_json["city"]]
+        cities = [city for city in cities if city and city != "null"]
         
-        if not parsed_json.get("city") or not parsed_json.get("potential_dates"):
+        if not cities or not parsed_json.get("potential_dates"):
             st.error("Could not find a city or available date in your request. Please be more specific (e.g., 'Delhi, next Tuesday').")
             return None
-            
+
+        parsed_json["cities"] = cities
+        parsed_json["city"] = cities[0]
         return parsed_json
 
     except Exception as e:
         st.error(f"Error parsing booking request: {e}")
         return None
 
-def _parse_experience(exp_str: str) -> int:
-    """Helper to convert '15 years' to 15."""
-    match = re.search(r"\d+", exp_str)
-    return int(match.group(0)) if match else 0
+def get_ranking_weights() -> Dict[str, float]:
+    """
+    Weights for the doctor scoring engine. A deployment can override any of
+    RANKING_WEIGHTS with a `[ranking_weights]` table in its secrets.
+    """
+    weights = dict(RANKING_WEIGHTS)
+    try:
+        weights.update(st.secrets.get("ranking_weights", {}))
+    except Exception:
+        pass # No secrets file
+    return weights
 
-def rank_doctors(doctors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def rank_doctors(doctors: List[Doctor], k: int | None = None, dates=()) -> List[Doctor]:
     """
-    Ranks doctors first by experience (descending), then by fee (ascending).
+    Ranks doctors by their weighted score (experience, fee, availability on
+    the given dates). With k, returns only the top k.
     """
-    return sorted(
-        doctors,
-        key=lambda doc: (
-            _parse_experience(doc.get("experience", "0")),  # Priority 1: Experience (High to Low)
-            -doc.get("fee", float('inf'))                   # Priority 2: Fee (Low to High)
-        ),
-        reverse=True # Reverses the experience, so we negate the fee
-    )
+    ranking = RankedDoctors(doctors, score_doctors(doctor_columns(doctors), get_ranking_weights(), dates))
+    return ranking.top(k) if k is not None else list(ranking)
+
+def _lookup_buckets(directory, specialty: str, cities: List[str]):
+    """The specialty's non-empty (doctors, columns) bucket in each city."""
+    buckets = [directory.bucket(specialty, city) for city in cities]
+    return [(doctors, columns) for doctors, columns in buckets if doctors]
+
+def _rank_buckets(buckets, dates=()):
+    """
+    A lazy ranking over the doctors in all buckets.
+    Each city bucket is scored separately against shared bounds, so scores are
+    comparable and the buckets can be k-way merged without building the union.
+    """
+    weights = get_ranking_weights()
+    if len(buckets) == 1:
+        doctors, columns = buckets[0]
+        return RankedDoctors(doctors, score_doctors(columns, weights, dates))
+
+    bounds = column_bounds([columns for _, columns in buckets])
+    return MergedRanking([
+        RankedDoctors(doctors, score_doctors(columns, weights, dates, bounds=bounds))
+        for doctors, columns in buckets
+    ])
+
+def _rank_candidates(directory, specialty: str, cities: List[str], dates=()):
+    """
+    Returns (ranking, candidates): a lazy ranking over the specialty's doctors
+    in all requested cities, plus the per-city candidate lists.
+    """
+    buckets = _lookup_buckets(directory, specialty, cities)
+    if not buckets:
+        return None, []
+    return _rank_buckets(buckets, dates), [doctors for doctors, _ in buckets]
+
+def get_ranked_doctors_page(specialty: str, cities: str | List[str], page: int, page_size: int = ALTERNATIVES_PAGE_SIZE,
+                            dates: List[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Returns one page of ranked doctors for a specialty in one or more cities,
+    for "show more" style listings. Only the requested pages are ranked.
+    Pass the request's dates ("YYYY-MM-DD") so later pages follow the same
+    ranking as the alternatives find_and_book_appointment returned.
+    """
+    try:
+        directory = get_doctor_directory()
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    if isinstance(cities, str):
+        cities = [cities]
+    cities, _ = resolve_cities(directory, cities)
+    ranking, candidates = _rank_candidates(directory, specialty, cities, _parse_dates(dates))
+    if not candidates:
+        return []
+    return [doc.to_dict() for doc in ranking.page(page, page_size)]
+
+def resolve_cities(directory, cities: List[str]) -> Tuple[List[str], List[Tuple[str, str | None]]]:
+    """
+    Maps parsed city names (aliases, typos, "New Delhi", "Gurgaon") onto the
+    directory's cities. Returns (resolved cities without duplicates,
+    [(unmatched name, nearest supported city or None)]).
+    """
+    resolver = get_city_resolver(directory.cities())
+    resolved, unmatched = [], []
+    for name in cities:
+        city, suggestion = resolver.resolve(name)
+        if city:
+            if city not in resolved:
+                resolved.append(city)
+        else:
+            unmatched.append((name, suggestion))
+    return resolved, unmatched
+
+def _unsupported_city_message(specialty: str, unmatched: List[Tuple[str, str | None]]) -> str:
+    names = format_cities([name for name, _ in unmatched])
+    suggestions = [suggestion for _, suggestion in unmatched if suggestion]
+    message = f"No {specialty} found in {names}."
+    if suggestions:
+        message += f" Did you mean {format_cities(list(dict.fromkeys(suggestions)))}?"
+    return message
+
+def format_cities(cities: List[str]) -> str:
+    """'Delhi', 'Delhi or Gurugram', 'Delhi, Noida or Gurugram'."""
+    if len(cities) <= 1:
+        return "".join(cities)
+    return f"{', '.join(cities[:-1])} or {cities[-1]}"
+
+def _parse_dates(date_strs: List[str]) -> List[date]:
+    """The valid "YYYY-MM-DD" dates, in order."""
+    dates = []
+    for date_str in date_strs:
+        try:
+            dates.append(datetime.strptime(date_str, "%Y-%m-%d").date())
+        except ValueError:
+            continue # Skip invalid dates from LLM
+    return dates
 
 def find_and_book_appointment(
     specialty: str,
     parsed_request: Dict[str, Any],
     patient_details: Dict[str, Any],
-    user_id: str
+    user_id: str,
+    idempotency_key: str | None = None
 ) -> Dict[str, Any]:
     """
     Orchestrates the new booking flow:
-    1. Filters doctors by city and specialty
-    2. Ranks them
-    3. Finds the first available match
-    4. Books the appointment
+    1. Resolves the requested cities and filters doctors by specialty in each
+    2. Scores them and merges the per-city rankings
+    3. Finds the first free slot via the schedule engine
+    4. Claims the slot and books the appointment in one atomic database call
+
+    Submits that repeat the same idempotency_key return the first booking.
     """
-    all_doctors = load_doctors()
-    if not all_doctors:
+    try:
+        directory = get_doctor_directory()
+    except FileNotFoundError:
+        st.error("`doctors.json` file not found.")
+        return {"success": False, "message": "Doctor database is empty."}
+    except json.JSONDecodeError:
+        st.error("Error decoding `doctors.json`.")
         return {"success": False, "message": "Doctor database is empty."}
         
-    city = parsed_request["city"]
-    potential_dates = parsed_request["potential_dates"] # List of "YYYY-MM-DD"
-    
-    # 1. Filter by specialty and city
-    filtered_doctors = [
-        doc for doc in all_doctors
-        if doc.get("Specialization", "").lower() == specialty.lower()
-        and doc.get("city", "").lower() == city.lower()
-    ]
+    appt_dates = _parse_dates(parsed_request["potential_dates"]) # List of "YYYY-MM-DD"
+
+    requested_cities = parsed_request.get("cities") or [parsed_request["city"]]
+    cities, unmatched = resolve_cities(directory, requested_cities)
+    if not cities:
+        return {
+            "success": False,
+            "message": _unsupported_city_message(specialty, unmatched),
+            "nearby": find_nearby_specialists(directory, specialty, requested_cities, appt_dates),
+        }
+    city_label = format_cities(cities)
+
+    # 1. Look up each city's bucket, from the prefetched snapshot when there is one
+    snapshot = _prefetch_cache.get(specialty)
+    if snapshot:
+        buckets = [bucket for bucket in map(snapshot.bucket, cities) if bucket]
+    else:
+        buckets = _lookup_buckets(directory, specialty, cities)
     
-    if not filtered_doctors:
-        return {"success": False, "message": f"No {specialty} found in {city}."}
-        
-    # 2. Rank the doctors
-    ranked_doctors = rank_doctors(filtered_doctors)
+    if not buckets:
+        return {
+            "success": False,
+            "message": f"No {specialty} found in {city_label}.",
+            "nearby": find_nearby_specialists(directory, specialty, cities, appt_dates),
+        }
     
-    # 3. Find first match
-    for date_str in sorted(potential_dates): # Check earliest date first
-        try:
-            appt_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            day_of_week = appt_date.strftime("%A").lower() # e.g., "monday"
-        except ValueError:
-            continue # Skip invalid dates from LLM
+    # 2. Score and merge the rankings while existing bookings are fetched
+    slot_book = get_slot_book()
+    candidates = [doc for doctors, _ in buckets for doc in doctors]
+    prepare = TaskGraph(_booking_pool)
+    prepare.add("rank", lambda: _rank_buckets(buckets, appt_dates))
+    # Only the doctors whose bookings for these dates the prefetch did not load are fetched.
+    # The step is optional so that its failure gets its own message below rather than the ranking's.
+    unsynced = snapshot.unsynced(candidates, appt_dates) if snapshot else candidates
+    if unsynced:
+        prepare.add("booked_slots", lambda: _sync_slot_book(slot_book, unsynced, appt_dates),
+                    timeout=BOOKING_STEP_TIMEOUTS["booked_slots"], optional=True)
+    prepared = prepare.run()
+    timings = {"prepare": prepared.timings()}
+    if not prepared.ok:
+        return {"success": False, "message": "Could not rank doctors for your request. Please try again."}
+    ranked_doctors = prepared.value("rank")
+    if unsynced and not prepared.value("booked_slots", False):
+        # Unknown bookings are not free slots: offering them would pick already taken times
+        return {"success": False, "message": "Could not check which slots are already booked. Please try again."}
 
-        for doctor in ranked_doctors:
-            doc_days = doctor.get("working days", "").lower()
-            
-            # Check if the doctor works on that day
-            if day_of_week in doc_days:
-                # Found a match! Book it.
-                booked = book_appointment(user_id, doctor, patient_details, date_str)
-                if booked:
-                    return {
-                        "success": True,
-                        "doctor_name": doctor["Name"],
-                        "hospital": doctor["hospital/clinic"],
-                        "date": date_str
-                    }
-                else:
-                    # Booking failed at the DB level
-                    return {"success": False, "message": "Found a doctor, but failed to save the appointment to the database."}
-            
-            # Handle "monday - friday"
-            if "monday - friday" in doc_days and day_of_week not in ["saturday", "sunday"]:
-                booked = book_appointment(user_id, doctor, patient_details, date_str)
-                if booked:
-                    return {
-                        "success": True,
-                        "doctor_name": doctor["Name"],
-                        "hospital": doctor["hospital/clinic"],
-                        "date": date_str
-                    }
-                else:
-                    return {"success": False, "message": "Found a doctor, but failed to save the appointment to the database."}
+    # 3. Find the best-scoring doctor with a free slot on one of the dates
+    idempotency_key = idempotency_key or str(uuid.uuid4())
+    while True:
+        match = first_available(ranked_doctors, appt_dates, slot_book)
+        if not match:
+            break
+        doctor, appt_date, slot = match
+        if not slot_book.reserve(doctor.id, appt_date, slot):
+            continue # Taken by a concurrent booking in this process; look again
+
+        # 4. Claim the slot; the calendar file is built alongside and the
+        # notification dispatcher woken once the booking is committed
+        date_str = appt_date.isoformat()
+        steps = TaskGraph(_booking_pool)
+        steps.add("save", lambda: book_appointment(user_id, doctor, patient_details, date_str, slot, idempotency_key),
+                  timeout=BOOKING_STEP_TIMEOUTS["save"],
+                  on_timeout=lambda saved, reserved=(doctor.id, appt_date, slot): _release_unclaimed(slot_book, reserved, saved))
+        steps.add("calendar_file", lambda: create_calendar_file(doctor.name, doctor.hospital, date_str, slot),
+                  timeout=BOOKING_STEP_TIMEOUTS["calendar_file"], optional=True)
+        steps.add("notify", _notify_booked, deps=["save"],
+                  timeout=BOOKING_STEP_TIMEOUTS["notify"], optional=True)
+        booked = steps.run()
+        timings[f"book {doctor.id} {date_str} {slot}"] = booked.timings()
+        logger.info("Booking timings: %s", timings)
+
+        if booked.steps["save"].status == TIMED_OUT:
+            # The claim may still commit; the idempotency key makes a resubmit safe
+            return {"success": False, "message": "Saving your appointment is taking longer than expected. Please submit again; you will not be booked twice."}
+        outcome, appointment = booked.value("save", ("error", None))
+        if outcome == "full":
+            continue # Another server filled the slot first; it stays taken locally too
+        if outcome in ("booked", "duplicate"):
+            calendar_file = booked.value("calendar_file")
+            if outcome == "duplicate":
+                slot_book.release(doctor.id, appt_date, slot) # Nothing was claimed this time
+                calendar_file = create_calendar_file(appointment["doctor_name"], appointment["hospital_name"],
+                                                     appointment["preferred_day"], appointment["preferred_time"])
+            return {
+                "success": True,
+                "doctor_name": appointment["doctor_name"],
+                "hospital": appointment["hospital_name"],
+                "date": appointment["preferred_day"],
+                "time": appointment["preferred_time"],
+                "duplicate": outcome == "duplicate",
+                "calendar_file": calendar_file,
+                "timings": timings
+            }
+        # Booking failed at the DB level
+        slot_book.release(doctor.id, appt_date, slot)
+        return {"success": False, "message": "Found a doctor, but failed to save the appointment to the database."}
 
     # If loop finishes with no match
     return {
         "success": False,
-        "message": f"No {specialty} in {city} was available on your preferred dates.",
-        "alternatives": ranked_doctors # Return ranked list
+        "message": f"No {specialty} in {city_label} was available on your preferred dates.",
+        # Only the first page goes into session state; more is fetched on demand
+        "alternatives": [doc.to_dict() for doc in ranked_doctors.top(ALTERNATIVES_PAGE_SIZE)]
     }
 
-def book_appointment(user_id: str, doctor: Dict[str, Any], patient_details: Dict[str, str], date_str: str) -> bool:
+def find_nearby_specialists(directory, specialty: str, cities: List[str], dates=()) -> List[Dict[str, Any]]:
+    """
+    For a request no doctor can serve, the closest cities (by great-circle
+    distance from any requested city) that have the specialty, nearest first,
+    each with its earliest free appointment on or after the requested dates.
+    """
+    locator = get_city_locator()
+    origins = [city for city in dict.fromkeys(locator.locate(name) for name in cities) if city]
+    if not origins:
+        return []
+    available = {city.lower(): city for city in directory.specialty_cities(specialty)}
+    requested = {city.lower() for city in origins}
+
+    nearby, seen = [], set()
+    # Each origin yields its neighbours in distance order; merge them lazily
+    for city, distance in heapq.merge(*(locator.nearest(origin) for origin in origins), key=lambda item: item[1]):
+        if distance > NEAREST_CITY_MAX_KM or len(nearby) >= NEAREST_CITY_RESULTS:
+            break
+        key = city.lower()
+        if key in seen or key in requested or key not in available:
+            continue
+        seen.add(key)
+        nearby.append(_earliest_in_city(directory, specialty, available[key], distance, dates))
+    return nearby
+
+def _earliest_in_city(directory, specialty: str, city: str, distance_km: float, dates) -> Dict[str, Any]:
+    """Earliest free slot among a city's specialists; ties go to the better-ranked doctor."""
+    doctors = rank_doctors(directory.find(specialty, city), dates=dates)
+    start = max([date.today(), min(dates)]) if dates else date.today()
+    slot_book = get_slot_book()
+    snapshot = _prefetch_cache.get(specialty)
+    unsynced = snapshot.unsynced(doctors, [start]) if snapshot else doctors
+    synced = _sync_slot_book(slot_book, unsynced, [start]) if unsynced else True
+
+    entry = {"city": city, "distance_km": round(distance_km), "doctors": len(doctors), "unknown": not synced}
+    best = _earliest_free_slot(slot_book, doctors, start) if synced else None
+    if best:
+        doctor, day, slot = best
+        entry.update(doctor_name=doctor.name, hospital=doctor.hospital, date=day.isoformat(), time=slot)
+    return entry
+
+def _earliest_free_slot(slot_book, doctors: List[Doctor], start: date):
+    """(doctor, day, slot) with the earliest free slot from `start`; ties go to the earlier doctor."""
+    best = None
+    for doctor in doctors:
+        found = slot_book.first_free_slot(doctor.id, doctor.weekday_mask, start)
+        if found and (best is None or found < best[1:]):
+            best = (doctor, *found)
+            if found[0] == start and found[1] == slot_book.slots[0]:
+                break # Cannot do better than the first slot on the first day
+    return best
+
+def start_booking_prefetch(specialty: str) -> None:
+    """
+    Called as soon as a high-risk result makes a booking likely. In the
+    background, loads the specialty's doctors in every city, their existing
+    bookings for the next BOOKING_PREFETCH_DAYS days and each city's next
+    availability, and warms the booking parser and the LLM connection, so
+    the booking itself needs no directory scan or bookings round trip.
+    Starts once per specialty per booking form, however often the form reruns.
+    """
+    started = st.session_state.setdefault('booking_prefetch_started', set())
+    if specialty in started:
+        return
+    started.add(specialty)
+    auth_service = st.session_state.get('auth_service')
+    agent = st.session_state.get('analysis_agent')
+    model_manager = agent.model_manager if agent else None
+    weights = get_ranking_weights()
+    _prefetch_cache.start(
+        specialty,
+        lambda: _build_booking_snapshot(specialty, weights, auth_service, model_manager),
+        _booking_pool
+    )
+
+def _build_booking_snapshot(specialty: str, weights, auth_service, model_manager) -> BookingSnapshot:
+    """Runs on the booking pool, so it must not touch st.session_state."""
+    if model_manager:
+        model_manager.warm_up()
+    directory = get_doctor_directory()
+    parse_booking_text("", _known_cities()) # Compiles the city matcher
+    get_city_resolver(directory.cities())
+
+    today = date.today()
+    days = [today + timedelta(days=offset) for offset in range(BOOKING_PREFETCH_DAYS)]
+    buckets, top_doctors = {}, {}
+    for city in sorted(directory.specialty_cities(specialty)):
+        doctors, columns = directory.bucket(specialty, city)
+        buckets[city.lower()] = (doctors, columns)
+        top_doctors[city] = RankedDoctors(doctors, score_doctors(columns, weights)).top(BOOKING_PREFETCH_DOCTORS_PER_CITY)
+
+    slot_book = get_slot_book()
+    if not _sync_slot_book(slot_book, [doc for doctors in top_doctors.values() for doc in doctors], days, auth_service):
+        # Bookings unknown: no next availability, and no days covered, so booking syncs every candidate itself
+        return BookingSnapshot(specialty, [], buckets, top_doctors, {})
+    next_available = {city: _earliest_free_slot(slot_book, doctors, today) for city, doctors in top_doctors.items()}
+    return BookingSnapshot(specialty, days, buckets, top_doctors, next_available)
+
+def get_next_availability(specialty: str) -> Dict[str, Dict[str, str]]:
     """
-    "Books" an appointment by saving it to the database via the AuthService.
-    Returns True on success, False on failure.
+    Each city's earliest opening from the prefetch, if it has finished:
+    {city: {doctor_name, date, time}}. Openings are re-checked against the
+    slot book, as slots may have been taken since the prefetch.
+    """
+    snapshot = _prefetch_cache.get(specialty)
+    if not snapshot:
+        return {}
+    slot_book = get_slot_book()
+    today = date.today()
+    availability = {}
+    for city, found in snapshot.next_available.items():
+        if found and (found[1] < today or slot_book.free_slot(found[0].id, found[0].weekday_mask, found[1]) != found[2]):
+            found = _earliest_free_slot(slot_book, snapshot.top_doctors[city], today)
+        if found:
+            doctor, day, slot = found
+            availability[city] = {"doctor_name": doctor.name, "date": day.isoformat(), "time": slot}
+    return availability
+
+def _sync_slot_book(slot_book, doctors: List[Doctor], dates, auth_service=None) -> bool:
+    """
+    Refresh the slot book with existing bookings for these doctors and dates.
+    False when the bookings could not be read, so the slot book does not know them.
+    """
+    date_mask = 0
+    for day in dates:
+        date_mask |= 1 << day.weekday()
+    doctor_ids = [doc.id for doc in doctors if doc.weekday_mask & date_mask]
+    if auth_service is None:
+        auth_service = st.session_state.get('auth_service')
+    if not doctor_ids:
+        return True
+    if auth_service is None:
+        return False
+
+    success, rows = auth_service.get_booked_slots(
+        doctor_ids, [day.isoformat() for day in dates]
+    )
+    if not success:
+        return False
+
+    booked = {}
+    for row in rows:
+        booked.setdefault((row["doctor_id"], row["day"]), []).extend([row["slot"]] * row["booked"])
+    for doctor_id in doctor_ids:
+        for day in dates:
+            slot_book.set_day(doctor_id, day, booked.get((doctor_id, day.isoformat()), []))
+    return True
+
+def _release_unclaimed(slot_book, reserved: Tuple[str, date, str], saved: Tuple[str, Any] | None) -> None:
+    """
+    Once a save that timed out has ended, give back its local reservation
+    unless the slot was claimed (booked, or found full on the server).
+    """
+    outcome = saved[0] if saved else "error"
+    if outcome not in ("booked", "full"):
+        slot_book.release(*reserved)
+
+def _notify_booked(saved: Tuple[str, Any]) -> bool:
+    """Wake the WhatsApp outbox dispatcher so a new booking's confirmation goes out now."""
+    outcome, _ = saved
+    dispatcher = getattr(st.session_state.get('auth_service'), 'notification_dispatcher', None)
+    if outcome != "booked" or not dispatcher:
+        return False
+    dispatcher.wake()
+    return True
+
+def book_appointment(user_id: str, doctor: Doctor, patient_details: Dict[str, str], date_str: str, time_str: str, idempotency_key: str) -> Tuple[str, Any]:
+    """
+    Books an appointment through the AuthService's atomic slot claim (via the
+    user's repository, so their cached appointment list is refreshed).
+    Returns (outcome, appointment) as described in AuthService.save_appointment.
     """
     try:
-        success = st.session_state.auth_service.save_appointment(
+        return st.session_state.user_repository.save_appointment(
             user_id=user_id,
-            doctor_id=doctor.get("id"),
-            doctor_name=doctor.get("Name"),
-            hospital_name=doctor.get("hospital/clinic"), 
+            doctor_id=doctor.id,
+            doctor_name=doctor.name,
+            hospital_name=doctor.hospital, 
             patient_name=patient_details.get("name"),
             patient_email=patient_details.get("email"),
             patient_phone=patient_details.get("phone"),
-            preferred_city=doctor.get("city"), # Use doctor's city
-            preferred_day=date_str # Use the specific date
+            preferred_city=doctor.city, # Use doctor's city
+            preferred_day=date_str, # Use the specific date
+            preferred_time=time_str,
+            idempotency_key=idempotency_key
         )
-        return success
     except Exception as e:
         st.error(f"Failed to call save_appointment: {e}")
-        return False
+        return "error", str(e)
     
 
 
-def create_calendar_file(doctor_name: str, hospital: str, date_str: str) -> str:
+def create_calendar_file(doctor_name: str, hospital: str, date_str: str, time_str: str = "09:00") -> str:
     """
     Creates the content for an .ics calendar file.
     """
@@ -217,7 +544,7 @@ def create_calendar_file(doctor_name: str, hospital: str, date_str: str) -> str:
         final_hospital = hospital or "Clinic Appointment"
         
       
-        appt_datetime = datetime.strptime(f"{date_str} 09:00", "%Y-%m-%d %H:%M")
+        appt_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
         
         
         c = Calendar()
@@ -0,0 +1,98 @@
+import heapq
+import math
+import threading
+from itertools import count
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.city_locations import CITY_COORDINATES
+from services.city_resolver import CityResolver
+
+EARTH_RADIUS_KM = 6371.0
+
+Point = Tuple[float, float, float]
+
+
+def _unit_vector(lat: float, lon: float) -> Point:
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+def _chord_to_km(chord_sq: float) -> float:
+    """Great-circle distance for a squared chord length between unit vectors."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+class _Node:
+    __slots__ = ("point", "name", "axis", "left", "right")
+
+    def __init__(self, point: Point, name: str, axis: int, left, right):
+        self.point, self.name, self.axis, self.left, self.right = point, name, axis, left, right
+
+
+class CityLocator:
+    """
+    KD-tree over city coordinates, stored as 3D unit vectors so straight-line
+    (chord) distance orders cities exactly like great-circle distance.
+
+    nearest() walks the tree best-first and yields cities in increasing
+    distance, so a caller can filter (e.g. "has a Nephrologist") and stop
+    after the first few matches without ranking every city.
+    """
+
+    def __init__(self, coordinates: Dict[str, Tuple[float, float]]):
+        self._points = {name: _unit_vector(lat, lon) for name, (lat, lon) in coordinates.items()}
+        self._root = self._build(list(self._points.items()), 0)
+        self._resolver = CityResolver(coordinates)
+
+    def _build(self, items: List[Tuple[str, Point]], depth: int) -> Optional[_Node]:
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[1][axis])
+        middle = len(items) // 2
+        name, point = items[middle]
+        return _Node(point, name, axis,
+                     self._build(items[:middle], depth + 1),
+                     self._build(items[middle + 1:], depth + 1))
+
+    def locate(self, name: str) -> Optional[str]:
+        """Canonical name of a known city (aliases and typos allowed), or None."""
+        city, _ = self._resolver.resolve(name)
+        return city
+
+    def distance_km(self, a: str, b: str) -> float:
+        pa, pb = self._points[a], self._points[b]
+        return _chord_to_km(sum((x - y) ** 2 for x, y in zip(pa, pb)))
+
+    def nearest(self, city: str) -> Iterator[Tuple[str, float]]:
+        """Yield (other city, distance in km) in increasing distance from `city`."""
+        query = self._points[city]
+        tie = count()
+        # Entries are (lower bound on squared distance, tie, node or None, name)
+        heap = [(0.0, next(tie), self._root, None)] if self._root else []
+        while heap:
+            bound, _, node, name = heapq.heappop(heap)
+            if node is None:
+                if name != city:
+                    yield name, _chord_to_km(bound)
+                continue
+            exact = sum((x - y) ** 2 for x, y in zip(query, node.point))
+            heapq.heappush(heap, (exact, next(tie), None, node.name))
+            diff = query[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            if near:
+                heapq.heappush(heap, (bound, next(tie), near, None))
+            if far:
+                heapq.heappush(heap, (max(bound, diff * diff), next(tie), far, None))
+
+
+_locator = None
+_locator_lock = threading.Lock()
+
+def get_city_locator() -> CityLocator:
+    """Return the process-wide locator over the bundled city coordinates."""
+    global _locator
+    if _locator is None:
+        with _locator_lock:
+            if _locator is None:
+                _locator = CityLocator(CITY_COORDINATES)
+    return _locator
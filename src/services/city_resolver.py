@@ -0,0 +1,138 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Common alternate names and spellings, mapped to the names used in the directory
+CITY_ALIASES = {
+    "bengaluru": "Bangalore", "banglore": "Bangalore", "blr": "Bangalore",
+    "gurgaon": "Gurugram", "ggn": "Gurugram",
+    "new delhi": "Delhi", "delhi ncr": "Delhi", "ncr": "Delhi",
+    "bombay": "Mumbai", "navi mumbai": "Mumbai",
+    "madras": "Chennai",
+    "calcutta": "Kolkata",
+}
+
+# A typo is auto-corrected only within max_edits() of a city and at least this trigram similarity
+MIN_SIMILARITY = 0.2
+# Below this a name is not even suggested
+MIN_SUGGESTION_SIMILARITY = 0.15
+MAX_EDIT_DISTANCE = 2
+# Names (and aliases like "blr") this short are only ever matched exactly
+SHORT_NAME_LENGTH = 3
+
+
+def _normalize(name: str) -> str:
+    name = re.sub(r"[^a-z ]", " ", (name or "").lower())
+    return " ".join(name.split())
+
+def _trigrams(name: str) -> Set[str]:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_edits(name: str) -> int:
+    """Typo budget for a name: none up to SHORT_NAME_LENGTH letters, 1 up to 6, then MAX_EDIT_DISTANCE."""
+    if len(name) <= SHORT_NAME_LENGTH:
+        return 0
+    return 1 if len(name) <= 6 else MAX_EDIT_DISTANCE
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance counting a swap of adjacent letters as one edit ("dehli"),
+    giving up early once it exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before and i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class CityResolver:
+    """
+    Resolves a free-text city name to a canonical directory city.
+
+    Exact names and aliases are a dict lookup. Anything else goes through a
+    trigram index over the directory's cities and their longer aliases;
+    candidates sharing a trigram are scored by Jaccard similarity, with edit
+    distance as a tie-breaker. A name is auto-corrected only when it is
+    within its length's typo budget (max_edits) and similar enough;
+    otherwise the best candidate is only offered as a suggestion.
+    """
+
+    def __init__(self, cities: Iterable[str], aliases: Dict[str, str] = CITY_ALIASES):
+        self._canonical: Dict[str, str] = {}
+        for city in cities:
+            self._canonical[_normalize(city)] = city
+        for alias, city in aliases.items():
+            # Only aliases pointing at cities we actually have
+            if _normalize(city) in self._canonical:
+                self._canonical[_normalize(alias)] = self._canonical[_normalize(city)]
+
+        self._index: Dict[str, List[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        for key in self._canonical:
+            if len(key) <= SHORT_NAME_LENGTH:
+                continue # "ggn" would pull "goa" towards Gurugram
+            grams = _trigrams(key)
+            self._grams[key] = grams
+            for gram in grams:
+                self._index.setdefault(gram, []).append(key)
+
+    def _best_match(self, name: str, limit: int) -> Tuple[Optional[str], float, int]:
+        grams = _trigrams(name)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for key in self._index.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        best, best_similarity, best_distance = None, 0.0, limit + 1
+        for key, count in shared.items():
+            similarity = count / len(grams | self._grams[key])
+            distance = _edit_distance(name, key, limit)
+            if (similarity, -distance) > (best_similarity, -best_distance):
+                best, best_similarity, best_distance = key, similarity, distance
+        return best, best_similarity, best_distance
+
+    def resolve(self, name: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Returns (city, suggestion). `city` is the canonical city when the name
+        is known, an alias, or a close enough typo; otherwise it is None and
+        `suggestion` is the nearest supported city, if any looks related.
+        """
+        key = _normalize(name)
+        if not key:
+            return None, None
+        if key in self._canonical:
+            return self._canonical[key], None
+
+        limit = max_edits(key)
+        best, similarity, distance = self._best_match(key, limit)
+        if best is None or similarity < MIN_SUGGESTION_SIMILARITY:
+            return None, None
+        if distance <= limit and similarity >= MIN_SIMILARITY:
+            return self._canonical[best], None
+        return None, self._canonical[best]
+
+
+_resolver = None
+_resolver_cities = None
+_resolver_lock = threading.Lock()
+
+def get_city_resolver(cities: frozenset) -> CityResolver:
+    """Return a resolver for the directory's current cities, rebuilt only when they change."""
+    global _resolver, _resolver_cities
+    if cities != _resolver_cities:
+        with _resolver_lock:
+            if cities != _resolver_cities:
+                _resolver = CityResolver(cities)
+                _resolver_cities = cities
+    return _resolver
@@ -0,0 +1,173 @@
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Tuple, Any
+from config.app_config import DOCTORS_FILE, DOCTOR_STORE_BACKEND, DOCTOR_STORE_PATH
+from services.doctor_schedule import parse_working_days
+from services.doctor_scoring import doctor_columns
+
+
+def _parse_experience(exp_str: str) -> int:
+    """Helper to convert '15 years' to 15."""
+    match = re.search(r"\d+", exp_str or "")
+    return int(match.group(0)) if match else 0
+
+
+class Doctor:
+    """A single directory entry with its derived fields pre-computed."""
+
+    __slots__ = (
+        "id", "name", "specialty", "qualification", "experience",
+        "experience_years", "hospital", "city", "fee", "working_days", "weekday_mask"
+    )
+
+    def __init__(self, record: Dict[str, Any]):
+        """Build from a record in the `doctors.json` shape."""
+        self.id = record.get("id")
+        self.name = record.get("Name")
+        self.specialty = record.get("Specialization", "")
+        self.qualification = record.get("qualification", "")
+        self.experience = record.get("experience", "0")
+        self.experience_years = _parse_experience(self.experience)
+        self.hospital = record.get("hospital/clinic")
+        self.city = record.get("city", "")
+        self.fee = record.get("fee", float('inf'))
+        self.working_days = record.get("working days", "")
+        self.weekday_mask = parse_working_days(self.working_days)
+
+    @classmethod
+    def from_row(cls, row) -> "Doctor":
+        """Build from a storage row whose columns follow __slots__ order (no re-parsing)."""
+        doctor = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, row):
+            setattr(doctor, name, value)
+        return doctor
+
+    def to_row(self) -> Tuple:
+        """Return the fields in __slots__ order, the inverse of from_row."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record in the original `doctors.json` shape (used by the UI)."""
+        return {
+            "id": self.id,
+            "Name": self.name,
+            "Specialization": self.specialty,
+            "qualification": self.qualification,
+            "experience": self.experience,
+            "hospital/clinic": self.hospital,
+            "city": self.city,
+            "fee": self.fee,
+            "working days": self.working_days,
+        }
+
+
+class DoctorDirectory:
+    """
+    JSON-backed, in-memory doctor directory indexed by (specialty, city).
+    Used in development; see services.doctor_store for the SQLite backend.
+    Loaded once per process and reloaded automatically when the
+    source file's modification time changes.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._doctors: List[Doctor] = []
+        self._index: Dict[Tuple[str, str], List[Doctor]] = {}
+        self._columns: Dict[Tuple[str, str], Dict] = {}
+        self._cities: frozenset = frozenset()
+        self._specialty_cities: Dict[str, frozenset] = {}
+        self._reload_if_changed()
+
+    def _reload_if_changed(self):
+        mtime = os.stat(self.filepath).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return  # Another thread reloaded while we waited
+            with open(self.filepath, 'r') as f:
+                doctors = [Doctor(record) for record in json.load(f)]
+
+            index: Dict[Tuple[str, str], List[Doctor]] = {}
+            for doctor in doctors:
+                index.setdefault((doctor.specialty.lower(), doctor.city.lower()), []).append(doctor)
+            # Keep every bucket pre-sorted by experience, then fee, then id; the
+            # scoring engine breaks score ties by this order
+            for bucket in index.values():
+                bucket.sort(key=lambda doc: (-doc.experience_years, doc.fee, doc.id))
+
+            # Swap in the new data in one step so readers never see a partial index
+            self._doctors, self._index, self._columns = doctors, index, {}
+            self._cities = frozenset(doctor.city for doctor in doctors if doctor.city)
+            specialty_cities: Dict[str, set] = {}
+            for doctor in doctors:
+                if doctor.city:
+                    specialty_cities.setdefault(doctor.specialty.lower(), set()).add(doctor.city)
+            self._specialty_cities = {key: frozenset(cities) for key, cities in specialty_cities.items()}
+            self._mtime = mtime
+
+    def find(self, specialty: str, city: str, weekday_mask: int = 0) -> List[Doctor]:
+        """
+        Return doctors of a specialty in a city (case-insensitive).
+        If weekday_mask is set, only doctors working on one of those weekdays are returned.
+        """
+        self._reload_if_changed()
+        doctors = self._index.get((specialty.lower(), city.lower()), [])
+        if weekday_mask:
+            return [doc for doc in doctors if doc.weekday_mask & weekday_mask]
+        return doctors
+
+    def cities(self) -> frozenset:
+        """All cities in the directory, as spelled in the source data."""
+        self._reload_if_changed()
+        return self._cities
+
+    def specialty_cities(self, specialty: str) -> frozenset:
+        """Cities with at least one doctor of the specialty."""
+        self._reload_if_changed()
+        return self._specialty_cities.get(specialty.lower(), frozenset())
+
+    def columns(self, specialty: str, city: str) -> Dict:
+        """
+        Numeric columns for scoring, aligned with find(specialty, city).
+        Built once per bucket and kept until the next reload.
+        """
+        self._reload_if_changed()
+        key = (specialty.lower(), city.lower())
+        columns = self._columns.get(key)
+        if columns is None:
+            columns = doctor_columns(self._index.get(key, []))
+            self._columns[key] = columns
+        return columns
+
+    def bucket(self, specialty: str, city: str) -> Tuple[List[Doctor], Dict]:
+        """find(specialty, city) and its scoring columns."""
+        return self.find(specialty, city), self.columns(specialty, city)
+
+    def __len__(self):
+        self._reload_if_changed()
+        return len(self._doctors)
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+def get_doctor_directory():
+    """
+    Return the process-wide directory for the configured backend, loading it on first use.
+    Raises FileNotFoundError or json.JSONDecodeError if the JSON file is unusable.
+    """
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                if DOCTOR_STORE_BACKEND == "sqlite":
+                    from services.doctor_store import SqliteDoctorStore
+                    _directory = SqliteDoctorStore(DOCTOR_STORE_PATH)
+                else:
+                    _directory = DoctorDirectory(DOCTORS_FILE)
+    return _directory
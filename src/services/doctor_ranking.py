@@ -0,0 +1,90 @@
+import heapq
+from typing import Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from services.doctor_scoring import iter_top_indices
+
+
+class _LazyRanking:
+    """
+    Base for rankings that are produced one doctor at a time.
+    Already-ranked doctors are kept, so iterating again replays the prefix
+    before selecting more.
+    """
+
+    def __init__(self):
+        self._ranked: List[Tuple[float, object]] = []
+
+    def _next_scored(self) -> Optional[Tuple[float, object]]:
+        raise NotImplementedError
+
+    def _select_next(self) -> bool:
+        scored = self._next_scored()
+        if scored is None:
+            return False
+        self._ranked.append(scored)
+        return True
+
+    def iter_scored(self) -> Iterator[Tuple[float, object]]:
+        """Yield (score, doctor) pairs, best first."""
+        i = 0
+        while i < len(self._ranked) or self._select_next():
+            yield self._ranked[i]
+            i += 1
+
+    def __iter__(self) -> Iterator:
+        for _, doctor in self.iter_scored():
+            yield doctor
+
+    def top(self, k: int) -> List:
+        """The k best-ranked doctors."""
+        return self.page(0, k)
+
+    def page(self, page: int, page_size: int) -> List:
+        """One page of the ranking (0-based), selecting only as far as needed."""
+        end = (page + 1) * page_size
+        while len(self._ranked) < end and self._select_next():
+            pass
+        return [doctor for _, doctor in self._ranked[page * page_size:end]]
+
+
+class RankedDoctors(_LazyRanking):
+    """
+    Doctors in descending score order, produced lazily.
+
+    Scores come from the vectorized scoring engine (services.doctor_scoring);
+    selection is done in chunks with a partial partition, so a booking that
+    succeeds within the first few candidates never pays for a full sort.
+    """
+
+    def __init__(self, doctors: Sequence, scores: np.ndarray):
+        super().__init__()
+        self._doctors = doctors
+        self._scores = scores
+        self._order = iter_top_indices(scores)
+
+    def __len__(self):
+        return len(self._doctors)
+
+    def _next_scored(self):
+        index = next(self._order, None)
+        if index is None:
+            return None
+        return float(self._scores[index]), self._doctors[index]
+
+
+class MergedRanking(_LazyRanking):
+    """
+    Lazy k-way merge of several rankings (e.g. one per city) whose scores are
+    on the same scale. Only as many doctors as are consumed are pulled from
+    each input; the union is never built or re-sorted.
+    """
+
+    def __init__(self, rankings: Sequence[_LazyRanking]):
+        super().__init__()
+        self._merged = heapq.merge(
+            *(ranking.iter_scored() for ranking in rankings),
+            key=lambda scored: -scored[0]
+        )
+
+    def _next_scored(self):
+        return next(self._merged, None)
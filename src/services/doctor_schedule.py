@@ -0,0 +1,214 @@
+import re
+import threading
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.app_config import APPOINTMENT_SLOTS, SLOT_CAPACITY
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+ALL_WEEK = (1 << 7) - 1
+
+_DAY_NAME = r"(mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)[a-z]*"
+_DAY_RANGE = re.compile(rf"{_DAY_NAME}\s*(?:-|–|to)\s*{_DAY_NAME}")
+_DAY_SINGLE = re.compile(_DAY_NAME)
+
+
+def _weekday_index(name: str) -> int:
+    return next(i for i, day in enumerate(WEEKDAYS) if day.startswith(name[:3]))
+
+def parse_working_days(text: str) -> int:
+    """
+    Parse a "working days" string into a weekday bitmask (bit 0 = Monday).
+    Handles ranges ("Monday - Saturday", "Mon to Fri", including wrap-around
+    like "Fri - Mon"), lists ("Tuesday, Thursday, Saturday") and "daily".
+    Entries without fixed days, such as "By Appointment", return 0 and are
+    never offered automatically.
+    """
+    text = (text or "").lower()
+    if "daily" in text or "all days" in text or "everyday" in text:
+        return ALL_WEEK
+
+    mask = 0
+    for start_name, end_name in _DAY_RANGE.findall(text):
+        start, end = _weekday_index(start_name), _weekday_index(end_name)
+        day = start
+        while True:
+            mask |= 1 << day
+            if day == end:
+                break
+            day = (day + 1) % 7
+    text = _DAY_RANGE.sub(" ", text)
+    for name in _DAY_SINGLE.findall(text):
+        mask |= 1 << _weekday_index(name)
+    return mask
+
+def works_on(weekday_mask: int, day: date) -> bool:
+    return bool(weekday_mask >> day.weekday() & 1)
+
+
+class SlotBook:
+    """
+    Per-slot booking counts with a per-doctor interval index of fully booked days.
+
+    `slots` is the ordered list of bookable start times ("09:00", ...), each
+    accepting `capacity` patients. Fully booked days are kept as sorted,
+    merged (first_ordinal, last_ordinal) intervals, so "first free slot on or
+    after D" skips runs of full days with a binary search instead of probing
+    each day.
+    """
+
+    def __init__(self, slots: List[str], capacity: int):
+        self.slots = slots
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._booked: Dict[Tuple[str, date], Dict[str, int]] = {}
+        self._full_days: Dict[str, List[Tuple[int, int]]] = {}
+
+    # --- Interval index helpers (call with the lock held) ---
+    def _mark_full(self, doctor_id: str, day: date):
+        ordinal = day.toordinal()
+        intervals = self._full_days.setdefault(doctor_id, [])
+        i = bisect_right(intervals, (ordinal, float('inf')))
+        if i and intervals[i - 1][1] >= ordinal:
+            return  # Already inside an interval
+        start = end = ordinal
+        # Merge with the neighbouring intervals when adjacent
+        if i and intervals[i - 1][1] == ordinal - 1:
+            start = intervals[i - 1][0]
+            i -= 1
+            intervals.pop(i)
+        if i < len(intervals) and intervals[i][0] == ordinal + 1:
+            end = intervals[i][1]
+            intervals.pop(i)
+        intervals.insert(i, (start, end))
+
+    def _unmark_full(self, doctor_id: str, day: date):
+        ordinal = day.toordinal()
+        intervals = self._full_days.get(doctor_id, [])
+        i = bisect_right(intervals, (ordinal, float('inf'))) - 1
+        if i < 0 or intervals[i][1] < ordinal:
+            return
+        start, end = intervals.pop(i)
+        if ordinal < end:
+            intervals.insert(i, (ordinal + 1, end))
+        if start < ordinal:
+            intervals.insert(i, (start, ordinal - 1))
+
+    def _next_open_ordinal(self, doctor_id: str, ordinal: int) -> int:
+        """Smallest ordinal >= `ordinal` that is not fully booked."""
+        intervals = self._full_days.get(doctor_id, [])
+        i = bisect_right(intervals, (ordinal, float('inf'))) - 1
+        if i >= 0 and intervals[i][1] >= ordinal:
+            return intervals[i][1] + 1
+        return ordinal
+
+    def _free_slot(self, doctor_id: str, day: date) -> Optional[str]:
+        counts = self._booked.get((doctor_id, day), {})
+        for slot in self.slots:
+            if counts.get(slot, 0) < self.capacity:
+                return slot
+        return None
+
+    # --- Public API ---
+    def set_day(self, doctor_id: str, day: date, booked_slots: Iterable[Optional[str]]):
+        """
+        Replace the booked counts for one doctor and day, e.g. from the database.
+        Entries with no slot (older bookings) take the earliest slot with room.
+        """
+        with self._lock:
+            counts: Dict[str, int] = {}
+            unslotted = 0
+            for slot in booked_slots:
+                if slot in self.slots:
+                    counts[slot] = counts.get(slot, 0) + 1
+                else:
+                    unslotted += 1
+            for slot in self.slots:
+                while unslotted and counts.get(slot, 0) < self.capacity:
+                    counts[slot] = counts.get(slot, 0) + 1
+                    unslotted -= 1
+            self._booked[(doctor_id, day)] = counts
+            if self._free_slot(doctor_id, day) is None:
+                self._mark_full(doctor_id, day)
+            else:
+                self._unmark_full(doctor_id, day)
+
+    def free_slot(self, doctor_id: str, weekday_mask: int, day: date) -> Optional[str]:
+        """Earliest slot with remaining capacity on `day`, or None."""
+        if not works_on(weekday_mask, day):
+            return None
+        with self._lock:
+            return self._free_slot(doctor_id, day)
+
+    def first_free_slot(self, doctor_id: str, weekday_mask: int, on_or_after: date,
+                        horizon_days: int = 90) -> Optional[Tuple[date, str]]:
+        """First (day, slot) on or after a date, looking at most `horizon_days` ahead."""
+        if not weekday_mask:
+            return None
+        last = on_or_after.toordinal() + horizon_days
+        with self._lock:
+            ordinal = on_or_after.toordinal()
+            while ordinal <= last:
+                ordinal = self._next_open_ordinal(doctor_id, ordinal)
+                day = date.fromordinal(ordinal)
+                if works_on(weekday_mask, day):
+                    slot = self._free_slot(doctor_id, day)
+                    if slot:
+                        return day, slot
+                ordinal += 1
+        return None
+
+    def reserve(self, doctor_id: str, day: date, slot: str) -> bool:
+        """Take one place in a slot; False if it is already at capacity."""
+        with self._lock:
+            counts = self._booked.setdefault((doctor_id, day), {})
+            if counts.get(slot, 0) >= self.capacity:
+                return False
+            counts[slot] = counts.get(slot, 0) + 1
+            if self._free_slot(doctor_id, day) is None:
+                self._mark_full(doctor_id, day)
+            return True
+
+    def release(self, doctor_id: str, day: date, slot: str):
+        """Undo a reservation, e.g. when the database insert fails."""
+        with self._lock:
+            counts = self._booked.get((doctor_id, day), {})
+            if counts.get(slot, 0) > 0:
+                counts[slot] -= 1
+                self._unmark_full(doctor_id, day)
+
+
+def first_available(ranked_doctors, dates: Iterable[date], slot_book: SlotBook):
+    """
+    Find the best-ranked doctor with a free slot on any candidate date, and
+    that doctor's earliest such (day, slot). Availability is already part of
+    the ranking score, so rank order decides between doctors.
+    `ranked_doctors` may be a lazy ranking (see services.doctor_ranking); it is
+    only consumed as far as the first doctor with a free slot.
+    """
+    dates = sorted(set(dates))
+    date_mask = 0
+    for day in dates:
+        date_mask |= 1 << day.weekday()
+
+    for doctor in ranked_doctors:
+        if not doctor.weekday_mask & date_mask:
+            continue
+        for day in dates:
+            slot = slot_book.free_slot(doctor.id, doctor.weekday_mask, day)
+            if slot:
+                return doctor, day, slot
+    return None
+
+
+_slot_book = None
+_slot_book_lock = threading.Lock()
+
+def get_slot_book() -> SlotBook:
+    """Return the process-wide slot book, created on first use."""
+    global _slot_book
+    if _slot_book is None:
+        with _slot_book_lock:
+            if _slot_book is None:
+                _slot_book = SlotBook(APPOINTMENT_SLOTS, SLOT_CAPACITY)
+    return _slot_book
@@ -0,0 +1,118 @@
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Criteria understood by the scoring engine. Weights for any other key are ignored.
+CRITERIA = ("experience", "fee", "availability")
+
+
+def doctor_columns(doctors: Sequence) -> Dict[str, np.ndarray]:
+    """Columnar arrays of the numeric fields used for scoring."""
+    n = len(doctors)
+    return {
+        "experience": np.fromiter((doc.experience_years for doc in doctors), dtype=np.float64, count=n),
+        "fee": np.fromiter((doc.fee for doc in doctors), dtype=np.float64, count=n),
+        "weekday_mask": np.fromiter((doc.weekday_mask for doc in doctors), dtype=np.int64, count=n),
+    }
+
+def days_until_available(weekday_masks: np.ndarray, dates: Sequence[date]) -> np.ndarray:
+    """
+    Days from the first requested date to the first requested date each doctor
+    works on (by weekday), or +inf if they work on none of them.
+    Slot-level capacity is checked later, when booking.
+    """
+    result = np.full(weekday_masks.shape, np.inf)
+    if not dates:
+        return result
+    dates = sorted(set(dates))
+    first = dates[0].toordinal()
+    # Walk latest to earliest so earlier dates overwrite later ones
+    for day in reversed(dates):
+        works = (weekday_masks >> day.weekday()) & 1 == 1
+        result[works] = day.toordinal() - first
+    return result
+
+def column_bounds(columns_list: Sequence[Dict[str, np.ndarray]]) -> Dict[str, Tuple[float, float]]:
+    """
+    Shared (min, max) of experience and fee over several candidate sets, so
+    sets scored separately (e.g. one per city) produce comparable scores.
+    """
+    bounds = {}
+    for criterion in ("experience", "fee"):
+        arrays = [columns[criterion] for columns in columns_list if len(columns[criterion])]
+        if arrays:
+            bounds[criterion] = (min(a.min() for a in arrays), max(a.max() for a in arrays))
+    return bounds
+
+def _benefit(values: np.ndarray, higher_is_better: bool,
+             bounds: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """
+    Min-max normalize to [0, 1] where 1 is best. Non-finite values score 0.
+    `bounds` fixes the (min, max) instead of taking it from `values`.
+    """
+    finite = np.isfinite(values)
+    out = np.zeros(values.shape)
+    if not finite.any():
+        return out
+    if bounds is not None:
+        low, high = bounds
+    else:
+        low, high = values[finite].min(), values[finite].max()
+    if high == low:
+        out[finite] = 1.0
+        return out
+    scaled = (values[finite] - low) / (high - low)
+    out[finite] = scaled if higher_is_better else 1.0 - scaled
+    return out
+
+def score_doctors(columns: Dict[str, np.ndarray], weights: Dict[str, float],
+                  dates: Sequence[date] = (),
+                  bounds: Optional[Dict[str, Tuple[float, float]]] = None) -> np.ndarray:
+    """
+    Weighted score per doctor over experience, fee and earliest availability,
+    each normalized across the candidate set. Higher is better.
+    Pass `bounds` (see column_bounds) to normalize experience and fee over a
+    wider population instead, and availability is always measured against the
+    full date list, so scores from separate calls can be compared.
+    """
+    bounds = bounds or {}
+    n = len(columns["experience"])
+    scores = np.zeros(n)
+    if weights.get("experience"):
+        scores += weights["experience"] * _benefit(columns["experience"], True, bounds.get("experience"))
+    if weights.get("fee"):
+        scores += weights["fee"] * _benefit(columns["fee"], False, bounds.get("fee"))
+    if weights.get("availability"):
+        wait = days_until_available(columns["weekday_mask"], dates)
+        if dates and bounds:
+            wait_bounds = (0.0, float(max(dates).toordinal() - min(dates).toordinal()))
+        else:
+            wait_bounds = None
+        scores += weights["availability"] * _benefit(wait, False, wait_bounds)
+    return scores
+
+def iter_top_indices(scores: np.ndarray, first_chunk: int = 16) -> Iterator[int]:
+    """
+    Yield indices in descending score order, selecting chunks with
+    a partial partition. Chunks double in size, so taking only the best few costs
+    O(n) while a full walk is still O(n log n).
+    Ties keep the original (input) order.
+    """
+    remaining = np.arange(len(scores))
+    chunk = first_chunk
+    while remaining.size:
+        k = min(chunk, remaining.size)
+        candidate_scores = scores[remaining]
+        if k < remaining.size:
+            # Take everything scoring at least the k-th best, so ties are never split across chunks
+            threshold = -np.partition(-candidate_scores, k - 1)[k - 1]
+            part = np.flatnonzero(candidate_scores >= threshold)
+        else:
+            part = np.arange(remaining.size)
+        # Sort the chunk by score, then by original position for stable ties
+        order = np.lexsort((remaining[part], -candidate_scores[part]))
+        yield from remaining[part][order].tolist()
+        keep = np.ones(remaining.size, dtype=bool)
+        keep[part] = False
+        remaining = remaining[keep]
+        chunk *= 2
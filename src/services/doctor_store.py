@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+from services.doctor_directory import Doctor
+from services.doctor_scoring import doctor_columns
+
+# Column order matches Doctor.__slots__ so rows map straight onto Doctor.from_row
+_COLUMNS = Doctor.__slots__
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS doctors (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    specialty TEXT,
+    qualification TEXT,
+    experience TEXT,
+    experience_years INTEGER,
+    hospital TEXT,
+    city TEXT,
+    fee REAL,
+    working_days TEXT,
+    weekday_mask INTEGER,
+    specialty_key TEXT,
+    city_key TEXT
+);
+"""
+
+# Covering the ranking order lets SQLite return a bucket already ranked
+_INDEX = """
+CREATE INDEX IF NOT EXISTS doctors_bucket_idx
+    ON doctors (specialty_key, city_key, experience_years DESC, fee, id);
+"""
+
+
+def build_sqlite_store(doctors: Iterable[Doctor], path: str, batch_size: int = 10000) -> int:
+    """Create or replace the doctors table at `path`. Returns the number of rows written."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("DROP TABLE IF EXISTS doctors")
+        conn.execute(_SCHEMA)
+        placeholders = ", ".join("?" * (len(_COLUMNS) + 2))
+        insert = f"INSERT INTO doctors ({', '.join(_COLUMNS)}, specialty_key, city_key) VALUES ({placeholders})"
+
+        count = 0
+        batch = []
+        for doctor in doctors:
+            batch.append(doctor.to_row() + (doctor.specialty.lower(), doctor.city.lower()))
+            if len(batch) >= batch_size:
+                conn.executemany(insert, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(insert, batch)
+            count += len(batch)
+
+        # Building the index after the bulk load is much faster than maintaining it
+        conn.execute(_INDEX)
+        conn.execute("ANALYZE")
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+
+class SqliteDoctorStore:
+    """
+    Read-only doctor directory backed by an indexed SQLite file.
+    Same query interface as DoctorDirectory; used for large (national) directories.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()  # sqlite3 connections are per-thread
+        self._cities = None
+        self._specialty_cities: Dict[str, frozenset] = {}
+        self._select = (
+            f"SELECT {', '.join(_COLUMNS)} FROM doctors "
+            "WHERE specialty_key = ? AND city_key = ? AND (? = 0 OR weekday_mask & ? != 0) "
+            "ORDER BY experience_years DESC, fee, id"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def find(self, specialty: str, city: str, weekday_mask: int = 0) -> List[Doctor]:
+        """
+        Return doctors of a specialty in a city (case-insensitive), ranked by
+        experience, then fee, then id. If weekday_mask is set, only doctors
+        working on one of those weekdays are returned.
+        """
+        rows = self._connection().execute(
+            self._select, (specialty.lower(), city.lower(), weekday_mask, weekday_mask)
+        )
+        return [Doctor.from_row(row) for row in rows]
+
+    def cities(self) -> frozenset:
+        """All cities in the directory, read once (the store is read-only)."""
+        if self._cities is None:
+            rows = self._connection().execute("SELECT DISTINCT city FROM doctors WHERE city != ''")
+            self._cities = frozenset(row[0] for row in rows)
+        return self._cities
+
+    def specialty_cities(self, specialty: str) -> frozenset:
+        """Cities with at least one doctor of the specialty, cached per specialty."""
+        key = specialty.lower()
+        cities = self._specialty_cities.get(key)
+        if cities is None:
+            rows = self._connection().execute(
+                "SELECT DISTINCT city FROM doctors WHERE specialty_key = ? AND city != ''", (key,)
+            )
+            cities = self._specialty_cities[key] = frozenset(row[0] for row in rows)
+        return cities
+
+    def bucket(self, specialty: str, city: str) -> Tuple[List[Doctor], Dict]:
+        """find(specialty, city) and its scoring columns, from a single query."""
+        doctors = self.find(specialty, city)
+        return doctors, doctor_columns(doctors)
+
+    def columns(self, specialty: str, city: str) -> Dict:
+        """Numeric columns for scoring, aligned with find(specialty, city)."""
+        return self.bucket(specialty, city)[1]
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM doctors").fetchone()[0]
@@ -103,16 +103,16 @@ def add_medication_to_calendar(med_list):
 
 # ... (keep existing imports and get_calendar_service function) ...
 
-def add_appointment_to_calendar(doctor_name, hospital, date_str):
+def add_appointment_to_calendar(doctor_name, hospital, date_str, time_str="09:00"):
     """Adds a single appointment to the user's Google Calendar."""
     service = get_calendar_service()
     if not service:
         return False
 
     try:
-        # 1. Set up the time (Defaulting to 9:00 AM on the booking date)
+        # 1. Set up the time (the booked slot, 9:00 AM by default)
         appt_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-        start_time = datetime.time(9, 0, 0) # 9:00 AM
+        start_time = datetime.datetime.strptime(time_str, "%H:%M").time()
         
         # Combine to get start/end datetime
         start_dt = datetime.datetime.combine(appt_date, start_time)
@@ -5,14 +5,21 @@ import json
 import re
 import uuid
 from config.medication_prompts import get_medication_prompt
+from services.sig_parser import parse_sig_text
 from ics import Calendar, Event, DisplayAlarm
 from ics.grammar.parse import ContentLine # <--- NEW IMPORT REQUIRED
 from datetime import datetime, date, time, timedelta
 
 def parse_medication_schedule(user_text: str):
     """
-    Uses Groq to parse natural language medication instructions.
+    Parses natural language medication instructions. Standard sigs
+    ("500mg BD for 7 days", "1-0-1", "at bedtime") are parsed locally;
+    anything else is sent to Groq.
     """
+    local_result = parse_sig_text(user_text)
+    if local_result:
+        return local_result
+
     if 'analysis_agent' not in st.session_state:
         st.error("AI analysis agent is not initialized.")
         return None
@@ -0,0 +1,165 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict
+
+import streamlit as st
+from twilio.rest import Client
+from twilio.base.exceptions import TwilioRestException
+
+from config.app_config import (
+    NOTIFICATION_BATCH_SIZE, NOTIFICATION_LEASE_SECONDS, NOTIFICATION_MAX_ATTEMPTS,
+    NOTIFICATION_BACKOFF_BASE_SECONDS, NOTIFICATION_BACKOFF_MAX_SECONDS,
+    NOTIFICATION_POLL_SECONDS, WHATSAPP_MESSAGES_PER_SECOND
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentDeliveryError(Exception):
+    """A notification that will never be delivered, e.g. a malformed number."""
+
+
+def clean_phone_number(phone: str) -> str:
+    """Strip formatting from a phone number; it must be E.164 (+91...)."""
+    cleaned = (phone or "").replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
+    if not cleaned.startswith("+"):
+        raise PermanentDeliveryError(f"Invalid phone number format for WhatsApp. Must be E.164 (+91...): {phone}")
+    return cleaned
+
+def backoff_seconds(attempts: int) -> int:
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    delay = min(NOTIFICATION_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), NOTIFICATION_BACKOFF_MAX_SECONDS)
+    return int(delay * random.uniform(0.8, 1.2))
+
+
+class RateLimiter:
+    """Token bucket; acquire() blocks until a send is allowed."""
+
+    def __init__(self, per_second: float, burst: int = 1):
+        self.per_second = per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.per_second)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            time.sleep((1 - self._tokens) / self.per_second)
+
+
+class NotificationDispatcher:
+    """
+    Drains public.notification_outbox in a background thread.
+
+    Notifications are claimed in batches (one RPC per batch), sent one by one
+    under the sender's rate limit (the Twilio Messages API has no multi-
+    recipient send), and their outcomes written back in one RPC per batch.
+    Transient failures are retried with exponential backoff; after
+    NOTIFICATION_MAX_ATTEMPTS, or on a permanent error, a row is marked failed.
+    """
+
+    def __init__(self, supabase_client, twilio_client: Client, from_number: str):
+        self.supabase = supabase_client
+        self.twilio = twilio_client
+        self.from_number = from_number
+        self.rate_limiter = RateLimiter(WHATSAPP_MESSAGES_PER_SECOND)
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def wake(self):
+        """Dispatch now instead of at the next poll, e.g. right after a booking."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                while self.dispatch_batch() == NOTIFICATION_BATCH_SIZE:
+                    pass # A full batch: there may be more due right now
+            except Exception:
+                logger.exception("Notification dispatch failed")
+            self._wake.wait(NOTIFICATION_POLL_SECONDS)
+            self._wake.clear()
+
+    def dispatch_batch(self) -> int:
+        """Claim, send and record one batch. Returns the number of notifications claimed."""
+        claimed = self.supabase.rpc('claim_notifications', {
+            "p_limit": NOTIFICATION_BATCH_SIZE,
+            "p_lease_seconds": NOTIFICATION_LEASE_SECONDS,
+        }).execute().data or []
+        if not claimed:
+            return 0
+
+        results = [self._deliver(notification) for notification in claimed]
+        self.supabase.rpc('complete_notifications', {"p_results": results}).execute()
+        return len(claimed)
+
+    def _deliver(self, notification: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"id": notification["id"]}
+        try:
+            to = clean_phone_number(notification["recipient"])
+            self.rate_limiter.acquire()
+            message = self.twilio.messages.create(
+                from_=self.from_number,
+                body=notification["body"],
+                to=f'whatsapp:{to}'
+            )
+            result.update(status="sent", provider_id=message.sid)
+        except PermanentDeliveryError as e:
+            result.update(status="failed", error=str(e))
+        except TwilioRestException as e:
+            # 4xx other than throttling means the request itself is bad
+            permanent = e.status and 400 <= e.status < 500 and e.status != 429
+            result.update(self._retry_or_fail(notification, str(e), permanent))
+        except Exception as e:
+            result.update(self._retry_or_fail(notification, str(e), False))
+
+        if result["status"] == "failed":
+            logger.warning("WhatsApp notification %s failed: %s", notification["id"], result["error"])
+        return result
+
+    def _retry_or_fail(self, notification: Dict[str, Any], error: str, permanent: bool) -> Dict[str, Any]:
+        attempts = notification["attempts"] # Already counts this attempt
+        if permanent or attempts >= NOTIFICATION_MAX_ATTEMPTS:
+            return {"status": "failed", "error": error}
+        return {"status": "pending", "error": error, "retry_in_seconds": backoff_seconds(attempts)}
+
+
+_dispatcher = None
+_dispatcher_disabled = False
+_dispatcher_lock = threading.Lock()
+
+def get_notification_dispatcher() -> NotificationDispatcher | None:
+    """
+    Return the process-wide dispatcher, starting it on first use. It needs the
+    Twilio credentials and a Supabase service-role key (the claim RPCs are not
+    callable by users); without them it returns None and notifications wait
+    in the outbox until a configured instance drains it.
+    """
+    global _dispatcher, _dispatcher_disabled
+    if _dispatcher is None and not _dispatcher_disabled:
+        with _dispatcher_lock:
+            if _dispatcher is None and not _dispatcher_disabled:
+                twilio = st.secrets.get("twilio", {})
+                service_key = st.secrets.get("SUPABASE_SERVICE_KEY")
+                if not (twilio.get("ACCOUNT_SID") and service_key):
+                    logger.warning("WhatsApp notifications are not configured; leaving them queued")
+                    _dispatcher_disabled = True
+                    return None
+                from supabase import create_client
+                _dispatcher = NotificationDispatcher(
+                    create_client(st.secrets["SUPABASE_URL"], service_key),
+                    Client(twilio["ACCOUNT_SID"], twilio.get("AUTH_TOKEN")),
+                    twilio.get("WHATSAPP_FROM"),
+                )
+                _dispatcher.start()
+    return _dispatcher
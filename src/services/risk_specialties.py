@@ -0,0 +1,27 @@
+from typing import List, Tuple
+
+from utils.keyword_matcher import KeywordMatcher
+
+RISK_SPECIALTY_MAP = {
+    "anemia": "Hematology", "polycythemia": "Hematology", "leukemia": "Hematology",
+    "thrombocytopenia": "Hematology", "thrombocytosis": "Hematology",
+    "hepatitis": "Hepatology", "cirrhosis": "Hepatology", "fatty liver disease": "Hepatology",
+    "cholestasis": "Hepatology", "liver dysfunction": "Hepatology",
+    "diabetes": "Endocrinology", "thyroid disorders": "Endocrinology", "metabolic syndrome": "Endocrinology",
+    "hyperlipidemia": "Cardiology", "atherosclerosis": "Cardiology", "hypertension": "Cardiology",
+    "kidney disease": "Nephrology", "renal": "Nephrology", "creatinine": "Nephrology"
+}
+
+# Substring matching, as risk labels embed keywords in longer words ("Prediabetes", "Cardiorenal")
+_risk_matcher = KeywordMatcher(RISK_SPECIALTY_MAP, word_boundary=False)
+
+def get_specialties_from_risks(health_risks: List[str]) -> List[Tuple[str, int]]:
+    """
+    Every specialty the health risks call for, with its weight (the number of
+    risk keywords that point to it), heaviest first; ties keep the order the
+    risks were listed in.
+    """
+    if not health_risks:
+        return []
+    weights = _risk_matcher.count_labels("\n".join(health_risks))
+    return sorted(weights.items(), key=lambda item: item[1], reverse=True)
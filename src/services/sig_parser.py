@@ -0,0 +1,210 @@
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# The routine-to-time mapping used by config/medication_prompts.py
+ROUTINE_TIMES = {
+    "morning": "08:00", "breakfast": "08:00",
+    "lunch": "13:00", "afternoon": "13:00", "noon": "13:00",
+    "dinner": "20:00", "evening": "20:00", "supper": "20:00",
+    "bedtime": "22:00", "night": "22:00", "nightly": "22:00", "sleep": "22:00", "bed": "22:00",
+}
+TIMES_PER_DAY = {
+    1: ["08:00"],
+    2: ["09:00", "21:00"],
+    3: ["09:00", "14:00", "21:00"],
+    4: ["08:00", "13:00", "20:00", "22:00"],
+}
+# "every N hours" / qNh doses are N hours apart from the first morning dose
+EVERY_HOURS_START = 8
+# Slots of a dose pattern such as 1-0-1 or 1-1-1-1
+PATTERN_SLOTS = {
+    3: ["08:00", "13:00", "22:00"],
+    4: ["08:00", "13:00", "20:00", "22:00"],
+}
+ABBREVIATIONS = {
+    "od": 1, "qd": 1, "bd": 2, "bid": 2, "tds": 3, "tid": 3, "qid": 4, "qds": 4,
+}
+ABBREVIATION_NAMES = {1: "once daily", 2: "twice daily", 3: "three times daily", 4: "four times daily"}
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                "eight": 8, "nine": 9, "ten": 10, "fourteen": 14, "thirty": 30}
+
+_NUMBER = r"(?:\d+|a|an|one|two|three|four|five|six|seven|eight|nine|ten|fourteen|thirty)"
+_ROUTINE = r"(?:morning|breakfast|lunch|afternoon|noon|dinner|evening|supper|bedtime|nightly|night|sleep|bed)"
+
+_DOSAGE = re.compile(r"\b\d+(?:\.\d+)?\s*(?:mg|mcg|µg|g|ml|iu|units?|%)(?!\w)", re.IGNORECASE)
+_QUANTITY = re.compile(rf"\b{_NUMBER}\s+(?:tablets?|tabs?|capsules?|caps?|pills?|puffs?|drops?|sachets?|spoons?|teaspoons?)\b", re.IGNORECASE)
+_DURATION = re.compile(rf"\b(?:for|x|×)\s*(?P<n>{_NUMBER})\s*(?P<unit>days?|weeks?|months?)\b", re.IGNORECASE)
+_PATTERN = re.compile(r"(?<![\d-])(?P<doses>[0-2](?:\s*-\s*[0-2]){2,3})(?![\d-])")
+_EVERY_HOURS = re.compile(r"\b(?:every\s+(?P<h>\d+)\s*(?:hours?|hrs?)|q\s*(?P<q>\d+)\s*h)\b", re.IGNORECASE)
+_ABBREVIATION = re.compile(r"\b(?P<abbr>od|qd|bd|bid|tds|tid|qid|qds)\b\.?", re.IGNORECASE)
+_HS = re.compile(r"\b(?:hs|h\.s\.)(?!\w)", re.IGNORECASE)
+_TIMES = re.compile(
+    rf"\b(?:(?P<word>once|twice|thrice)|(?P<n>{_NUMBER})\s*(?:times|x))\s*(?:a|per|each|every)?\s*(?:day|daily)\b"
+    r"|\b(?P<plain>once\s+daily|twice\s+daily|thrice\s+daily|daily|every\s*day|everyday)\b",
+    re.IGNORECASE,
+)
+_ROUTINES = re.compile(
+    rf"\b(?:(?:every|each|at|in\s+the|before|after|with)\s+)*(?P<first>{_ROUTINE})"
+    rf"(?P<rest>(?:\s*(?:,|and|&|/)\s*(?:(?:at|in\s+the|before|after|with)\s+)?{_ROUTINE})*)\b",
+    re.IGNORECASE,
+)
+_NOTES = re.compile(
+    r"\b(?:(?:before|after|with)\s+(?:food|meals?|water|milk)|(?:on\s+(?:an\s+)?)?empty\s+stomach)\b",
+    re.IGNORECASE,
+)
+# As-needed medicines have no fixed times; the LLM (or the user) decides
+_AS_NEEDED = re.compile(r"\b(?:prn|sos|as\s+needed|when\s+needed|if\s+needed|if\s+required)\b", re.IGNORECASE)
+_FILLER = re.compile(
+    r"\b(?:take|takes|taking|give|use|apply|inhale|tab|tablet|tabs|tablets|cap|caps|capsule|capsules|"
+    r"syrup|of|the|a|an|one|1|daily|dose|doses|please|to|be|taken|orally|by|mouth)\b\.?",
+    re.IGNORECASE,
+)
+_CLAUSES = re.compile(r"\n+|;|\.\s+(?=[A-Z])")
+_LIST = re.compile(r",?\s+and\s+|,\s+|\s+then\s+", re.IGNORECASE)
+
+
+def _number(text: str) -> int:
+    text = text.lower()
+    return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+def _mask(text: str, span: Tuple[int, int]) -> str:
+    start, end = span
+    return text[:start] + " " * (end - start) + text[end:]
+
+
+def _frequency(text: str) -> Tuple[Optional[str], List[str], str]:
+    """(frequency label, alert times, text with the frequency removed), or (None, [], text)."""
+    match = _PATTERN.search(text)
+    if match:
+        doses = [int(part) for part in re.split(r"\s*-\s*", match.group("doses"))]
+        slots = PATTERN_SLOTS[len(doses)]
+        times = [slot for slot, dose in zip(slots, doses) if dose]
+        return (match.group("doses").replace(" ", ""), times, _mask(text, match.span())) if times else (None, [], text)
+
+    match = _EVERY_HOURS.search(text)
+    if match:
+        hours = int(match.group("h") or match.group("q"))
+        if hours < 4 or 24 % hours:
+            return None, [], text
+        times = sorted(f"{(EVERY_HOURS_START + k * hours) % 24:02d}:00" for k in range(24 // hours))
+        return f"every {hours} hours", times, _mask(text, match.span())
+
+    count, label = None, None
+    match = _ABBREVIATION.search(text)
+    if match:
+        count = ABBREVIATIONS[match.group("abbr").lower()]
+        label = ABBREVIATION_NAMES[count]
+        text = _mask(text, match.span())
+    else:
+        match = _TIMES.search(text)
+        if match:
+            word = (match.group("word") or match.group("plain") or "").lower().split()
+            if match.group("n"):
+                count = _number(match.group("n"))
+            else:
+                count = {"once": 1, "twice": 2, "thrice": 3}.get(word[0] if word else "", 1)
+            label = " ".join(match.group(0).lower().split())
+            text = _mask(text, match.span())
+
+    routine_times, routine_label = [], None
+    match = _HS.search(text)
+    if match:
+        routine_times, routine_label = ["22:00"], "at bedtime"
+        text = _mask(text, match.span())
+    for match in _ROUTINES.finditer(text):
+        words = re.findall(_ROUTINE, match.group(0), re.IGNORECASE)
+        routine_times.extend(ROUTINE_TIMES[word.lower()] for word in words)
+        routine_label = routine_label or " ".join(match.group(0).lower().split())
+        text = _mask(text, match.span())
+    routine_times = sorted(set(routine_times))
+
+    if routine_times:
+        if count is not None and count != len(routine_times) and not (count == 1 and len(routine_times) == 1):
+            return None, [], text # "twice daily at bedtime": contradictory, let the LLM decide
+        return (label if label and count != 1 else routine_label), routine_times, text
+    if count in TIMES_PER_DAY:
+        return label, TIMES_PER_DAY[count], text
+    return None, [], text
+
+
+def parse_sig(clause: str, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parses one instruction such as "Crocin 500mg twice daily for 7 days",
+    "Metformin 1-0-1" or "Aspirin at bedtime" into the medication schedule
+    schema. Returns None if any part of the text is not understood, or if a
+    bare number ("Glycomet 500") may be a dosage without its unit.
+    """
+    today = today or date.today()
+    text = " ".join(clause.split()).strip(" .,")
+    if not text or _AS_NEEDED.search(text):
+        return None
+
+    frequency, alert_times, text = _frequency(text)
+    if not frequency:
+        return None
+
+    dosage = None
+    match = _DOSAGE.search(text) or _QUANTITY.search(text)
+    if match:
+        dosage = match.group(0)
+        if match.re is _DOSAGE and not re.search(r"units?$", dosage, re.IGNORECASE):
+            dosage = re.sub(r"\s+", "", dosage) # "500 mg" -> "500mg", as in the prompt's example
+        text = _mask(text, match.span())
+
+    end_date = None
+    match = _DURATION.search(text)
+    if match:
+        unit = match.group("unit").lower()
+        days = _number(match.group("n")) * (7 if unit.startswith("week") else 30 if unit.startswith("month") else 1)
+        end_date = (today + timedelta(days=days)).isoformat()
+        text = _mask(text, match.span())
+
+    notes = []
+    for match in _NOTES.finditer(text):
+        notes.append(" ".join(match.group(0).lower().split()))
+        text = _mask(text, match.span())
+
+    # Whatever is left must be one run of words that looks like a drug name or
+    # nickname ("blue pill"); words from elsewhere in the text were not understood
+    runs = re.split(r"\s{2,}", _FILLER.sub(lambda filler: " " * len(filler.group(0)), text))
+    runs = [run.strip(" ,.-") for run in runs if run.strip(" ,.-")]
+    if len(runs) != 1:
+        return None
+    name = runs[0]
+    if len(name.split()) > 3 or not re.fullmatch(r"[A-Za-z][A-Za-z0-9\- ]*", name):
+        return None
+    if dosage is None and re.search(r"\b\d", name):
+        return None
+
+    return {
+        "name": name,
+        "dosage": dosage,
+        "frequency": frequency,
+        "alert_times": alert_times,
+        "end_date": end_date,
+        "notes": ", ".join(notes) or None,
+    }
+
+
+def parse_sig_text(user_text: str, today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Parses free-text instructions, one or more medications, without the LLM.
+    Each line or sentence is parsed whole first, then split on commas/"and"
+    when it lists several medications. Returns None unless every part is
+    understood, so ambiguous input still goes to the LLM.
+    """
+    medications = []
+    for chunk in _CLAUSES.split(user_text or ""):
+        chunk = chunk.strip(" .,")
+        if not chunk:
+            continue
+        medication = parse_sig(chunk, today)
+        if medication:
+            medications.append(medication)
+            continue
+        parts = [parse_sig(part, today) for part in _LIST.split(chunk) if part.strip(" .,")]
+        if not parts or not all(parts):
+            return None
+        medications.extend(parts)
+    return medications or None
@@ -0,0 +1,35 @@
+import threading
+from collections import OrderedDict
+
+
+class ExtractionCache:
+    """
+    Thread-safe LRU cache for extracted PDF pages.
+    Keys are (content hash, page number, mode) tuples, so identical uploads
+    from different sessions share the same entries.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,47 @@
+import re
+from typing import Any, Dict, Iterable, Mapping, Union
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of a fixed set of keywords with one compiled
+    alternation regex, built once when the matcher is created.
+
+    Keywords may be given as a list, or as a mapping of keyword to label
+    (e.g. risk keyword to specialty) to count hits per label. Matching is
+    case-insensitive and prefers the longest keyword at a position; a space
+    in a keyword matches any run of whitespace, so terms split across lines
+    in extracted text still match. With `word_boundary` a match must start a
+    word ("renal" not in "adrenal"); without it keywords match anywhere, like
+    a substring check ("diabetes" in "prediabetes").
+    """
+
+    def __init__(self, keywords: Union[Mapping[str, Any], Iterable[str]], word_boundary: bool = True):
+        if not isinstance(keywords, Mapping):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.labels = {self._normalize(keyword): label for keyword, label in keywords.items()}
+        alternatives = sorted(self.labels, key=len, reverse=True)
+        self._pattern = re.compile(
+            (r"\b" if word_boundary else "") + "(?:" + "|".join(re.escape(keyword).replace(r"\ ", r"\s+") for keyword in alternatives) + ")",
+            re.IGNORECASE
+        )
+
+    @staticmethod
+    def _normalize(keyword: str) -> str:
+        return " ".join(keyword.lower().split())
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Hits per keyword, in order of first appearance."""
+        counts: Dict[str, int] = {}
+        for match in self._pattern.finditer(text or ""):
+            keyword = self._normalize(match.group())
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+    def count_labels(self, text: str) -> Dict[Any, int]:
+        """Hits per label, in order of first appearance."""
+        counts: Dict[Any, int] = {}
+        for keyword, hits in self.count(text).items():
+            label = self.labels[keyword]
+            counts[label] = counts.get(label, 0) + hits
+        return counts
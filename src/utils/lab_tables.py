@@ -0,0 +1,196 @@
+import re
+
+# Normalized column order emitted for every lab table row
+LAB_TABLE_COLUMNS = ("test", "result", "unit", "reference_range")
+LAB_TABLE_HEADER = "Test | Result | Unit | Reference Range"
+
+# Header cell spellings seen on common Indian lab report templates
+HEADER_ALIASES = {
+    "test": ("test", "test name", "investigation", "parameter", "description", "test description"),
+    "result": ("result", "results", "value", "observed value", "your value"),
+    "unit": ("unit", "units", "uom"),
+    "reference_range": (
+        "reference", "reference range", "ref. range", "ref range", "normal range",
+        "normal value", "biological reference interval", "bio. ref. interval", "reference interval"
+    ),
+}
+
+# Pages extracted with pdfplumber's lattice (ruled lines) settings first,
+# then with text alignment for borderless tables
+TABLE_SETTINGS = (
+    {"vertical_strategy": "lines", "horizontal_strategy": "lines"},
+    {"vertical_strategy": "text", "horizontal_strategy": "text"},
+)
+
+_RESULT_WITH_UNIT = re.compile(r"^\s*([<>]?\s*[\d.,]+)\s*([^\d\s].*)?$")
+
+# Units of measurement: "%", anything per something ("g/dL", "x10^3/uL",
+# "mm/hr") and a few bare units. Words such as "years" are not units.
+_LAB_UNIT = r"(?:%|[^\s()]*/[^\s()]+|fl|pg|secs?)"
+_RANGE = r"(?:[<>]=?\s*\d[\d,]*(?:\.\d+)?|\d[\d,]*(?:\.\d+)?\s*-\s*\d[\d,]*(?:\.\d+)?)"
+
+# Result lines in flowing text, with or without a colon after the test:
+# "Hemoglobin: 13.5 g/dL (Reference: 12.0-15.5)", "Hemoglobin 13.5 g/dL 13-17".
+# The whole line must be consumed, and a result needs a unit or a range
+# (checked by the caller), so header lines such as "Age: 45 years" and
+# prose are left alone. The value must end at whitespace, "%" or end of
+# line so dates such as "Date: 15/03/2024" are not mistaken for results.
+_TEXT_RESULT_LINE = re.compile(
+    r"^\s*(?P<test>[A-Za-z][A-Za-z0-9 ()/,.+-]*?)\s*(?::\s*|\s+)"
+    r"(?P<result>[<>]?\s*\d[\d,]*(?:\.\d+)?)(?=\s|%|$)\s*"
+    rf"(?P<unit>{_LAB_UNIT})?\s*"
+    r"(?:\((?:reference|ref\.?|normal)(?:\s*range)?\s*:?\s*(?P<reference>[^)]*)\)"
+    rf"|(?P<range>{_RANGE}))?\s*$",
+    re.IGNORECASE
+)
+
+def _clean_cell(cell):
+    return " ".join(str(cell).split()) if cell else ""
+
+def _match_header(row):
+    """Map column positions to normalized names if the row looks like a header."""
+    mapping = {}
+    for position, cell in enumerate(row):
+        label = _clean_cell(cell).lower().rstrip(":")
+        for column, aliases in HEADER_ALIASES.items():
+            if column not in mapping.values() and label in aliases:
+                mapping[position] = column
+                break
+    # A header must at least identify the test and its result
+    if "test" in mapping.values() and "result" in mapping.values():
+        return mapping
+    return None
+
+def rows_from_table(table):
+    """
+    Convert a raw pdfplumber table (list of rows of cells) into
+    (test, result, unit, reference_range) tuples.
+    Tables without a recognizable header are only accepted when they
+    have exactly four columns, which are assumed to be in that order.
+    """
+    if not table:
+        return []
+
+    mapping = None
+    body = table
+    for index, row in enumerate(table[:3]):
+        mapping = _match_header(row)
+        if mapping:
+            body = table[index + 1:]
+            break
+
+    if mapping is None:
+        if any(len(row) != len(LAB_TABLE_COLUMNS) for row in table):
+            return []
+        mapping = dict(enumerate(LAB_TABLE_COLUMNS))
+
+    rows = []
+    for raw_row in body:
+        values = {column: _clean_cell(raw_row[position])
+                  for position, column in mapping.items() if position < len(raw_row)}
+        test = values.get("test", "")
+        result = values.get("result", "")
+        unit = values.get("unit", "")
+        if not test or not result:
+            continue  # Section titles and blank spacer rows
+
+        # Some templates print "13.5 g/dL" in one cell when there is no unit column
+        if not unit and "unit" not in mapping.values():
+            match = _RESULT_WITH_UNIT.match(result)
+            if match and match.group(2):
+                result, unit = match.group(1).strip(), match.group(2).strip()
+
+        rows.append((test, result, unit, values.get("reference_range", "")))
+    return rows
+
+def extract_page_rows(page):
+    """
+    Run pdfplumber's table finder on a page. Returns (rows, other_text): the
+    normalized lab rows, and the page's text outside the tables they came
+    from (patient details, comments, interpretation).
+    """
+    for settings in TABLE_SETTINGS:
+        rows = []
+        bboxes = []
+        for table in page.find_tables(table_settings=settings):
+            table_rows = rows_from_table(table.extract())
+            if table_rows:
+                rows.extend(table_rows)
+                bboxes.append(table.bbox)
+        if rows:
+            remaining = page
+            for bbox in bboxes:
+                remaining = remaining.outside_bbox(bbox)
+            return rows, (remaining.extract_text() or "").strip()
+    return [], ""
+
+def format_rows(rows):
+    """Render normalized rows as compact pipe-separated lines for the prompt."""
+    return "\n".join(" | ".join(row) for row in rows)
+
+def split_report_lines(text):
+    """
+    Split extracted report text into structured rows and everything else.
+    Rows are the pipe-separated rows emitted by table mode, or result lines
+    such as "Hemoglobin: 13.5 g/dL (Reference: 12.0-15.5)" and "Hemoglobin
+    13.5 g/dL 13-17". Returns (rows, other_lines); blank lines and table
+    headers are in neither.
+    """
+    rows = []
+    other_lines = []
+    for line in text.splitlines():
+        if not line.strip() or line.strip() == LAB_TABLE_HEADER:
+            continue
+        cells = [cell.strip() for cell in line.split(" | ")]
+        if len(cells) == len(LAB_TABLE_COLUMNS):
+            rows.append(tuple(cells))
+            continue
+        match = _TEXT_RESULT_LINE.match(line)
+        reference = match and (match.group("reference") or match.group("range") or "").strip()
+        if match and (match.group("unit") or reference):
+            rows.append((
+                match.group("test").strip(),
+                match.group("result").replace(" ", ""),
+                match.group("unit") or "",
+                reference
+            ))
+        else:
+            other_lines.append(line.rstrip())
+    return rows, other_lines
+
+def parse_report_rows(text):
+    """The structured rows of extracted report text (see split_report_lines)."""
+    return split_report_lines(text)[0]
+
+def merge_reports(reports):
+    """
+    Merge several extracted reports into one biomarker set.
+
+    Args:
+        reports: List of (report_name, text) tuples
+    Returns:
+        Combined text: one section per report with its normalized rows,
+        followed by the report's other lines (patient details, comments,
+        interpretation). Rows repeated within a report (e.g. on every page)
+        are kept once; the same test in different reports is kept, as those
+        may be different dates or specimens. Reports with no recognizable
+        rows are included verbatim.
+    """
+    seen = set()
+    sections = []
+    for report_name, text in reports:
+        parsed, other_lines = split_report_lines(text)
+        if not parsed:
+            sections.append(f"## {report_name}\n{text.strip()}")
+            continue
+        rows = []
+        for row in parsed:
+            key = (report_name, row[0].lower(), row[1], row[2].lower())
+            if key not in seen:
+                seen.add(key)
+                rows.append(row)
+        section = f"## {report_name}\n{LAB_TABLE_HEADER}\n{format_rows(rows)}"
+        if other_lines:
+            section += "\n" + "\n".join(other_lines)
+        sections.append(section)
+    return "\n\n".join(sections)
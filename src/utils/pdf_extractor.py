@@ -1,32 +1,230 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
 import pdfplumber
 import streamlit as st
-from config.app_config import MAX_PDF_PAGES
+from config.app_config import (
+    MAX_PDF_PAGES, EXTRACTION_CACHE_MAX_ENTRIES, BATCH_EXTRACTION_WORKERS,
+    OCR_MAX_WORKERS, OCR_PAGE_TIMEOUT_SECONDS, OCR_RESOLUTION
+)
 from utils.validators import validate_pdf_file, validate_pdf_content
+from utils.extraction_cache import ExtractionCache
+from utils.lab_tables import LAB_TABLE_HEADER, extract_page_rows, format_rows, merge_reports
+from utils.upload_store import open_upload, report_store
 
-def extract_text_from_pdf(pdf_file):
-    """Extract and validate text from PDF file."""
+try:
+    import pytesseract
+except ImportError:  # OCR is optional; text-layer PDFs still work without it
+    pytesseract = None
+
+logger = logging.getLogger(__name__)
+
+SCANNED_PDF_MESSAGE = "Could not extract text from PDF. Please ensure it's not a scanned document."
+
+# Shared by every session in this process
+_extraction_cache = ExtractionCache(EXTRACTION_CACHE_MAX_ENTRIES)
+_ocr_pool = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="pdf-ocr")
+_batch_pool = ThreadPoolExecutor(max_workers=BATCH_EXTRACTION_WORKERS, thread_name_prefix="pdf-batch")
+
+def extract_text_from_pdf(pdf_file, mode="text"):
+    """
+    Extract and validate text from PDF file.
+
+    Args:
+        pdf_file: Uploaded PDF file
+        mode: "text" for the plain text layer, or "table" to emit detected lab
+            table rows as "Test | Result | Unit | Reference Range" lines,
+            followed by the rest of the page's text. Pages without a
+            detectable table fall back to plain text.
+    """
     try:
         # Validate file first
         is_valid, error = validate_pdf_file(pdf_file)
         if not is_valid:
             return error
 
-        text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            if len(pdf.pages) > MAX_PDF_PAGES:
-                return f"PDF exceeds maximum page limit of {MAX_PDF_PAGES}"
-                
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if not extracted:
-                    return "Could not extract text from PDF. Please ensure it's not a scanned document."
-                text += extracted + "\n"
-        
-        # Validate extracted content
-        is_valid, error = validate_pdf_content(text)
-        if not is_valid:
-            return error
-            
+        text, _ = extract_report(pdf_file, mode)
         return text
     except Exception as e:
         return f"Error extracting text from PDF: {str(e)}"
+
+def _upload_key(pdf_file, mode):
+    # file_id is unique per upload; fall back to name and size where it is missing
+    return (getattr(pdf_file, "file_id", None) or f"{pdf_file.name}:{pdf_file.size}", mode)
+
+def _stored_upload(pdf_file, mode):
+    """(text, report_key) for an upload already extracted in this session, or None."""
+    report_key = st.session_state.get('extracted_uploads', {}).get(_upload_key(pdf_file, mode))
+    if report_key:
+        text = report_store.read(report_key)
+        if text is not None:
+            return text, report_key
+    return None
+
+def _remember_upload(pdf_file, mode, report_key):
+    st.session_state.setdefault('extracted_uploads', {})[_upload_key(pdf_file, mode)] = report_key
+
+def extract_report(pdf_file, mode="text"):
+    """
+    Extract and validate a PDF without re-validating the upload itself.
+    Returns (text_or_error_message, report_key). report_key is None on failure;
+    on success the text is also stored on disk under report_key so callers can
+    keep just the key in session state and read it back from report_store.
+
+    Reruns with the same upload read the stored text directly, without
+    copying or hashing the file again.
+    """
+    stored = _stored_upload(pdf_file, mode)
+    if stored:
+        return stored
+    text, report_key = _extract_report(pdf_file, mode)
+    if report_key:
+        _remember_upload(pdf_file, mode, report_key)
+    return text, report_key
+
+def _extract_report(pdf_file, mode):
+    """extract_report's work; safe to run in a pool thread (no session state)."""
+    with open_upload(pdf_file) as upload:
+        report_key = f"{upload.digest}-{mode}"
+        stored = report_store.read(report_key)
+        if stored is not None:
+            return stored, report_key
+
+        with pdfplumber.open(upload.stream) as pdf:
+            if len(pdf.pages) > MAX_PDF_PAGES:
+                return f"PDF exceeds maximum page limit of {MAX_PDF_PAGES}", None
+
+            page_texts = []
+            textless_pages = []
+            for page_number, page in enumerate(pdf.pages):
+                extracted = None
+                if mode == "table":
+                    extracted = _extract_page_table(page, upload.digest, page_number)
+                if not extracted:
+                    extracted = _extract_page_text(page, upload.digest, page_number)
+                if not extracted:
+                    textless_pages.append(page_number)
+                page_texts.append(extracted)
+
+        if textless_pages:
+            ocr_texts = _ocr_pages(upload, textless_pages)
+            if ocr_texts is None:
+                return SCANNED_PDF_MESSAGE, None
+            for page_number, extracted in ocr_texts.items():
+                page_texts[page_number] = extracted
+
+    text = "".join(extracted + "\n" for extracted in page_texts)
+
+    # Validate extracted content
+    is_valid, error = validate_pdf_content(text)
+    if not is_valid:
+        return error, None
+
+    report_store.write(report_key, (extracted + "\n" for extracted in page_texts))
+    return text, report_key
+
+def extract_reports(pdf_files, mode="text"):
+    """
+    Extract several uploaded reports concurrently and merge them into one
+    biomarker set so a single analysis can cover all of them.
+    Returns (merged_text, report_key, errors). On any failure merged_text and
+    report_key are None and errors lists one message per failed file.
+    """
+    # Uploads already extracted in this session are read back without a copy or hash
+    futures = []
+    for pdf_file in pdf_files:
+        stored = _stored_upload(pdf_file, mode)
+        futures.append((pdf_file, stored, None if stored else _batch_pool.submit(_extract_report, pdf_file, mode)))
+
+    reports = []
+    report_keys = []
+    errors = []
+    for pdf_file, stored, future in futures:
+        name = pdf_file.name
+        try:
+            text, report_key = stored or future.result()
+        except Exception as e:
+            errors.append(f"{name}: Error extracting text from PDF: {str(e)}")
+            continue
+        if not report_key:
+            errors.append(f"{name}: {text}")
+            continue
+        if not stored:
+            _remember_upload(pdf_file, mode, report_key)
+        reports.append((name, text))
+        report_keys.append(report_key)
+
+    if errors:
+        return None, None, errors
+
+    # Same set of reports in any upload order maps to the same key
+    batch_key = "batch-" + hashlib.sha256("\n".join(sorted(report_keys)).encode()).hexdigest()
+    merged = report_store.read(batch_key)
+    if merged is None:
+        merged = merge_reports(reports)
+        report_store.write(batch_key, [merged])
+    return merged, batch_key, []
+
+def _extract_page_text(page, digest, page_number):
+    """Return the page's text layer, using the shared cache."""
+    extracted = _extraction_cache.get((digest, page_number, "text"))
+    if extracted is None:
+        extracted = page.extract_text()
+        if extracted:
+            _extraction_cache.set((digest, page_number, "text"), extracted)
+    return extracted
+
+def _extract_page_table(page, digest, page_number):
+    """
+    Return the page's lab table rows as formatted lines, followed by the
+    page's text outside the tables, using the shared cache.
+    """
+    cached = _extraction_cache.get((digest, page_number, "table"))
+    if cached is None:
+        cached = extract_page_rows(page)
+        # Cache empty results too so pages without tables are not re-scanned
+        _extraction_cache.set((digest, page_number, "table"), cached)
+    rows, other_text = cached
+    if not rows:
+        return None
+    extracted = f"{LAB_TABLE_HEADER}\n{format_rows(rows)}"
+    return f"{extracted}\n{other_text}" if other_text else extracted
+
+def _ocr_pages(upload, page_numbers):
+    """
+    OCR the given pages in parallel on the shared worker pool.
+    Returns {page_number: text}, or None if OCR is unavailable or any page fails.
+    """
+    if pytesseract is None:
+        return None
+
+    results = {}
+    pending = {}
+    for page_number in page_numbers:
+        cached = _extraction_cache.get((upload.digest, page_number, "ocr"))
+        if cached is not None:
+            results[page_number] = cached
+        else:
+            pending[page_number] = _ocr_pool.submit(_ocr_page, upload.source, page_number)
+
+    for page_number, future in pending.items():
+        try:
+            extracted = future.result()
+        except Exception as e:
+            logger.warning(f"OCR failed on page {page_number + 1}: {str(e)}")
+            return None
+        if not extracted:
+            return None
+        _extraction_cache.set((upload.digest, page_number, "ocr"), extracted)
+        results[page_number] = extracted
+
+    return results
+
+def _ocr_page(source, page_number):
+    """Render a single page and run Tesseract on it within the per-page time budget."""
+    # Each worker opens its own handle; pdfplumber objects are not thread-safe
+    with pdfplumber.open(source) as pdf:
+        image = pdf.pages[page_number].to_image(resolution=OCR_RESOLUTION).original
+    # pytesseract kills the tesseract process and raises RuntimeError on timeout
+    text = pytesseract.image_to_string(image, timeout=OCR_PAGE_TIMEOUT_SECONDS)
+    return text.strip()
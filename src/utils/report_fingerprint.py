@@ -0,0 +1,23 @@
+import hashlib
+import re
+
+
+def normalize_report_text(text):
+    """Lowercase and collapse whitespace so re-extractions of the same report hash equally."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def report_fingerprint(report_key, text):
+    """
+    Build the (content_hash, text_hash) pair used to recognize a re-uploaded report.
+    content_hash comes from the uploaded bytes and the extraction mode;
+    text_hash is taken over the normalized extracted text, so the same report
+    re-exported as a different file still matches when extracted in the same
+    mode. Table and text mode produce different text, so they never match
+    each other.
+    """
+    content_hash = None
+    if report_key:
+        # Single reports are keyed "<sha256>-<mode>"; batches are "batch-<sha256>"
+        content_hash = report_key if report_key.startswith("batch-") else report_key.rsplit("-", 1)[0]
+    text_hash = hashlib.sha256(normalize_report_text(text).encode("utf-8")).hexdigest()
+    return content_hash, text_hash
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # Outside a Streamlit app (scripts, benchmarks)
+    add_script_run_ctx = get_script_run_ctx = None
+
+# Thread attribute holding the ScriptRunContext (streamlit's SCRIPT_RUN_CONTEXT_ATTR_NAME).
+# add_script_run_ctx(thread, None) re-attaches the caller's context rather than clearing it.
+_SCRIPT_RUN_CTX_ATTR = "streamlit_script_run_ctx"
+
+logger = logging.getLogger(__name__)
+
+OK, FAILED, TIMED_OUT, SKIPPED = "ok", "failed", "timeout", "skipped"
+
+
+class StepResult:
+    __slots__ = ("status", "value", "error", "seconds")
+
+    def __init__(self, status: str, value: Any = None, error: Optional[BaseException] = None, seconds: float = 0.0):
+        self.status, self.value, self.error, self.seconds = status, value, error, seconds
+
+
+class TaskGraphRun:
+    """Outcome of one TaskGraph.run(): per-step results and timings."""
+
+    def __init__(self, steps: Dict[str, StepResult], seconds: float, failed_step: Optional[str] = None):
+        self.steps = steps
+        self.seconds = seconds
+        self.failed_step = failed_step  # First required step that did not succeed
+
+    @property
+    def ok(self) -> bool:
+        """True unless a required step failed, timed out or was skipped."""
+        return self.failed_step is None
+
+    def value(self, name: str, default: Any = None) -> Any:
+        step = self.steps.get(name)
+        return step.value if step and step.status == OK else default
+
+    def timings(self) -> Dict[str, Any]:
+        """{"total_ms": ..., "<step>": {"status": ..., "ms": ...}}, for logging."""
+        timings = {"total_ms": round(self.seconds * 1000, 1)}
+        for name, step in self.steps.items():
+            timings[name] = {"status": step.status, "ms": round(step.seconds * 1000, 1)}
+        return timings
+
+
+class _Step:
+    __slots__ = ("name", "func", "deps", "timeout", "optional", "on_timeout")
+
+    def __init__(self, name, func, deps, timeout, optional, on_timeout):
+        self.name, self.func, self.deps, self.timeout, self.optional = name, func, deps, timeout, optional
+        self.on_timeout = on_timeout
+
+
+class TaskGraph:
+    """
+    A small DAG executor. Each step is called with its dependencies' results
+    as positional arguments, in the order the dependencies were listed, and
+    starts as soon as they have all finished. Independent steps run
+    concurrently on the shared pool.
+
+    A step that raises or exceeds its timeout fails the run unless it is
+    optional; steps that depend on a failed step are skipped. A timed-out
+    step cannot be interrupted, so its thread finishes in the background and
+    its result is discarded; give it an `on_timeout` callback to undo its side
+    effects, called with the value it eventually returns (None if it raised
+    or was cancelled before starting).
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self._executor = executor
+        self._steps: Dict[str, _Step] = {}
+
+    def add(self, name: str, func: Callable, deps: Sequence[str] = (), timeout: Optional[float] = None,
+            optional: bool = False, on_timeout: Optional[Callable[[Any], None]] = None) -> "TaskGraph":
+        for dep in deps:
+            if dep not in self._steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dep}'")
+        self._steps[name] = _Step(name, func, tuple(deps), timeout, optional, on_timeout)
+        return self
+
+    def _submit(self, step: _Step, args: List[Any], ctx) -> Future:
+        def call():
+            # Lets steps use st.* (e.g. st.error) from a pool thread
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+            started = time.perf_counter()
+            try:
+                return step.func(*args), time.perf_counter() - started
+            finally:
+                if ctx is not None:
+                    # Pool threads outlive the session; do not leave its context on them
+                    setattr(threading.current_thread(), _SCRIPT_RUN_CTX_ATTR, None)
+        return self._executor.submit(call)
+
+    @staticmethod
+    def _abandon(step: _Step, future: Future):
+        """Hand a timed-out step's eventual value to its on_timeout callback."""
+        def cleanup(done: Future):
+            value = None
+            if not done.cancelled() and done.exception() is None:
+                value = done.result()[0]
+            try:
+                step.on_timeout(value)
+            except Exception as e:
+                logger.warning("Cleanup after step %s timed out failed: %s", step.name, e)
+        future.add_done_callback(cleanup)
+
+    def run(self) -> TaskGraphRun:
+        ctx = get_script_run_ctx() if get_script_run_ctx else None
+        started = time.perf_counter()
+        results: Dict[str, StepResult] = {}
+        running: Dict[Future, tuple] = {}  # future -> (step, submitted at)
+        pending = list(self._steps.values())
+        failed_step = None
+
+        while pending or running:
+            # Start every step whose dependencies are done; skip those that cannot run
+            for step in list(pending):
+                dep_results = [results.get(dep) for dep in step.deps]
+                if any(result is None for result in dep_results):
+                    continue
+                pending.remove(step)
+                if failed_step or any(result.status != OK for result in dep_results):
+                    results[step.name] = StepResult(SKIPPED)
+                    if not step.optional:
+                        failed_step = failed_step or step.name
+                    continue
+                future = self._submit(step, [result.value for result in dep_results], ctx)
+                running[future] = (step, time.perf_counter())
+
+            if not running:
+                continue
+
+            now = time.perf_counter()
+            deadlines = [submitted + step.timeout - now for step, submitted in running.values() if step.timeout]
+            wait(running, timeout=max(min(deadlines), 0) if deadlines else None, return_when=FIRST_COMPLETED)
+
+            now = time.perf_counter()
+            for future, (step, submitted) in list(running.items()):
+                if future.done():
+                    try:
+                        value, seconds = future.result()
+                        results[step.name] = StepResult(OK, value, seconds=seconds)
+                    except Exception as e:
+                        logger.warning("Step %s failed: %s", step.name, e)
+                        results[step.name] = StepResult(FAILED, error=e, seconds=now - submitted)
+                elif step.timeout and now - submitted >= step.timeout:
+                    future.cancel()
+                    if step.on_timeout:
+                        self._abandon(step, future)
+                    logger.warning("Step %s timed out after %.1fs", step.name, step.timeout)
+                    results[step.name] = StepResult(TIMED_OUT, seconds=now - submitted)
+                else:
+                    continue
+                del running[future]
+                if results[step.name].status != OK and not step.optional:
+                    failed_step = failed_step or step.name
+
+        return TaskGraphRun({name: results[name] for name in self._steps}, time.perf_counter() - started, failed_step)
@@ -0,0 +1,123 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from config.app_config import (
+    UPLOAD_SPOOL_THRESHOLD_MB, UPLOAD_CHUNK_SIZE_KB,
+    REPORT_STORE_DIR, REPORT_STORE_MAX_MB
+)
+
+
+class SpooledUpload:
+    """An uploaded PDF opened for extraction, plus its content hash."""
+
+    def __init__(self, stream, digest, path=None):
+        self.stream = stream
+        self.digest = digest
+        # Set when the upload was spooled to disk; workers can reopen the file by path
+        self.path = path
+
+    @property
+    def source(self):
+        """Something pdfplumber.open() can take in another thread."""
+        return self.path if self.path else io.BytesIO(self.stream.getvalue())
+
+
+@contextmanager
+def open_upload(uploaded_file):
+    """
+    Yield a SpooledUpload for an uploaded file.
+    Uploads above UPLOAD_SPOOL_THRESHOLD_MB are copied to a temp file in
+    chunks and memory-mapped, so extraction never builds a second full
+    in-memory copy. The temp file is removed on exit.
+    """
+    if uploaded_file.size <= UPLOAD_SPOOL_THRESHOLD_MB * 1024 * 1024:
+        data = uploaded_file.getvalue()
+        yield SpooledUpload(io.BytesIO(data), hashlib.sha256(data).hexdigest())
+        return
+
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spool:
+        while chunk := uploaded_file.read(UPLOAD_CHUNK_SIZE_KB * 1024):
+            digest.update(chunk)
+            spool.write(chunk)
+    uploaded_file.seek(0)
+
+    try:
+        with open(spool.name, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield SpooledUpload(mapped, digest.hexdigest(), path=spool.name)
+        finally:
+            mapped.close()
+    finally:
+        os.remove(spool.name)
+
+
+class ReportTextStore:
+    """
+    Disk-backed store for extracted report text, keyed by content hash.
+    Session state only keeps the key; the text is read back when needed.
+    The oldest files are evicted once the store exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def read(self, key):
+        """Return the stored text, or None if it was never stored or was evicted."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key, chunks):
+        """Stream text chunks to disk. The entry appears atomically once complete."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".txt"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+report_store = ReportTextStore(
+    os.path.join(tempfile.gettempdir(), REPORT_STORE_DIR),
+    REPORT_STORE_MAX_MB * 1024 * 1024
+)
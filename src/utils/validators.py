@@ -1,5 +1,6 @@
 import re
 from config.app_config import MAX_UPLOAD_SIZE_MB
+from utils.keyword_matcher import KeywordMatcher
 
 def validate_password(password):
     """Validate password meets security requirements."""
@@ -51,22 +52,21 @@ def validate_pdf_file(file):
         
     return True, None
 
+# Common medical report indicators
+_medical_term_matcher = KeywordMatcher([
+    'blood', 'test', 'report', 'laboratory', 'lab', 'patient', 'specimen',
+    'reference range', 'analysis', 'results', 'medical', 'diagnostic',
+    'hemoglobin', 'wbc', 'rbc', 'platelet', 'glucose', 'creatinine'
+])
+
 def validate_pdf_content(text):
     """Validate if the PDF content appears to be a medical report."""
-    # Common medical report indicators
-    medical_terms = [
-        'blood', 'test', 'report', 'laboratory', 'lab', 'patient', 'specimen',
-        'reference range', 'analysis', 'results', 'medical', 'diagnostic',
-        'hemoglobin', 'wbc', 'rbc', 'platelet', 'glucose', 'creatinine'
-    ]
-    
     # Validate minimum text length
     if len(text.strip()) < 50:
         return False, "Extracted text is too short. Please ensure the PDF contains valid text."
     
-    # Check for medical terms
-    text_lower = text.lower()
-    term_matches = sum(1 for term in medical_terms if term in text_lower)
+    # Distinct medical terms, each starting a word; "laboratory" no longer also counts as "lab"
+    term_matches = len(_medical_term_matcher.count(text))
     
     if term_matches < 3:
         return False, "The uploaded file doesn't appear to be a medical report. Please upload a valid medical report."
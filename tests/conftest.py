@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs with src/ as its working directory (streamlit run src/main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
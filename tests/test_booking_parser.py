@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+
+from config.app_config import BOOKING_PARSER_MIN_CONFIDENCE
+from services.booking_parser import parse_booking_text
+
+CITIES = frozenset(["Delhi", "Mumbai", "Pune", "Bangalore", "Gurugram"])
+TODAY = date(2026, 10, 19)  # A Monday
+
+
+def parse(text):
+    return parse_booking_text(text, CITIES, TODAY)
+
+
+def days(*isoformat):
+    return list(isoformat)
+
+
+@pytest.mark.parametrize("text, cities, dates", [
+    ("Delhi, next Tuesday", ["Delhi"], days("2026-10-27")),
+    ("Delhi, Friday", ["Delhi"], days("2026-10-23")),
+    ("Delhi tomorrow", ["Delhi"], days("2026-10-20")),
+    ("Mumbai or Pune, 27-29 Oct", ["Mumbai", "Pune"], days("2026-10-27", "2026-10-28", "2026-10-29")),
+    ("Delhi between 27/10 and 29/10", ["Delhi"], days("2026-10-27", "2026-10-28", "2026-10-29")),
+    ("Gurgaon this weekend", ["Gurugram"], days("2026-10-24", "2026-10-25")),
+    ("Delhi next tuesday or wednesday", ["Delhi"], days("2026-10-27", "2026-10-28")),
+])
+def test_common_phrasings(text, cities, dates):
+    parsed, confidence = parse(text)
+    assert parsed["cities"] == cities
+    assert parsed["potential_dates"] == dates
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize("text, dates", [
+    ("Delhi, tuesday or wednesday next week", days("2026-10-27", "2026-10-28")),
+    ("Delhi tuesday of next week", days("2026-10-27")),
+    ("Delhi next week, monday or friday", days("2026-10-26", "2026-10-30")),
+    ("Delhi tue-thu next week", days("2026-10-27", "2026-10-28", "2026-10-29")),
+    ("Delhi wednesday this week", days("2026-10-21")),
+    ("Delhi friday this week and monday next week", days("2026-10-23", "2026-10-26")),
+])
+def test_weekdays_follow_the_week_they_are_in(text, dates):
+    parsed, confidence = parse(text)
+    assert parsed["potential_dates"] == dates
+    assert confidence == 1.0
+
+
+def test_next_week_alone_is_the_whole_week():
+    parsed, _ = parse("Delhi next week")
+    assert parsed["potential_dates"] == days("2026-10-26", "2026-10-27", "2026-10-28", "2026-10-29",
+                                             "2026-10-30", "2026-10-31", "2026-11-01")
+
+
+@pytest.mark.parametrize("text, first, last", [
+    ("Delhi second week of november", "2026-11-08", "2026-11-14"),
+    ("Delhi first week of december", "2026-12-01", "2026-12-07"),
+    ("Delhi last week of feb 2027", "2027-02-22", "2027-02-28"),
+])
+def test_nth_week_of_month(text, first, last):
+    parsed, confidence = parse(text)
+    assert (parsed["potential_dates"][0], parsed["potential_dates"][-1]) == (first, last)
+    assert len(parsed["potential_dates"]) == 7
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize("text", [
+    "Delhi within a week",
+    "Delhi end of the week",
+    "Delhi in november",
+    "Delhi, the week after next",
+    "Delhi, any day except tuesday",
+    "Delhi on the 3rd",
+    "Delhi",
+    "next tuesday",
+])
+def test_partly_understood_requests_go_to_the_llm(text):
+    _, confidence = parse(text)
+    assert confidence < BOOKING_PARSER_MIN_CONFIDENCE
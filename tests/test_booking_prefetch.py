@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+from services.booking_prefetch import BookingPrefetchCache, BookingSnapshot
+from services.doctor_directory import Doctor
+
+TODAY = date(2026, 10, 19)
+DAYS = [TODAY + timedelta(days=offset) for offset in range(14)]
+
+
+def doctor(doctor_id):
+    return Doctor({"id": doctor_id, "Name": doctor_id, "city": "Delhi", "working days": "Mon-Sat"})
+
+
+@pytest.fixture
+def snapshot():
+    doctors = [doctor(f"d{i}") for i in range(5)]
+    return BookingSnapshot("Cardiologist", DAYS, {"delhi": (doctors, {})}, {"Delhi": doctors[:2]}, {"Delhi": None}), doctors
+
+
+def test_covers_only_prefetched_days(snapshot):
+    snap, _ = snapshot
+    assert snap.covers([TODAY, TODAY + timedelta(days=13)])
+    assert not snap.covers([TODAY + timedelta(days=14)])
+    assert not snap.covers([])
+
+
+def test_unsynced_are_the_doctors_beyond_the_prefetched_top(snapshot):
+    snap, doctors = snapshot
+    assert [doc.id for doc in snap.unsynced(doctors, [TODAY])] == ["d2", "d3", "d4"]
+    # Dates the prefetch did not load need every doctor synced
+    assert snap.unsynced(doctors, [TODAY + timedelta(days=20)]) == doctors
+
+
+def test_bucket_lookup_ignores_case(snapshot):
+    snap, doctors = snapshot
+    assert snap.bucket("DELHI")[0] == doctors
+    assert snap.bucket("Pune") is None
+
+
+def test_cache_builds_once_and_never_waits():
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(2)
+        return "snapshot"
+
+    cache = BookingPrefetchCache(ttl_seconds=60)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = cache.start("Cardiologist", build, pool)
+        assert cache.start("cardiologist", build, pool) is first
+        assert cache.get("Cardiologist") is None  # Still building
+        release.set()
+        first.result(2)
+    assert cache.get("CARDIOLOGIST") == "snapshot"
+    assert builds == [1]
+
+
+def test_failed_or_expired_builds_are_rebuilt():
+    def fail():
+        raise RuntimeError("directory unavailable")
+
+    cache = BookingPrefetchCache(ttl_seconds=60)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        cache.start("Cardiologist", fail, pool).exception(2)
+        assert cache.get("Cardiologist") is None
+        assert cache.start("Cardiologist", lambda: "snapshot", pool).result(2) == "snapshot"
+
+        expired = BookingPrefetchCache(ttl_seconds=0)
+        expired.start("Cardiologist", lambda: "old", pool).result(2)
+        assert expired.get("Cardiologist") is None
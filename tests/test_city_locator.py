@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from config.city_locations import CITY_COORDINATES
+from services.city_locator import CityLocator
+
+
+@pytest.fixture(scope="module")
+def locator():
+    return CityLocator(CITY_COORDINATES)
+
+
+def test_distances_are_great_circle(locator):
+    assert locator.distance_km("Delhi", "Gurugram") == pytest.approx(25, abs=5)
+    assert locator.distance_km("Delhi", "Mumbai") == pytest.approx(1150, abs=20)
+    assert locator.distance_km("Chennai", "Chennai") == 0
+
+
+@pytest.mark.parametrize("city", sorted(CITY_COORDINATES))
+def test_nearest_matches_a_brute_force_ranking(locator, city):
+    found = list(locator.nearest(city))
+    expected = sorted(locator.distance_km(city, other) for other in CITY_COORDINATES if other != city)
+    assert sorted(name for name, _ in found) == sorted(set(CITY_COORDINATES) - {city})
+    assert [distance for _, distance in found] == pytest.approx(expected)
+
+
+def test_nearest_on_random_points():
+    rng = random.Random(7)
+    coordinates = {f"c{i}": (rng.uniform(-80, 80), rng.uniform(-180, 180)) for i in range(300)}
+    locator = CityLocator(coordinates)
+    found = [distance for _, distance in locator.nearest("c0")]
+    expected = sorted(locator.distance_km("c0", other) for other in coordinates if other != "c0")
+    assert found == pytest.approx(expected)
+
+
+def test_locate_accepts_aliases_and_typos(locator):
+    assert locator.locate("Bengaluru") == "Bangalore"
+    assert locator.locate("Hyderbad") == "Hyderabad"
+    assert locator.locate("Atlantis") is None
@@ -0,0 +1,56 @@
+import pytest
+
+from services.city_resolver import CityResolver, max_edits
+
+CITIES = ["Bangalore", "Chennai", "Delhi", "Gurugram", "Kolkata", "Mumbai"]
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return CityResolver(CITIES)
+
+
+@pytest.mark.parametrize("name, city", [
+    ("delhi", "Delhi"),
+    ("  MUMBAI ", "Mumbai"),
+    ("New Delhi", "Delhi"),
+    ("Bengaluru", "Bangalore"),
+    ("Gurgaon", "Gurugram"),
+    ("blr", "Bangalore"),
+    ("ggn", "Gurugram"),
+])
+def test_exact_names_and_aliases(resolver, name, city):
+    assert resolver.resolve(name) == (city, None)
+
+
+@pytest.mark.parametrize("name, city", [
+    ("Dehli", "Delhi"),
+    ("Mumbay", "Mumbai"),
+    ("Chenai", "Chennai"),
+    ("Kolkatta", "Kolkata"),
+    ("Bangalroe", "Bangalore"),
+    ("Bengalooru", "Bangalore"),
+])
+def test_typos_within_budget_are_corrected(resolver, name, city):
+    assert resolver.resolve(name) == (city, None)
+
+
+@pytest.mark.parametrize("name", ["Goa", "Bir", "Pune", "Noida", "Dilli", ""])
+def test_unrelated_names_are_not_matched(resolver, name):
+    assert resolver.resolve(name) == (None, None)
+
+
+@pytest.mark.parametrize("name, suggestion", [
+    ("Mumbai city", "Mumbai"),
+    ("Delhi Cantt", "Delhi"),
+])
+def test_distant_but_similar_names_are_only_suggested(resolver, name, suggestion):
+    assert resolver.resolve(name) == (None, suggestion)
+
+
+def test_short_names_get_no_typo_budget():
+    assert [max_edits(name) for name in ("goa", "pune", "mumbai", "bangalore")] == [0, 1, 1, 2]
+
+
+def test_aliases_for_missing_cities_are_ignored():
+    assert CityResolver(["Delhi"]).resolve("Bengaluru") == (None, None)
@@ -0,0 +1,95 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from services.doctor_schedule import ALL_WEEK, SlotBook, first_available, parse_working_days, works_on
+
+SLOTS = ["09:00", "10:00", "11:00"]
+MON = date(2026, 10, 19)
+WEEKDAYS = parse_working_days("Mon-Fri")
+
+
+@pytest.mark.parametrize("text, days", [
+    ("Monday - Saturday", [0, 1, 2, 3, 4, 5]),
+    ("Mon to Fri", [0, 1, 2, 3, 4]),
+    ("Fri - Mon", [0, 4, 5, 6]),
+    ("Tuesday, Thursday, Saturday", [1, 3, 5]),
+    ("Daily", list(range(7))),
+    ("By Appointment", []),
+])
+def test_parse_working_days(text, days):
+    assert parse_working_days(text) == sum(1 << day for day in days)
+
+
+def fill(book, doctor_id, day):
+    for slot in SLOTS:
+        assert book.reserve(doctor_id, day, slot)
+
+
+def test_slots_fill_in_order_up_to_capacity():
+    book = SlotBook(SLOTS, capacity=2)
+    assert book.free_slot("d1", WEEKDAYS, MON) == "09:00"
+    assert book.reserve("d1", MON, "09:00") and book.reserve("d1", MON, "09:00")
+    assert not book.reserve("d1", MON, "09:00")
+    assert book.free_slot("d1", WEEKDAYS, MON) == "10:00"
+    book.release("d1", MON, "09:00")
+    assert book.free_slot("d1", WEEKDAYS, MON) == "09:00"
+
+
+def test_days_off_have_no_slots():
+    book = SlotBook(SLOTS, capacity=1)
+    assert not works_on(WEEKDAYS, MON + timedelta(days=5))
+    assert book.free_slot("d1", WEEKDAYS, MON + timedelta(days=5)) is None
+    assert book.first_free_slot("d1", WEEKDAYS, MON + timedelta(days=5)) == (MON + timedelta(days=7), "09:00")
+    assert book.first_free_slot("d1", 0, MON) is None
+
+
+def test_first_free_slot_skips_runs_of_full_days():
+    book = SlotBook(SLOTS, capacity=1)
+    for offset in (0, 1, 3, 2):  # Out of order, so intervals merge from both sides
+        fill(book, "d1", MON + timedelta(days=offset))
+    assert book._full_days["d1"] == [(MON.toordinal(), MON.toordinal() + 3)]
+    assert book.first_free_slot("d1", ALL_WEEK, MON) == (MON + timedelta(days=4), "09:00")
+
+    book.release("d1", MON + timedelta(days=1), "10:00")
+    assert book._full_days["d1"] == [(MON.toordinal(), MON.toordinal()), (MON.toordinal() + 2, MON.toordinal() + 3)]
+    assert book.first_free_slot("d1", ALL_WEEK, MON) == (MON + timedelta(days=1), "10:00")
+
+
+def test_set_day_replaces_counts_and_places_unslotted_bookings():
+    book = SlotBook(SLOTS, capacity=1)
+    book.set_day("d1", MON, ["10:00", None, None])
+    assert book.free_slot("d1", WEEKDAYS, MON) is None
+    book.set_day("d1", MON, ["10:00"])
+    assert book.free_slot("d1", WEEKDAYS, MON) == "09:00"
+
+
+def test_interval_index_matches_a_day_by_day_scan():
+    rng = random.Random(3)
+    book = SlotBook(SLOTS, capacity=1)
+    days = [MON + timedelta(days=offset) for offset in range(60)]
+    for _ in range(400):
+        day, slot = rng.choice(days), rng.choice(SLOTS)
+        if rng.random() < 0.7:
+            book.reserve("d1", day, slot)
+        else:
+            book.release("d1", day, slot)
+        start = rng.choice(days)
+        expected = next(((d, book.free_slot("d1", ALL_WEEK, d)) for d in
+                         (start + timedelta(days=i) for i in range(91)) if book.free_slot("d1", ALL_WEEK, d)), None)
+        assert book.first_free_slot("d1", ALL_WEEK, start) == expected
+
+
+def test_first_available_follows_rank_order():
+    book = SlotBook(SLOTS, capacity=1)
+
+    class Doc:
+        def __init__(self, doctor_id, mask):
+            self.id, self.weekday_mask = doctor_id, mask
+
+    busy, free = Doc("busy", WEEKDAYS), Doc("free", WEEKDAYS)
+    fill(book, "busy", MON)
+    assert first_available([busy, free], [MON], book) == (free, MON, "09:00")
+    assert first_available([busy, free], [MON, MON + timedelta(days=1)], book) == (busy, MON + timedelta(days=1), "09:00")
+    assert first_available([busy], [MON + timedelta(days=5)], book) is None
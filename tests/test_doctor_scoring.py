@@ -0,0 +1,72 @@
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.doctor_ranking import MergedRanking, RankedDoctors
+from services.doctor_scoring import column_bounds, days_until_available, doctor_columns, iter_top_indices, score_doctors
+
+MON, TUE, WED = date(2026, 10, 19), date(2026, 10, 20), date(2026, 10, 21)
+WEEKDAYS = 0b0011111
+
+
+def doctor(name, experience, fee, weekday_mask=WEEKDAYS):
+    return SimpleNamespace(name=name, experience_years=experience, fee=fee, weekday_mask=weekday_mask)
+
+
+def names(doctors):
+    return [doc.name for doc in doctors]
+
+
+def test_days_until_available_counts_from_the_first_requested_date():
+    masks = np.array([1 << MON.weekday(), 1 << WED.weekday(), 1 << 6])
+    assert days_until_available(masks, [WED, MON, TUE]).tolist() == [0.0, 2.0, np.inf]
+    assert np.isinf(days_until_available(masks, [])).all()
+
+
+def test_score_prefers_experience_then_fee():
+    doctors = [doctor("junior", 5, 500), doctor("senior", 20, 500), doctor("cheap", 5, 200)]
+    scores = score_doctors(doctor_columns(doctors), {"experience": 0.6, "fee": 0.4})
+    assert names(RankedDoctors(doctors, scores)) == ["senior", "cheap", "junior"]
+
+
+def test_availability_ranks_doctors_working_the_earliest_date_first():
+    doctors = [doctor("wednesday", 10, 500, 1 << WED.weekday()), doctor("monday", 10, 500, 1 << MON.weekday())]
+    scores = score_doctors(doctor_columns(doctors), {"availability": 1.0}, [MON, WED])
+    assert names(RankedDoctors(doctors, scores)) == ["monday", "wednesday"]
+
+
+def test_unknown_criteria_are_ignored():
+    doctors = [doctor("a", 5, 500), doctor("b", 10, 500)]
+    scores = score_doctors(doctor_columns(doctors), {"experience": 1.0, "proximity": 5.0})
+    assert scores.tolist() == [0.0, 1.0]
+
+
+def test_shared_bounds_make_separate_buckets_comparable():
+    delhi = [doctor("delhi", 10, 500)]
+    noida = [doctor("noida-senior", 20, 500), doctor("noida-junior", 2, 500)]
+    columns = [doctor_columns(delhi), doctor_columns(noida)]
+    bounds = column_bounds(columns)
+    assert bounds["experience"] == (2.0, 20.0)
+
+    weights = {"experience": 1.0}
+    merged = MergedRanking([
+        RankedDoctors(bucket, score_doctors(cols, weights, bounds=bounds))
+        for bucket, cols in zip([delhi, noida], columns)
+    ])
+    assert names(merged) == ["noida-senior", "delhi", "noida-junior"]
+
+
+def test_iter_top_indices_is_a_stable_descending_order():
+    scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9] * 10)
+    order = list(iter_top_indices(scores, first_chunk=3))
+    expected = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+    assert order == expected
+
+
+def test_pages_continue_the_same_ranking():
+    doctors = [doctor(f"d{i}", i, 500) for i in range(10)]
+    scores = score_doctors(doctor_columns(doctors), {"experience": 1.0})
+    full = names(RankedDoctors(doctors, scores))
+    ranking = RankedDoctors(doctors, scores)
+    assert names(ranking.page(0, 3) + ranking.page(1, 3) + ranking.page(2, 3)) == full[:9]
@@ -0,0 +1,41 @@
+from utils.keyword_matcher import KeywordMatcher
+
+
+def test_counts_each_keyword_case_insensitively():
+    matcher = KeywordMatcher(["glucose", "hba1c"])
+    assert matcher.count("Glucose 110, HbA1c 6.1, fasting GLUCOSE 98") == {"glucose": 2, "hba1c": 1}
+    assert matcher.count("") == {}
+    assert matcher.count(None) == {}
+
+
+def test_matches_start_on_a_word_boundary():
+    matcher = KeywordMatcher(["renal"])
+    assert matcher.count("adrenal gland, renal function") == {"renal": 1}
+
+
+def test_longest_keyword_wins_at_a_position():
+    matcher = KeywordMatcher(["blood", "blood pressure"])
+    assert matcher.count("High blood pressure; blood sugar normal") == {"blood pressure": 1, "blood": 1}
+
+
+def test_spaces_match_line_breaks_in_extracted_text():
+    matcher = KeywordMatcher(["white  blood cell"])
+    assert matcher.count("White\nblood   cell count") == {"white blood cell": 1}
+
+
+def test_labels_sum_hits_per_label_in_order_of_first_appearance():
+    matcher = KeywordMatcher({"cholesterol": "Cardiologist", "blood pressure": "Cardiologist",
+                              "creatinine": "Nephrologist"})
+    text = "creatinine raised; cholesterol high; blood pressure 150/95"
+    assert matcher.count_labels(text) == {"Nephrologist": 1, "Cardiologist": 2}
+    assert list(matcher.count_labels(text)) == ["Nephrologist", "Cardiologist"]
+
+
+def test_keywords_with_regex_characters_are_literal():
+    matcher = KeywordMatcher(["vitamin b12 (cobalamin)", "t3"])
+    assert matcher.count("Vitamin B12 (cobalamin): 180; T3 normal") == {"vitamin b12 (cobalamin)": 1, "t3": 1}
+
+
+def test_without_word_boundary_keywords_match_inside_words():
+    matcher = KeywordMatcher(["renal", "diabetes"], word_boundary=False)
+    assert matcher.count("Cardiorenal syndrome; Prediabetes (High)") == {"renal": 1, "diabetes": 1}
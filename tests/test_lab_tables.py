@@ -0,0 +1,103 @@
+from utils.lab_tables import extract_page_rows, merge_reports, parse_report_rows, split_report_lines
+
+
+class FakeTable:
+    def __init__(self, rows, bbox):
+        self.rows = rows
+        self.bbox = bbox
+
+    def extract(self):
+        return self.rows
+
+
+class FakePage:
+    """Just enough of a pdfplumber page: tables, and text lines placed at a y position."""
+
+    def __init__(self, tables, lines):
+        self.tables = tables
+        self.lines = lines  # [(top, text)]
+
+    def find_tables(self, table_settings):
+        return self.tables if table_settings["vertical_strategy"] == "lines" else []
+
+    def outside_bbox(self, bbox):
+        _, top, _, bottom = bbox
+        return FakePage(self.tables, [(y, text) for y, text in self.lines if not top <= y <= bottom])
+
+    def extract_text(self):
+        return "\n".join(text for _, text in self.lines)
+
+
+def test_table_mode_keeps_text_outside_the_table():
+    table = FakeTable([
+        ["Test", "Result", "Unit", "Reference Range"],
+        ["Hemoglobin", "13.5", "g/dL", "13-17"],
+    ], bbox=(0, 100, 500, 200))
+    page = FakePage([table], [
+        (50, "Patient: A. Kumar  Age: 45 years"),
+        (120, "Hemoglobin 13.5 g/dL 13-17"),
+        (250, "Interpretation: values within normal limits"),
+    ])
+
+    rows, other_text = extract_page_rows(page)
+
+    assert rows == [("Hemoglobin", "13.5", "g/dL", "13-17")]
+    assert "Patient: A. Kumar" in other_text
+    assert "Interpretation" in other_text
+    assert "Hemoglobin" not in other_text
+
+
+def test_page_without_a_lab_table_has_no_rows():
+    page = FakePage([FakeTable([["a", "b"]], bbox=(0, 0, 10, 10))], [(5, "text")])
+    assert extract_page_rows(page) == ([], "")
+
+
+def test_result_line_without_a_colon_is_parsed():
+    assert parse_report_rows("Hemoglobin 13.5 g/dL 13-17") == [("Hemoglobin", "13.5", "g/dL", "13-17")]
+
+
+def test_result_line_with_reference_in_parentheses():
+    assert parse_report_rows("Hemoglobin: 13.5 g/dL (Reference: 12.0-15.5)") == [
+        ("Hemoglobin", "13.5", "g/dL", "12.0-15.5")
+    ]
+
+
+def test_result_line_with_a_percentage():
+    assert parse_report_rows("Neutrophils: 60%") == [("Neutrophils", "60", "%", "")]
+
+
+def test_test_names_may_contain_digits():
+    assert parse_report_rows("Vitamin B12 450 pg/mL 200-900") == [("Vitamin B12", "450", "pg/mL", "200-900")]
+
+
+def test_header_and_prose_lines_are_not_results():
+    text = "\n".join([
+        "Age: 45 years",
+        "Date: 15/03/2024",
+        "Sample collected at 9 am",
+        "Interpretation: values within normal limits",
+    ])
+    rows, other_lines = split_report_lines(text)
+    assert rows == []
+    assert other_lines == text.splitlines()
+
+
+def test_merge_keeps_unparsed_lines():
+    report = "Patient: A. Kumar\nAge: 45 years\nHemoglobin 13.5 g/dL 13-17\nComment: repeat in 3 months"
+    merged = merge_reports([("cbc.pdf", report)])
+    assert "Hemoglobin | 13.5 | g/dL | 13-17" in merged
+    assert "Age: 45 years" in merged
+    assert "Comment: repeat in 3 months" in merged
+
+
+def test_merge_keeps_the_same_result_from_different_reports():
+    merged = merge_reports([
+        ("march.pdf", "Glucose: 110 mg/dL"),
+        ("june.pdf", "Glucose: 110 mg/dL"),
+    ])
+    assert merged.count("Glucose | 110 | mg/dL") == 2
+
+
+def test_merge_drops_rows_repeated_within_a_report():
+    merged = merge_reports([("cbc.pdf", "Glucose: 110 mg/dL\nGlucose: 110 mg/dL")])
+    assert merged.count("Glucose | 110 | mg/dL") == 1
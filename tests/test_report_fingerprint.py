@@ -0,0 +1,17 @@
+from utils.report_fingerprint import report_fingerprint
+
+
+def test_content_hash_comes_from_the_report_key():
+    assert report_fingerprint("abc123-table", "text")[0] == "abc123"
+    assert report_fingerprint("batch-def456", "text")[0] == "batch-def456"
+    assert report_fingerprint(None, "text")[0] is None
+
+
+def test_text_hash_ignores_case_and_whitespace():
+    assert report_fingerprint(None, "Hemoglobin  13.5\n g/dL")[1] == report_fingerprint(None, "hemoglobin 13.5 g/dl")[1]
+
+
+def test_table_and_text_mode_extractions_do_not_match():
+    table = "Test | Result | Unit | Reference Range\nHemoglobin | 13.5 | g/dL | 13-17"
+    text = "Hemoglobin 13.5 g/dL 13-17"
+    assert report_fingerprint(None, table)[1] != report_fingerprint(None, text)[1]
@@ -0,0 +1,25 @@
+import pytest
+
+from services.risk_specialties import get_specialties_from_risks
+
+
+@pytest.mark.parametrize("risk, specialty", [
+    ("Prediabetes (High)", "Endocrinology"),
+    ("Prehypertension", "Cardiology"),
+    ("Cardiorenal syndrome", "Nephrology"),
+    ("Hypocreatininemia", "Nephrology"),
+    ("Iron deficiency anemia", "Hematology"),
+    ("Non-alcoholic fatty liver disease", "Hepatology"),
+])
+def test_risk_keywords_match_inside_longer_labels(risk, specialty):
+    assert get_specialties_from_risks([risk]) == [(specialty, 1)]
+
+
+def test_specialties_are_weighted_by_matching_risks():
+    risks = ["Hypertension", "Diabetes mellitus", "Hyperlipidemia", "Renal impairment"]
+    assert get_specialties_from_risks(risks) == [("Cardiology", 2), ("Endocrinology", 1), ("Nephrology", 1)]
+
+
+def test_no_risks_or_no_match():
+    assert get_specialties_from_risks([]) == []
+    assert get_specialties_from_risks(["Vitamin D deficiency"]) == []
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+
+from services.sig_parser import parse_sig, parse_sig_text
+
+TODAY = date(2026, 10, 19)
+
+
+def sig(text):
+    return parse_sig(text, TODAY)
+
+
+def test_full_instruction():
+    assert sig("Crocin 500mg twice daily for 7 days") == {
+        "name": "Crocin",
+        "dosage": "500mg",
+        "frequency": "twice daily",
+        "alert_times": ["09:00", "21:00"],
+        "end_date": "2026-10-26",
+        "notes": None,
+    }
+
+
+@pytest.mark.parametrize("text, frequency, times", [
+    ("Metformin 1-0-1", "1-0-1", ["08:00", "22:00"]),
+    ("Aspirin at bedtime", "at bedtime", ["22:00"]),
+    ("Pantop 40mg before breakfast", "before breakfast", ["08:00"]),
+    ("Glycomet 500mg BD", "twice daily", ["09:00", "21:00"]),
+])
+def test_frequencies(text, frequency, times):
+    parsed = sig(text)
+    assert (parsed["frequency"], parsed["alert_times"]) == (frequency, times)
+
+
+@pytest.mark.parametrize("text, times", [
+    ("Crocin 500mg every 6 hours", ["02:00", "08:00", "14:00", "20:00"]),
+    ("Augmentin 625mg q8h", ["00:00", "08:00", "16:00"]),
+    ("Azithral 500mg every 24 hours", ["08:00"]),
+    ("Dolo 650mg q 12 h", ["08:00", "20:00"]),
+])
+def test_every_n_hours_is_evenly_spaced(text, times):
+    assert sig(text)["alert_times"] == times
+
+
+def test_every_n_hours_that_does_not_divide_the_day_is_not_parsed():
+    assert sig("Crocin 500mg every 5 hours") is None
+
+
+def test_empty_stomach_is_a_note_not_part_of_the_name():
+    parsed = sig("Thyronorm 50mcg empty stomach morning")
+    assert (parsed["name"], parsed["dosage"], parsed["notes"]) == ("Thyronorm", "50mcg", "empty stomach")
+
+
+@pytest.mark.parametrize("text", [
+    "Glycomet 500 BD",  # 500 what?
+    "Augmentin 625 q8h",
+    "Crocin 500mg twice daily as needed",
+    "Crocin 500mg twice daily unless fever settles",
+    "Crocin sometimes twice daily for pain",
+    "Twice daily",
+])
+def test_anything_not_understood_goes_to_the_llm(text):
+    assert sig(text) is None
+
+
+def test_several_medications_in_one_sentence():
+    parsed = parse_sig_text("Take 500mg Crocin twice daily for 3 days, and Aspirin every night.", TODAY)
+    assert [(med["name"], med["alert_times"]) for med in parsed] == [("Crocin", ["09:00", "21:00"]), ("Aspirin", ["22:00"])]
+
+
+def test_one_unparsed_medication_sends_the_whole_text_to_the_llm():
+    assert parse_sig_text("Telma 40mg morning\nGlycomet 500 BD", TODAY) is None
@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import task_graph
+from utils.task_graph import FAILED, SKIPPED, TIMED_OUT, TaskGraph
+
+
+@pytest.fixture
+def pool():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_steps_get_their_dependencies_results_in_order(pool):
+    graph = TaskGraph(pool)
+    graph.add("a", lambda: 2)
+    graph.add("b", lambda: 3)
+    graph.add("ratio", lambda b, a: b / a, deps=["b", "a"])
+    run = graph.run()
+    assert run.ok
+    assert run.value("ratio") == 1.5
+    assert set(run.timings()) == {"total_ms", "a", "b", "ratio"}
+
+
+def test_independent_steps_run_concurrently(pool):
+    barrier = threading.Barrier(2, timeout=2)
+    graph = TaskGraph(pool)
+    graph.add("a", barrier.wait)
+    graph.add("b", barrier.wait)
+    assert graph.run().ok
+
+
+def test_unknown_dependency_is_rejected(pool):
+    with pytest.raises(ValueError):
+        TaskGraph(pool).add("b", lambda a: a, deps=["a"])
+
+
+def test_failed_optional_step_does_not_fail_the_run(pool):
+    def boom():
+        raise RuntimeError("down")
+
+    graph = TaskGraph(pool)
+    graph.add("main", lambda: "ok")
+    graph.add("extra", boom, optional=True)
+    graph.add("after_extra", lambda extra: extra, deps=["extra"], optional=True)
+    run = graph.run()
+    assert run.ok and run.value("main") == "ok"
+    assert (run.steps["extra"].status, run.steps["after_extra"].status) == (FAILED, SKIPPED)
+    assert run.value("extra", "fallback") == "fallback"
+
+
+def test_failed_required_step_skips_its_dependents(pool):
+    graph = TaskGraph(pool)
+    graph.add("save", lambda: 1 / 0)
+    graph.add("notify", lambda saved: saved, deps=["save"], optional=True)
+    run = graph.run()
+    assert not run.ok and run.failed_step == "save"
+    assert run.steps["notify"].status == SKIPPED
+
+
+def test_timed_out_step_hands_its_late_value_to_on_timeout(pool):
+    release = threading.Event()
+    cleaned = []
+    done = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return "late"
+
+    graph = TaskGraph(pool)
+    graph.add("save", slow, timeout=0.05, on_timeout=lambda value: (cleaned.append(value), done.set()))
+    run = graph.run()
+    assert run.steps["save"].status == TIMED_OUT and run.failed_step == "save"
+    assert cleaned == []  # Still running
+
+    release.set()
+    assert done.wait(2)
+    assert cleaned == ["late"]
+
+
+def test_step_cancelled_before_starting_gets_none():
+    single = ThreadPoolExecutor(max_workers=1)
+    try:
+        blocker = threading.Event()
+        single.submit(blocker.wait, 2)
+        cleaned = threading.Event()
+        values = []
+        graph = TaskGraph(single)
+        graph.add("save", lambda: "never", timeout=0.05, on_timeout=lambda value: (values.append(value), cleaned.set()))
+        assert graph.run().steps["save"].status == TIMED_OUT
+        assert cleaned.wait(1)
+        assert values == [None]
+        blocker.set()
+    finally:
+        single.shutdown(wait=True)
+
+
+def test_script_run_context_is_cleared_from_pool_threads(pool, monkeypatch):
+    ctx = object()
+    attr = task_graph._SCRIPT_RUN_CTX_ATTR
+    monkeypatch.setattr(task_graph, "get_script_run_ctx", lambda: ctx)
+    monkeypatch.setattr(task_graph, "add_script_run_ctx", lambda thread, value: setattr(thread, attr, value))
+
+    threads = []
+    graph = TaskGraph(pool)
+    graph.add("step", lambda: threads.append(threading.current_thread()) or getattr(threading.current_thread(), attr))
+    assert graph.run().value("step") is ctx
+    assert getattr(threads[0], attr) is None
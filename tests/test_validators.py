@@ -0,0 +1,25 @@
+from utils.validators import validate_pdf_content
+
+LAB_REPORT = """
+City Diagnostics Laboratory
+Patient: A. Kumar   Age: 45   Sample: Blood
+Complete Blood Count
+Hemoglobin 13.5 g/dL 13-17
+WBC 7.2 10^3/uL 4-11
+Platelet Count 250 10^3/uL 150-410
+Fasting Glucose 92 mg/dL 70-100
+"""
+
+
+def test_typical_lab_report_is_accepted():
+    assert validate_pdf_content(LAB_REPORT) == (True, None)
+
+
+def test_non_medical_text_is_rejected():
+    valid, message = validate_pdf_content("Quarterly sales figures for the northern region, with a summary of targets.")
+    assert not valid and "medical report" in message
+
+
+def test_short_text_is_rejected():
+    valid, message = validate_pdf_content("Hemoglobin 13.5")
+    assert not valid and "too short" in message